@@ -0,0 +1,197 @@
+# audio_engine.py  (세 노드 공용 오디오 엔진)
+#
+# - 시작할 때 TTS_DIR 의 모든 mp3 / wav 를 PCM(pygame Sound)으로 디코딩해 메모리에 캐시
+# - 믹서는 한 번만 열고 전용 채널 하나로 재생
+# - 우선순위 큐: 숫자가 작을수록 먼저 (도착/기사 알림 > 버튼 피드백)
+# - 클립 끝은 채널 end-event 로 감지 (get_busy() 폴링 없음)
+# - 앰프(AMP_SD_PIN)는 큐가 비어 AMP_HOLD 초가 지날 때까지 켜둔다 → 연속 재생 시 50ms 대기 없음
+#
+#   audio = AudioEngine(TTS_DIR, AMP_SD_PIN, GPIO)
+#   audio.start()                                     # GPIO.setup(AMP_SD_PIN, OUT) 이후에 호출
+#   audio.play(["03_select_ko", "03_select_en"])      # 바로 반환, 완료 Event 반환
+#   audio.play_and_wait(["77_arrival_ko", "77_arrival_en"], PRIORITY_ALERT)
+#
+# sink 를 주면 pygame 대신 그 출력으로 재생 (hal.SimAudioSink: 소리 없이 클립 길이만큼 대기)
+
+import glob
+import heapq
+import itertools
+import os
+import threading
+import time
+
+PRIORITY_ALERT    = 0   # 도착 안내, 기사 알림
+PRIORITY_FEEDBACK = 1   # 버튼 선택/중복 안내
+
+AMP_WARMUP = 0.05   # 앰프가 꺼져 있다가 켤 때만 기다리는 시간
+AMP_HOLD   = 0.5    # 마지막 클립 후 앰프를 끄기까지 여유
+
+
+class AudioEngine:
+    def __init__(self, tts_dir, amp_pin=None, gpio=None, frequency=24000, channels=1, buffer=512,
+                 sink=None):
+        self.tts_dir = tts_dir
+        self.amp_pin = amp_pin
+        self.gpio = gpio
+        self.sink = sink
+        self._mixer_args = dict(frequency=frequency, size=-16, channels=channels, buffer=buffer)
+        self._cache = {}
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._amp_on = False
+        self._last_end = 0.0
+        self._use_events = False
+        self._started = False
+        self.played = 0
+        self.last_latency = None   # 요청 → 첫 클립 재생 시작 (초)
+        self._latency_hist = None
+
+    # ───────────── 시작 / 캐시 ─────────────
+    def start(self):
+        if self.sink is None:
+            import pygame
+            self._pg = pygame
+            pygame.mixer.pre_init(**self._mixer_args)
+            pygame.mixer.init()
+            self._channel = pygame.mixer.Channel(0)
+            pygame.mixer.set_reserved(1)   # 0번 채널은 이 엔진 전용
+        self.preload()
+        threading.Thread(target=self._worker, daemon=True).start()
+        self._started = True
+        print(f"[AUDIO] 믹서 초기화 + 클립 {len(self._cache)}개 캐시 완료")
+
+    def preload(self):
+        t0 = time.perf_counter()
+        paths = glob.glob(os.path.join(self.tts_dir, "*.mp3")) + glob.glob(os.path.join(self.tts_dir, "*.wav"))
+        for path in sorted(paths):
+            name = os.path.splitext(os.path.basename(path))[0]
+            try:
+                self._cache[name] = self.sink.load(name, path) if self.sink else self._pg.mixer.Sound(path)
+            except Exception as e:
+                print(f"[WARN] 클립 디코딩 실패 {path}: {e}")
+        self.preload_time = time.perf_counter() - t0
+
+    def has(self, name):
+        return self._clip(name) is not None
+
+    def _clip(self, name):
+        clip = self._cache.get(name)
+        if clip is None and self.sink is not None and self.sink.fill_missing:
+            clip = self._cache[name] = self.sink.load(name)
+        return clip
+
+    # ───────────── 재생 요청 ─────────────
+    def play(self, names, priority=PRIORITY_FEEDBACK, on_played=None):
+        """
+        클립 이름 목록을 순서대로 재생하도록 큐에 넣고 완료 Event 반환.
+        on_played(t_start, t_end) 는 재생이 끝나면 재생 스레드에서 호출 (time.time() 기준, 추적용)
+        """
+        done = threading.Event()
+        clips = [n for n in names if self._clip(n) is not None]
+        for n in names:
+            if n not in self._cache:
+                print(f"[WARN] TTS 클립 없음: {n}")
+        if not clips or not self._started:
+            done.set()
+            return done
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._seq), time.perf_counter(), clips, done,
+                                         on_played))
+            self._cond.notify()
+        return done
+
+    def play_and_wait(self, names, priority=PRIORITY_FEEDBACK, timeout=None, on_played=None):
+        return self.play(names, priority, on_played).wait(timeout)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def register_metrics(self, registry, prefix="audio"):
+        """ 큐 길이, 재생 횟수, 요청 → 재생 시작 지연 히스토그램 """
+        registry.gauge_fn(f"{prefix}_queue_depth", "재생 대기 중인 요청 수", lambda: len(self._queue))
+        registry.counter_fn(f"{prefix}_clips_played_total", "재생한 클립 수", lambda: self.played)
+        self._latency_hist = registry.histogram(f"{prefix}_play_latency_seconds",
+                                                "재생 요청 → 첫 클립 재생 시작")
+
+    # ───────────── 앰프 ─────────────
+    def _set_amp(self, on):
+        if self.gpio is None or self.amp_pin is None or on == self._amp_on:
+            return
+        self.gpio.output(self.amp_pin, self.gpio.HIGH if on else self.gpio.LOW)
+        self._amp_on = on
+        if on:
+            time.sleep(AMP_WARMUP)
+
+    # ───────────── 재생 스레드 ─────────────
+    def _init_events(self):
+        # end-event 는 pygame 이벤트 큐가 필요 → 화면 없이 dummy 비디오 드라이버로 초기화
+        pg = self._pg
+        try:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            pg.display.init()
+            self._end_event = pg.USEREVENT + 1
+            pg.event.set_blocked(None)                  # 모든 이벤트를 막고
+            pg.event.set_allowed([self._end_event])     # 재생 끝 이벤트만 큐에 쌓이게
+            self._channel.set_endevent(self._end_event)
+            self._use_events = True
+        except Exception as e:
+            print(f"[WARN] pygame 이벤트 사용 불가 ({e}) → 클립 길이만큼 대기")
+
+    def _wait_end(self, length):
+        deadline = time.monotonic() + length + 0.5
+        if not self._use_events:
+            time.sleep(length)
+            return
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            ev = self._pg.event.wait(int(left * 1000))
+            if ev.type == self._end_event:
+                return
+
+    def _worker(self):
+        if self.sink is None:
+            self._init_events()
+        while True:
+            with self._cond:
+                while not self._queue:
+                    if self._amp_on:
+                        idle = time.monotonic() - self._last_end
+                        if idle >= AMP_HOLD:
+                            self._set_amp(False)
+                        else:
+                            self._cond.wait(AMP_HOLD - idle)
+                            continue
+                    self._cond.wait()
+                _, _, t_req, clips, done, on_played = heapq.heappop(self._queue)
+            t_start = None
+            try:
+                self._set_amp(True)
+                for i, name in enumerate(clips):
+                    sound = self._cache[name]
+                    if self._use_events:
+                        self._pg.event.clear(self._end_event)
+                    if self.sink is not None:
+                        self.sink.play(sound)
+                    else:
+                        self._channel.play(sound)
+                    if i == 0:
+                        self.last_latency = time.perf_counter() - t_req
+                        if self._latency_hist is not None:
+                            self._latency_hist.observe(self.last_latency)
+                        t_start = time.time()
+                    self._wait_end(sound.get_length())
+                    self.played += 1
+            except Exception as e:
+                print(f"[AUDIO] 재생 중 오류: {e}")
+            finally:
+                self._last_end = time.monotonic()
+                done.set()
+                if on_played is not None and t_start is not None:
+                    try:
+                        on_played(t_start, time.time())
+                    except Exception as e:
+                        print(f"[AUDIO] on_played 콜백 오류: {e}")
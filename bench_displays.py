@@ -0,0 +1,231 @@
+# bench_displays.py  (기사 단말 GUI / 도트매트릭스 렌더링 벤치마크, 하드웨어 없이)
+#
+# 두 화면을 헤드리스 백엔드로 돌리면서 같은 시나리오를 예전 방식과 현재 방식으로 재생하고
+# 프레임당 렌더 시간 백분위, 프레임당 최대 할당량(tracemalloc), 최대 FPS 를 출력한다.
+#
+#   driver : driver_gui.DriverRenderer + OffscreenOutput  vs  예전 전체 다시 그리기 루프 (100ms 틱)
+#   led    : dotmatrix_display.build_windows + dummy luma 장치  vs  예전 crop/canvas 루프 (스크롤 한 칸 = 1프레임)
+#
+#   python3 bench_displays.py
+#   python3 bench_displays.py --ticks 3000 --font /usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf --json out.json
+
+import argparse
+import json
+import os
+import textwrap
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image, ImageDraw
+
+os.environ.setdefault("LED_BACKEND", "dummy")
+import dotmatrix_display as dm
+import driver_gui as gui
+from notification_store import NotificationStore
+
+STOPS = ("광주대학교 정류장", "남광주역", "양림동")
+BUSES = ("03", "47", "77", "177", "1187")
+
+
+# ───────────────── 시나리오 ─────────────────
+def driver_script(ticks, seed=0):
+    """ 틱마다 (op, stop, bus) 목록. 대부분 조용하고 가끔 호출/중복/도착/지우기 """
+    rng = np.random.default_rng(seed)
+    script = []
+    for _ in range(ticks):
+        r = rng.random()
+        if r < 0.04:
+            script.append([("call", str(rng.choice(STOPS)), str(rng.choice(BUSES)))])
+        elif r < 0.05:
+            script.append([("arrival", None, str(rng.choice(BUSES)))])
+        elif r < 0.052:
+            script.append([("clear", None, None)])
+        else:
+            script.append([])
+    return script
+
+def led_script(ticks, seed=0):
+    """ 틱(스크롤 한 칸)마다 버스 목록 변경 """
+    rng = np.random.default_rng(seed)
+    script = []
+    for _ in range(ticks):
+        r = rng.random()
+        if r < 0.01:
+            script.append([("add", str(rng.choice(BUSES)))])
+        elif r < 0.017:
+            script.append([("remove", str(rng.choice(BUSES)))])
+        else:
+            script.append([])
+    return script
+
+def call_lines(stop, bus):
+    return (f"{stop}에서 도움이 필요한 승객이 {bus}번 버스를 탑승할 예정입니다.",
+            f"A passenger requiring assistance will board bus {bus} at {stop}.")
+
+def apply_driver(store, ops):
+    for op, stop, bus in ops:
+        if op == "call":
+            store.add(stop, bus, call_lines(stop, bus))
+        elif op == "arrival":
+            store.remove_bus(bus)
+        else:
+            store.clear()
+
+
+# ───────────────── 기사 단말: 예전 / 현재 ─────────────────
+def legacy_driver_frame(store, fonts):
+    """ 예전 driver_display.main 루프 한 번 (매 틱 전체 다시 그리기) """
+    font_title, font_text, font_button = fonts
+    frame = np.full((gui.HEIGHT, gui.WIDTH, 3), gui.BG_COLOR, dtype=np.uint8)
+    pil = Image.fromarray(frame)
+    draw = ImageDraw.Draw(pil)
+    (tx, ty) = gui.get_text_center_pos(draw, (0, 0, 800, 50), gui.TITLE_TEXT, font_title)
+    draw.text((tx, 15), gui.TITLE_TEXT, font=font_title, fill=gui.TITLE_COLOR)
+    gui.draw_rounded_rectangle(draw, gui.CONTAINER_RECT, 10, fill=gui.CONTAINER_COLOR)
+    y = gui.LIST_Y
+    for text in (line for n in store.snapshot()[1] for line in n.lines):
+        wrapped = textwrap.fill(text, width=gui.WRAP_WIDTH)
+        draw.multiline_text((gui.LIST_X, y), wrapped, font=font_text, fill=gui.TEXT_COLOR)
+        (l, t, r, b) = draw.textbbox((gui.LIST_X, y), wrapped, font=font_text)
+        y += (b - t) + gui.LINE_GAP
+        if y > gui.LIST_LIMIT_Y:
+            break
+    for rect, color, txt in ((gui.CONFIRM_RECT, gui.CONFIRM_BTN_COLOR, "알림 지우기"),
+                             (gui.EXIT_RECT, gui.EXIT_BTN_COLOR, "프로그램 종료")):
+        gui.draw_rounded_rectangle(draw, rect, gui.BUTTON_RADIUS, fill=color)
+        (tx, ty) = gui.get_text_center_pos(draw, rect, txt, font_button)
+        draw.text((tx, ty), txt, font=font_button, fill=gui.BTN_TEXT_COLOR)
+    return np.array(pil)
+
+def run_driver(mode, script, fonts, trace):
+    store = NotificationStore(8, 900)
+    times, peaks = [], []
+    if mode == "legacy":
+        step = lambda: legacy_driver_frame(store, fonts)
+    else:
+        renderer = gui.DriverRenderer(fonts)
+        out = gui.OffscreenOutput()
+        out.present(renderer.frame, [(0, 0, gui.WIDTH, gui.HEIGHT)])
+        def step():
+            store.expire()
+            dirty = renderer.update(store)
+            if dirty:
+                out.present(renderer.frame, dirty)
+    for ops in script:
+        apply_driver(store, ops)
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - t0)
+        if trace:
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    return times, peaks
+
+
+# ───────────────── 도트매트릭스: 예전 / 현재 ─────────────────
+def legacy_led_frames(buses):
+    """ 예전 display_loop 가 메시지 하나에 대해 그리던 프레임 (이미지 생성 + 오프셋마다 crop/canvas) """
+    from luma.core.render import canvas
+    from luma.core.legacy import text
+    msg = ", ".join(buses) + "   "
+    width = sum([5 if c != ' ' else 2 for c in msg]) + 1
+    text_img = Image.new("1", (width, 8))
+    text(ImageDraw.Draw(text_img), (0, 0), msg, font=dm.font, fill=1)
+    offsets = [0] if width <= 32 else range(width - 32 + 1)
+    for offset in offsets:
+        sub_img = text_img.crop((offset, 0, offset + 32, 8))
+        with canvas(dm.device) as draw:
+            for i in range(4):
+                tile = sub_img.crop((i * 8, 0, (i + 1) * 8, 8))
+                draw.bitmap((24 - i * 8, 0), tile, fill=1)
+        yield
+
+def run_led(mode, script, trace):
+    """ 틱마다 한 프레임 (스크롤 한 칸). 목록이 바뀐 틱은 메시지 재생성 비용 포함 """
+    buses = ["77"]
+    times, peaks = [], []
+    frames, windows, pos = None, [], 0
+    changed = True
+    for ops in script:
+        for op, bus in ops:
+            if op == "add" and bus not in buses:
+                buses.append(bus)
+                changed = True
+            elif op == "remove" and bus in buses:
+                buses.remove(bus)
+                changed = True
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        if mode == "legacy":
+            # 예전 루프는 메시지가 그대로여도 스크롤 한 바퀴마다 이미지를 다시 만든다
+            if not buses:
+                dm.device.clear()
+            else:
+                if frames is None:
+                    frames = legacy_led_frames(buses)
+                if next(frames, StopIteration) is StopIteration:
+                    frames = legacy_led_frames(buses)
+                    next(frames)
+        else:
+            if changed:
+                windows, pos = (dm.build_windows(", ".join(buses) + "   ") if buses else []), 0
+                if not windows:
+                    dm.device.clear()
+            if windows:
+                dm.device.display(windows[pos])
+                pos = (pos + 1) % len(windows)
+        times.append(time.perf_counter() - t0)
+        if trace:
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        changed = False
+    return times, peaks
+
+
+# ───────────────── 출력 ─────────────────
+def summarize(times, peaks):
+    v = np.array(times) * 1000.0
+    return {"frames": len(v), "mean_ms": float(v.mean()),
+            "p50_ms": float(np.percentile(v, 50)), "p99_ms": float(np.percentile(v, 99)),
+            "max_ms": float(v.max()), "fps": len(v) / (v.sum() / 1000.0),
+            "peak_alloc_kib": float(max(peaks) / 1024.0) if peaks else None,
+            "mean_alloc_kib": float(np.mean(peaks) / 1024.0) if peaks else None}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ticks", type=int, default=1500)
+    ap.add_argument("--font", default=gui.FONT_PATH, help="기사 단말 폰트 (없으면 PIL 기본 폰트)")
+    ap.add_argument("--only", choices=("driver", "led"))
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    args = ap.parse_args()
+
+    dm.init_device("dummy")
+    fonts = gui.load_fonts(args.font)
+    results = {}
+    for display in ("driver", "led"):
+        if args.only and args.only != display:
+            continue
+        script = driver_script(args.ticks) if display == "driver" else led_script(args.ticks)
+        for mode in ("legacy", "current"):
+            run = (lambda trace: run_driver(mode, script, fonts, trace)) if display == "driver" \
+                else (lambda trace: run_led(mode, script, trace))
+            times, _ = run(False)
+            tracemalloc.start()
+            _, peaks = run(True)
+            tracemalloc.stop()
+            results[f"{display}/{mode}"] = summarize(times, peaks)
+
+    print(f"[BENCH] 시나리오 {args.ticks} 틱")
+    print(f"{'display/mode':<16}{'mean':>9}{'p50':>9}{'p99':>9}{'max':>9}{'fps':>11}{'peak KiB':>10}{'mean KiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<16}" + "".join(f"{r[k]:9.3f}" for k in ("mean_ms", "p50_ms", "p99_ms", "max_ms"))
+              + f"{r['fps']:11.0f}{r['peak_alloc_kib']:10.1f}{r['mean_alloc_kib']:10.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
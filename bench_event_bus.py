@@ -0,0 +1,89 @@
+# bench_event_bus.py  (HTTP vs 이벤트 버스 루프백 지연 비교)
+#
+# 같은 PC 안에서 Flask /call 엔드포인트와 event_bus 서버를 띄우고
+# CALL 이벤트 하나를 보내서 응답(ACK)을 받을 때까지의 왕복 시간을 잰다.
+#
+#   http-new     : 매번 requests.post (요청마다 새 TCP 연결, 예전 노드 코드 방식)
+#   http-session : keep-alive requests.Session (dispatcher.Peer 방식)
+#   bus          : 지속 TCP 연결 + 길이 프레이밍 + ACK (event_bus)
+#
+#   python3 bench_event_bus.py --count 500
+
+import argparse
+import logging
+import threading
+import time
+import numpy as np
+import requests
+from flask import Flask, request
+
+from event_bus import EventBusServer, EventBusClient
+
+
+def start_flask(port):
+    app = Flask(__name__)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    @app.route("/call", methods=["POST"])
+    def handle_call():
+        request.get_json(force=True)
+        return {"ok": True}, 200
+
+    threading.Thread(target=lambda: app.run(host="127.0.0.1", port=port, threaded=True),
+                     daemon=True).start()
+    url = f"http://127.0.0.1:{port}/call"
+    for _ in range(50):
+        try:
+            requests.post(url, json={}, timeout=0.5)
+            return url
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError("Flask 서버 시작 실패")
+
+
+def measure(send, count, warmup=20):
+    for i in range(warmup):
+        send(i)
+    lat = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        send(i)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+    return np.array(lat)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=500)
+    ap.add_argument("--http-port", type=int, default=5099)
+    args = ap.parse_args()
+
+    url = start_flask(args.http_port)
+    server = EventBusServer("127.0.0.1", 0, lambda t, d: None).start()
+    client = EventBusClient("127.0.0.1", server.port, name="bench").start()
+    while not client.connected:
+        time.sleep(0.01)
+
+    session = requests.Session()
+    payload = lambda i: {"type": "CALL", "bus": "77", "stop": "광주대학교 정류장", "seq": i}
+
+    def bus_send(i):
+        if not client.send_and_wait("CALL", payload(i), timeout=1.0):
+            raise RuntimeError("ACK 없음")
+
+    results = {
+        "http-new":     measure(lambda i: requests.post(url, json=payload(i), timeout=1), args.count),
+        "http-session": measure(lambda i: session.post(url, json=payload(i), timeout=1), args.count),
+        "bus":          measure(bus_send, args.count),
+    }
+
+    print(f"[BENCH] 루프백 CALL 왕복 {args.count}회 (ms)")
+    print(f"{'transport':<14}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, v in results.items():
+        print(f"{name:<14}{v.mean():9.3f}" + "".join(f"{np.percentile(v, q):9.3f}" for q in (50, 90, 99))
+              + f"{v.max():9.3f}")
+    base = np.percentile(results["http-session"], 50)
+    print(f"[BENCH] p50 기준 bus 가 keep-alive HTTP 보다 {base / np.percentile(results['bus'], 50):.1f}배 빠름")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# bench_http_load.py  (노드 HTTP 엔드포인트 부하 테스트)
+#
+# 로컬에 stand-in 노드(별도 프로세스)를 띄우고 /call, /release 요청을 동시에 대량으로 보낸다.
+# stand-in 노드는 실제 노드처럼 같은 프로세스 안에서
+#   - Flask 앱 (/call = stop_node 호출 등록, /release = call_node 해제)  ← http_server.serve
+#   - 검출 루프 (합성 프레임 → bus_vision.BusVision.detect, stand-in ONNX 모델)
+# 을 같이 돌리므로, 요청 처리가 검출 루프 FPS 를 얼마나 깎는지(GIL 경쟁) 볼 수 있다.
+#
+# 서버 백엔드별로 처리량(req/s), 지연 백분위, 오류 수, 부하 전/중 검출 FPS 를 출력한다.
+#
+#   python3 bench_http_load.py                                   # werkzeug vs waitress
+#   python3 bench_http_load.py --requests 5000 --concurrency 64 --backends waitress --threads 2 4
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+from http_server import BACKENDS, serve
+
+BUSES = ("03", "47", "77", "177")
+
+
+# ───────────────── stand-in 노드 (자식 프로세스) ─────────────────
+def run_node(port, backend, threads, model):
+    from flask import Flask, request
+    from bus_vision import BusVision
+
+    app = Flask(__name__)
+    pending, lock = set(), threading.Lock()
+    frames = {"n": 0}
+
+    @app.route("/call", methods=["POST"])
+    def handle_call():
+        bus = request.get_json(force=True).get("bus", "")
+        if not bus:
+            return {"ok": False, "error": "no bus"}, 400
+        with lock:
+            pending.add(bus)
+        return {"ok": True}, 200
+
+    @app.route("/release", methods=["POST"])
+    def release_bus():
+        bus = request.get_json(force=True).get("bus")
+        with lock:
+            pending.discard(bus)
+        return {"ok": True}, 200
+
+    @app.route("/bench/frames")
+    def bench_frames():
+        return {"frames": frames["n"], "t": time.monotonic()}
+
+    vision = BusVision(model, ort_profile="opi-shared", ocr_backend="none")
+    vision.warm_up(2)
+    rng = np.random.default_rng(0)
+    clips = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(4)]
+
+    def detect_loop():
+        i = 0
+        while True:
+            boxes = vision.detect(clips[i % len(clips)])
+            # 트래커/게이트 같은 파이썬 쪽 처리 흉내
+            _ = [b for b in boxes if b[4] > 0.5]
+            frames["n"] += 1
+            i += 1
+
+    threading.Thread(target=detect_loop, daemon=True).start()
+    serve(app, "127.0.0.1", port, backend, threads)
+
+
+# ───────────────── 부하 생성기 ─────────────────
+def wait_ready(base, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return requests.get(base + "/bench/frames", timeout=0.5).json()
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("stand-in 노드 시작 실패")
+
+def measure_fps(base, seconds):
+    a = requests.get(base + "/bench/frames").json()
+    time.sleep(seconds)
+    b = requests.get(base + "/bench/frames").json()
+    return (b["frames"] - a["frames"]) / (b["t"] - a["t"])
+
+def fire(base, total, concurrency, keepalive):
+    """ CALL/RELEASE 를 반반 섞어 total 개를 concurrency 개 스레드로 전송 """
+    local = threading.local()
+    def worker(i):
+        if keepalive:
+            s = getattr(local, "s", None) or requests.Session()
+            local.s = s
+        else:
+            s = requests
+        path = "/call" if i % 2 == 0 else "/release"
+        payload = {"type": "CALL", "bus": random.choice(BUSES), "stop": "광주대학교 정류장"}
+        t0 = time.perf_counter()
+        try:
+            ok = s.post(base + path, json=payload, timeout=5).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - t0) * 1000.0, ok
+
+    a = requests.get(base + "/bench/frames").json()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(worker, range(total)))
+    wall = time.perf_counter() - t0
+    b = requests.get(base + "/bench/frames").json()
+    lat = np.array([r[0] for r in results if r[1]])
+    return {
+        "requests": total, "errors": sum(1 for r in results if not r[1]),
+        "rps": total / wall, "wall_s": wall,
+        "latency_ms": {k: float(np.percentile(lat, q)) for k, q in
+                       (("p50", 50), ("p90", 90), ("p99", 99), ("p999", 99.9))} if lat.size else {},
+        "fps_under_load": (b["frames"] - a["frames"]) / (b["t"] - a["t"]),
+    }
+
+def bench_backend(args, backend, threads, port, model):
+    cmd = [sys.executable, os.path.abspath(__file__), "--node", "--port", str(port),
+           "--backends", backend, "--threads", str(threads), "--model", model]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base)
+        time.sleep(1.0)    # 워밍업
+        result = {"backend": backend, "threads": threads,
+                  "fps_idle": measure_fps(base, args.idle)}
+        result.update(fire(base, args.requests, args.concurrency, not args.no_keepalive))
+        result["fps_drop"] = 1.0 - result["fps_under_load"] / result["fps_idle"]
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    ap.add_argument("--threads", nargs="+", type=int, default=[4], help="waitress 스레드 수 (여러 개면 각각 측정)")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--no-keepalive", action="store_true", help="요청마다 새 연결 (예전 call_node 방식)")
+    ap.add_argument("--idle", type=float, default=3.0, help="부하 전 FPS 측정 시간(초)")
+    ap.add_argument("--port", type=int, default=5097)
+    ap.add_argument("--model", help="검출 루프용 ONNX (없으면 stand-in 모델 생성)")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    ap.add_argument("--node", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.node:
+        run_node(args.port, args.backends[0], args.threads[0], args.model)
+        return
+
+    model = args.model
+    if not model:
+        from make_standin_model import build
+        model = build(os.path.join(tempfile.gettempdir(), "standin_bus_number.onnx"))
+
+    results = []
+    for backend in args.backends:
+        for threads in (args.threads if backend == "waitress" else [0]):
+            r = bench_backend(args, backend, threads, args.port, model)
+            results.append(r)
+            print(f"[BENCH] {backend}{f' x{threads}' if threads else ''}: {r['rps']:.0f} req/s, "
+                  f"오류 {r['errors']}, FPS {r['fps_idle']:.1f} → {r['fps_under_load']:.1f}")
+
+    print(f"\n[BENCH] {args.requests} 요청, 동시 {args.concurrency}, "
+          f"{'새 연결' if args.no_keepalive else 'keep-alive'}")
+    print(f"{'server':<14}{'req/s':>8}{'err':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}"
+          f"{'fps idle':>10}{'fps load':>10}{'drop':>7}")
+    for r in results:
+        name = r["backend"] + (f" x{r['threads']}" if r["threads"] else "")
+        lat = r["latency_ms"]
+        print(f"{name:<14}{r['rps']:8.0f}{r['errors']:6d}"
+              + "".join(f"{lat.get(k, float('nan')):9.2f}" for k in ("p50", "p90", "p99", "p999"))
+              + f"{r['fps_idle']:10.1f}{r['fps_under_load']:10.1f}{r['fps_drop']*100:6.0f}%")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# bench_pipeline.py  (검출/OCR 파이프라인 오프라인 재생 벤치마크)
+#
+# 녹화 영상이나 이미지 폴더를 카메라 없이 bus_vision.BusVision.run (= stop_node.run_yolo_and_ocr)
+# 에 그대로 흘려보내고 단계별 지연 백분위, FPS, 최대 RSS, 정답 대비 정확도를 출력한다.
+# 정확도는 검출(프레임마다 박스 수 ↔ 정답 버스 수)은 항상, 번호 인식은 OCR 백엔드가 있을 때만
+# 낸다 (없으면 "n/a").
+#
+#   python3 bench_pipeline.py --video clip.mp4 --labels clip.csv --model bus_number.onnx
+#   python3 bench_pipeline.py --images frames/ --labels frames.csv --model bus_number.int8.onnx
+#   python3 bench_pipeline.py --synthetic 200 --standin          # CI: 카메라/GPU/실제 모델 없이
+#
+# 정답 파일(CSV): 한 줄에 "키,버스번호들"  (번호는 공백으로 구분, 버스가 없으면 비움)
+#   영상   → 키는 0 부터 시작하는 프레임 번호      예) 120,77
+#   이미지 → 키는 파일 이름                        예) 0003.jpg,03 177
+
+import argparse
+import csv
+import glob
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+import cv2
+import numpy as np
+
+from bus_vision import BusVision, DEFAULT_OCR_CONFIG
+
+STAGES = ("pre", "infer", "decode", "ocr", "total")
+
+
+# ───────────────── 입력 소스 ─────────────────
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    idx = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret: break
+            yield str(idx), frame
+            idx += 1
+    finally:
+        cap.release()
+
+def image_frames(folder):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp")
+                   for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    for p in paths:
+        yield os.path.basename(p), cv2.imread(p)
+
+def synthetic_frames(n, buses=("03", "47", "77", "177"), seed=0):
+    """
+    회색 도로 위에 흰 번호판(160x64, 검은 숫자)을 그린 640x480 프레임.
+    번호판 중심은 stand-in 모델의 32px 칸 중심에 맞춘다 (레터박스 위 패딩 80px 고려).
+    정답 dict 도 함께 채운다.
+    """
+    rng = np.random.default_rng(seed)
+    labels = {}
+    def gen():
+        for i in range(n):
+            frame = rng.normal(100, 12, (480, 640, 3)).clip(0, 255).astype(np.uint8)
+            truth = []
+            if rng.random() < 0.8:
+                bus = str(rng.choice(buses))
+                cx = 32 * int(rng.integers(3, 17)) + 16
+                cy = 32 * int(rng.integers(6, 15)) + 16 - 80
+                cv2.rectangle(frame, (cx - 80, cy - 32), (cx + 80, cy + 32), (255, 255, 255), -1)
+                (tw, th), _ = cv2.getTextSize(bus, cv2.FONT_HERSHEY_SIMPLEX, 1.6, 4)
+                cv2.putText(frame, bus, (cx - tw // 2, cy + th // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                            1.6, (0, 0, 0), 4, cv2.LINE_AA)
+                truth.append(bus)
+            labels[f"syn{i}"] = truth
+            yield f"syn{i}", frame
+    return gen(), labels
+
+def load_labels(path):
+    labels = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#") or row[0] in ("key", "frame"):
+                continue
+            labels[row[0].strip()] = (row[1].split() if len(row) > 1 else [])
+    return labels
+
+
+# ───────────────── 측정 ─────────────────
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0   # 리눅스: KiB 단위
+
+def summarize(samples):
+    out = {}
+    for stage in STAGES:
+        v = np.array(samples[stage]) * 1000.0
+        if v.size:
+            out[stage] = {"mean": float(v.mean()), "p50": float(np.percentile(v, 50)),
+                          "p90": float(np.percentile(v, 90)), "p99": float(np.percentile(v, 99)),
+                          "max": float(v.max())}
+    return out
+
+def score_detection(counts, labels):
+    """ 프레임마다 검출 박스 수를 정답 버스 수와 비교 (번호는 안 봄): 개수 일치율 + precision / recall """
+    tp = fp = fn = exact = n = 0
+    for key, found in counts.items():
+        if key not in labels:
+            continue
+        truth = len(labels[key])
+        tp += min(found, truth)
+        fp += max(found - truth, 0)
+        fn += max(truth - found, 0)
+        exact += found == truth
+        n += 1
+    return {"frames": n,
+            "exact": exact / n if n else float("nan"),
+            "precision": tp / (tp + fp) if tp + fp else float("nan"),
+            "recall": tp / (tp + fn) if tp + fn else float("nan")}
+
+def score(preds, labels):
+    """ 프레임 단위 정확 일치율 + 번호 단위 precision / recall """
+    tp = fp = fn = exact = n = 0
+    for key, pred in preds.items():
+        if key not in labels:
+            continue
+        truth, got = set(labels[key]), set(pred)
+        tp += len(truth & got)
+        fp += len(got - truth)
+        fn += len(truth - got)
+        exact += truth == got
+        n += 1
+    return {"frames": n,
+            "exact": exact / n if n else float("nan"),
+            "precision": tp / (tp + fp) if tp + fp else float("nan"),
+            "recall": tp / (tp + fn) if tp + fn else float("nan")}
+
+def run(vision, frames, max_frames=0):
+    """ BusVision.run 과 같은 순서 (detect → 박스마다 read) 로 돌리고 검출 박스 수도 기록 """
+    samples = {stage: [] for stage in STAGES}
+    preds, counts = {}, {}
+    t_start = time.perf_counter()
+    for key, frame in frames:
+        if frame is None:
+            continue
+        timings = {}
+        t0 = time.perf_counter()
+        boxes = vision.detect(frame, timings)
+        nums = [vision.read(frame, box, timings) for box in boxes]
+        preds[key] = [n for n in nums if n]
+        counts[key] = len(boxes)
+        timings["total"] = time.perf_counter() - t0
+        for stage, v in timings.items():
+            samples[stage].append(v)
+        if max_frames and len(preds) >= max_frames:
+            break
+    wall = time.perf_counter() - t_start
+    return preds, counts, samples, wall
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--video")
+    src.add_argument("--images")
+    src.add_argument("--synthetic", type=int, metavar="N")
+    ap.add_argument("--labels", help="정답 CSV")
+    ap.add_argument("--model", help="ONNX 모델 경로")
+    ap.add_argument("--standin", action="store_true", help="make_standin_model 로 만든 가짜 모델 사용")
+    ap.add_argument("--variant", default="fp32")
+    ap.add_argument("--profile", default="default", help="model_manager.SESSION_PROFILES 이름")
+    ap.add_argument("--ocr-backend", default="tesseract-cli", help="ocr_engine 백엔드, none 이면 검출만")
+    ap.add_argument("--ocr-model")
+    ap.add_argument("--max-frames", type=int, default=0)
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--json", help="결과를 JSON 으로 저장 (CI 아티팩트용)")
+    args = ap.parse_args()
+
+    model = args.model
+    if args.standin or not model:
+        from make_standin_model import build
+        model = build(os.path.join(tempfile.gettempdir(), "standin_bus_number.onnx"))
+
+    backend = args.ocr_backend
+    if backend == "tesseract-cli" and shutil.which("tesseract") is None:
+        print("[WARN] tesseract 실행 파일 없음 → OCR 생략 (검출만 측정)")
+        backend = "none"
+
+    vision = BusVision(model, args.variant, args.profile, ocr_backend=backend,
+                       ocr_config=DEFAULT_OCR_CONFIG, ocr_model_path=args.ocr_model)
+    vision.warm_up(args.warmup)
+    rss_before = peak_rss_mb()
+
+    labels = load_labels(args.labels) if args.labels else {}
+    if args.video:
+        frames = video_frames(args.video)
+    elif args.images:
+        frames = image_frames(args.images)
+    else:
+        frames, labels = synthetic_frames(args.synthetic)
+
+    preds, counts, samples, wall = run(vision, frames, args.max_frames)
+    n = len(preds)
+    result = {
+        "model": model, "variant": args.variant, "profile": args.profile,
+        "ocr_backend": vision.ocr.name, "frames": n,
+        "fps": n / wall if wall > 0 else 0.0,
+        "latency_ms": summarize(samples),
+        "frames_with_boxes": len(samples["ocr"]),
+        "peak_rss_mb": peak_rss_mb(), "rss_after_load_mb": rss_before,
+    }
+    if labels:
+        result["detection_accuracy"] = score_detection(counts, labels)
+        # OCR 이 없으면 번호는 하나도 안 읽히므로 0% 가 아니라 n/a
+        result["accuracy"] = score(preds, labels) if vision.ocr.name != "none" else None
+
+    print(f"[BENCH] {n} 프레임, {result['fps']:.1f} fps, 최대 RSS {result['peak_rss_mb']:.0f} MB "
+          f"(모델 로드 후 {rss_before:.0f} MB), OCR 백엔드 {result['ocr_backend']}")
+    print(f"{'stage':<8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for stage, s in result["latency_ms"].items():
+        print(f"{stage:<8}" + "".join(f"{s[k]:9.2f}" for k in ("mean", "p50", "p90", "p99", "max")))
+    if "detection_accuracy" in result:
+        a = result["detection_accuracy"]
+        print(f"[ACC] 검출 {a['frames']} 프레임: 개수 일치 {a['exact']*100:.1f}%, "
+              f"precision {a['precision']*100:.1f}%, recall {a['recall']*100:.1f}%")
+        a = result["accuracy"]
+        if a is None:
+            print("[ACC] 번호 인식: n/a (OCR 백엔드 없음)")
+        else:
+            print(f"[ACC] 번호 인식 {a['frames']} 프레임: 정확 일치 {a['exact']*100:.1f}%, "
+                  f"precision {a['precision']*100:.1f}%, recall {a['recall']*100:.1f}%")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_preprocess.py  (YOLO 입력 전처리 벤치마크)
+#
+# 기존 adjust_gamma → adjust_saturation → letterbox → blobFromImage 경로와
+# preprocess.YoloPreprocessor 를 프레임당 시간 / 할당 바이트로 비교.
+#
+#   python3 bench_preprocess.py                 # 640x480 합성 프레임
+#   python3 bench_preprocess.py --video clip.mp4
+#   python3 bench_preprocess.py --width 1280 --height 720
+
+import argparse
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+from preprocess import YoloPreprocessor
+from yolo_decoder import letterbox
+
+GAMMA      = 0.8
+SATURATION = 1.3
+SIZE       = 640
+
+
+# ───────────────── 기존 경로 (stop_node 의 예전 구현) ─────────────────
+def adjust_gamma(img_rgb):
+    inv = 1.0 / GAMMA
+    table = np.array([((i/255.0)**inv)*255 for i in range(256)], dtype=np.uint8)
+    return cv2.LUT(img_rgb, table)
+
+def adjust_saturation(img_rgb):
+    hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV).astype(np.float32)
+    h, s, v = cv2.split(hsv)
+    s = np.clip(s * SATURATION, 0, 255)
+    hsv = cv2.merge([h, s, v]).astype(np.uint8)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+def legacy_input(frame_bgr):
+    rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    rgb = adjust_gamma(rgb)
+    rgb = adjust_saturation(rgb)
+    boxed, _, _ = letterbox(rgb, SIZE)
+    return cv2.dnn.blobFromImage(boxed, 1/255.0, swapRB=True, crop=False)
+
+
+# ───────────────── 입력 ─────────────────
+def load_frames(args):
+    if args.video:
+        cap = cv2.VideoCapture(args.video)
+        frames = []
+        while len(frames) < args.frames:
+            ret, f = cap.read()
+            if not ret: break
+            frames.append(f)
+        cap.release()
+        return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+            for _ in range(args.frames)]
+
+
+# ───────────────── 측정 ─────────────────
+def bench(name, fn, frames, repeat):
+    fn(frames[0])   # 첫 호출(버퍼/LUT 준비)은 제외
+    times, allocs = [], []
+    tracemalloc.start()
+    for _ in range(repeat):
+        for f in frames:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            t0 = time.perf_counter()
+            fn(f)
+            times.append(time.perf_counter() - t0)
+            allocs.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    t = np.array(times) * 1e3
+    a = np.array(allocs) / 1024
+    print(f"{name:<10} mean {t.mean():7.2f}ms  p95 {np.percentile(t, 95):7.2f}ms  "
+          f"peak alloc/frame {a.mean():9.1f} KiB")
+    return t.mean()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--video")
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    frames = load_frames(args)
+    pre = YoloPreprocessor(GAMMA, SATURATION, SIZE)
+    h, w = frames[0].shape[:2]
+    diff = np.abs(legacy_input(frames[0]) - pre(frames[0])[0]).max()
+    print(f"[BENCH] {len(frames)} 프레임 {w}x{h}, 결과 최대 차이 {diff:.4f}")
+
+    t_old = bench("legacy", legacy_input, frames, args.repeat)
+    t_new = bench("fused", pre, frames, args.repeat)
+    print(f"[BENCH] speedup x{t_old / max(t_new, 1e-9):.1f}")
+
+if __name__ == "__main__":
+    main()
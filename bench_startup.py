@@ -0,0 +1,227 @@
+# bench_startup.py  (stop 노드 기동 시간 분석: 예전 순차 기동 vs 단계별 병렬 기동)
+#
+# 1) import 시간: 무거운 모듈을 각각 새 인터프리터에서 import 해서 걸린 시간
+# 2) 기동 시간: 자식 프로세스로 stop 노드 기동 과정을 재현하고, 부모가 /call 을 계속 두드려
+#    "전원 투입(프로세스 시작) → 첫 /call 수락" 과 "→ 모든 하위 시스템 준비" 를 잰다.
+#      legacy : 예전 stop_node 순서 (import 중 모델 로드 → GPIO → 오디오 → 워밍업 → LED → Flask → 카메라)
+#      staged : startup.Startup (Flask 먼저, 모델/워밍업/오디오/카메라/LED 는 백그라운드에서 동시에)
+#    GPIO 는 보드가 없으면 건너뛰고, 오디오는 SDL dummy 드라이버, LED 는 luma dummy 장치로 돈다.
+#
+#   python3 bench_startup.py                                   # 모델이 없으면 stand-in 모델 생성
+#   python3 bench_startup.py --model /home/pi/bus_detection/models/bus_number.onnx \
+#       --tts-dir /home/pi/bus_detection/tts --camera 0 --repeat 3 --json startup.json
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import requests
+
+HEAVY_MODULES = ("numpy", "PIL.Image", "requests", "flask", "waitress", "luma.core.legacy.font",
+                 "pygame", "cv2", "onnxruntime", "pytesseract", "tesserocr",
+                 # 저장소 모듈 (위 라이브러리를 끌어오는 쪽)
+                 "dotmatrix_display", "frame_pipeline", "dispatcher", "bus_vision")
+
+
+# ───────────────── import 시간 ─────────────────
+def import_time(module):
+    code = ("import time; t0 = time.perf_counter(); import " + module
+            + "; print(time.perf_counter() - t0)")
+    r = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+    if r.returncode != 0:
+        return None
+    return float(r.stdout.strip().splitlines()[-1])
+
+
+# ───────────────── 자식: 노드 기동 재현 ─────────────────
+def child(args):
+    t_start = time.time()
+    steps = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            print(f"[WARN] {name} 실패: {e}", file=sys.stderr)
+            steps[name + " (failed)"] = time.perf_counter() - t0
+            return
+        steps[name] = time.perf_counter() - t0
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    t0 = time.perf_counter()
+    from flask import Flask, request
+    import dotmatrix_display as dm
+    from http_server import serve_in_thread
+    from audio_engine import AudioEngine
+    from startup import Startup
+    # stop_node 가 맨 위에서 불러오는 모듈들: 이름은 안 쓰고 로드 시간만 재려고 import
+    probes = ["frame_pipeline", "tracker"]
+    if args.mode == "legacy":
+        probes += ["cv2", "bus_vision"]     # 예전 stop_node 는 모듈 맨 위에서 cv2 / bus_vision 을 import
+    for module in probes:
+        importlib.import_module(module)
+    steps["imports"] = time.perf_counter() - t0
+
+    pending = set()
+    app = Flask("bench-stop")
+
+    @app.route("/call", methods=["POST"])
+    def handle_call():
+        pending.add(request.get_json(force=True).get("bus", ""))
+        return {"ok": True}, 200
+
+    state = {"vision": None, "cap": None}
+    audio = AudioEngine(args.tts_dir)
+
+    def load_model():
+        from bus_vision import BusVision
+        state["vision"] = BusVision(args.model, ort_profile=args.ort_profile, ocr_backend=args.ocr)
+
+    def warm():
+        state["vision"].warm_up(3)
+
+    def open_camera():
+        if args.camera == "none":
+            return
+        import cv2
+        src = int(args.camera) if args.camera.isdigit() else args.camera
+        cap = cv2.VideoCapture(src)
+        if not cap.isOpened():
+            raise RuntimeError(f"카메라 {args.camera} 열기 실패")
+        cap.read()
+        state["cap"] = cap
+
+    def led():
+        dm.start_led_display("dummy")
+
+    def flask_up():
+        serve_in_thread(app, "127.0.0.1", args.port, "waitress", 2)
+
+    if args.mode == "legacy":
+        step("model", load_model)
+        step("audio", audio.start)
+        step("warmup", warm)
+        step("led", led)
+        step("http", flask_up)
+        step("camera", open_camera)
+    else:
+        step("http", flask_up)
+        boot = Startup("bench")
+        boot.add("audio", audio.start)
+        boot.add("model", load_model)
+        boot.add("warmup", warm, after=("model",))
+        boot.add("camera", open_camera)
+        boot.add("led", led, required=False)
+        boot.start()
+        boot.wait()
+        for name, s in boot.subsystems.items():
+            steps[name if s.state == "ready" else f"{name} ({s.state})"] = s.seconds or 0.0
+    print(json.dumps({"t_start": t_start, "t_ready": time.time(), "steps": steps}), flush=True)
+    time.sleep(args.linger)
+
+
+# ───────────────── 부모: 자식 실행 + /call 두드리기 ─────────────────
+def run_mode(mode, args, port):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, "--port", str(port),
+           "--model", args.model, "--tts-dir", args.tts_dir, "--camera", args.camera,
+           "--ocr", args.ocr, "--ort-profile", args.ort_profile, "--linger", "2"]
+    t_spawn = time.time()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    sess = requests.Session()
+    t_call = None
+    try:
+        while t_call is None and proc.poll() is None and time.time() - t_spawn < args.timeout:
+            try:
+                if sess.post(f"http://127.0.0.1:{port}/call", json={"bus": "77"}, timeout=0.2).ok:
+                    t_call = time.time()
+            except requests.RequestException:
+                time.sleep(0.005)
+        # 노드 로그 ([LED], [AUDIO] ...) 사이에서 결과 JSON 줄 찾기
+        line = ""
+        for line in proc.stdout:
+            if line.startswith("{"):
+                break
+    finally:
+        proc.kill()
+        proc.wait()
+    if not line.startswith("{"):
+        raise RuntimeError(f"{mode} 자식 프로세스가 결과 없이 종료")
+    out = json.loads(line)
+    return {"first_call_s": None if t_call is None else t_call - t_spawn,
+            "ready_s": out["t_ready"] - t_spawn,
+            "interpreter_s": out["t_start"] - t_spawn,
+            "steps": out["steps"]}
+
+
+def ensure_model(path):
+    if os.path.exists(path):
+        return path
+    from make_standin_model import build
+    standin = os.path.join(tempfile.gettempdir(), "standin_bus_number.onnx")
+    if not os.path.exists(standin):
+        build(standin)
+    print(f"[BENCH] {path} 없음 → stand-in 모델 사용 ({standin})")
+    return standin
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="/home/pi/bus_detection/models/bus_number.onnx")
+    ap.add_argument("--tts-dir", default="/home/pi/bus_detection/tts")
+    ap.add_argument("--camera", default="none", help="장치 번호, 영상 파일, none")
+    ap.add_argument("--ocr", default="tesseract-cli")
+    ap.add_argument("--ort-profile", default="opi-shared")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--port", type=int, default=5090)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--no-imports", action="store_true", help="import 시간 측정 생략")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    ap.add_argument("--child", choices=("legacy", "staged"), help=argparse.SUPPRESS)
+    ap.add_argument("--linger", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        args.mode = args.child
+        child(args)
+        return
+
+    args.model = ensure_model(args.model)
+    results = {"imports": {}, "startup": {}}
+
+    if not args.no_imports:
+        print("[BENCH] import 시간 (새 인터프리터마다 한 번)")
+        for m in HEAVY_MODULES:
+            t = import_time(m)
+            results["imports"][m] = t
+            print(f"  {m:<24}" + ("   (없음)" if t is None else f"{t * 1000:9.0f} ms"))
+
+    for mode in ("legacy", "staged"):
+        runs = [run_mode(mode, args, args.port) for _ in range(args.repeat)]
+        first = [r["first_call_s"] for r in runs if r["first_call_s"] is not None]
+        results["startup"][mode] = {
+            "first_call_s": float(np.median(first)) if first else None,
+            "ready_s": float(np.median([r["ready_s"] for r in runs])),
+            "interpreter_s": float(np.median([r["interpreter_s"] for r in runs])),
+            "steps": {k: float(np.median([r["steps"].get(k, 0.0) for r in runs])) for k in runs[0]["steps"]},
+        }
+
+    print(f"\n[BENCH] 기동 시간 (중앙값 {args.repeat}회, 프로세스 시작 기준 초)")
+    print(f"{'mode':<8}{'interp':>9}{'first /call':>13}{'ready':>9}   단계별 (staged 는 동시에 진행)")
+    for mode, r in results["startup"].items():
+        fc = "-" if r["first_call_s"] is None else f"{r['first_call_s']:.2f}"
+        steps = ", ".join(f"{k} {v:.2f}" for k, v in r["steps"].items())
+        print(f"{mode:<8}{r['interpreter_s']:9.2f}{fc:>13}{r['ready_s']:9.2f}   {steps}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# bench_yolo_decode.py  (YOLO 출력 디코더 마이크로 벤치마크)
+#
+# 기존 max(outs, key=...) 경로와 yolo_decoder.decode_yolo_output 을 같은 출력으로 비교.
+#
+#   1) 보드에서 실제 session.run 출력 캡처 (stop_node 모델/전처리 그대로 사용)
+#        python3 bench_yolo_decode.py --capture 200 --out yolo_outs.npz
+#   2) 캡처한 출력으로 비교 (아무 리눅스 PC 에서나 가능)
+#        python3 bench_yolo_decode.py --input yolo_outs.npz
+#   --input 을 생략하면 YOLOv5 모양 (25200, 6) 의 합성 출력으로 돈다.
+
+import argparse
+import time
+import numpy as np
+
+from yolo_decoder import decode_yolo_output, letterbox_params
+
+CONF_THRESHOLD = 0.30
+
+
+# ───────────────── 기존 경로 (stop_node 의 예전 구현) ─────────────────
+def legacy_best_box(outs):
+    outs = outs.squeeze()
+    if outs.size == 0:
+        return None
+    best = max(outs, key=lambda x: float(x[4]))
+    if float(best[4]) < CONF_THRESHOLD:
+        return None
+    return best[:4]
+
+
+# ───────────────── 입력 준비 ─────────────────
+def capture_outputs(n, out_path):
+    import cv2
+    from stop_node import make_yolo_input, load_vision
+    session = load_vision().session
+    input_name = session.get_inputs()[0].name
+
+    cap = cv2.VideoCapture(0)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    arrays = {}
+    try:
+        while len(arrays) < n:
+            ret, frame_bgr = cap.read()
+            if not ret: break
+            blob, _, _ = make_yolo_input(frame_bgr)
+            arrays[f"outs_{len(arrays)}"] = session.run(None, {input_name: blob})[0]
+    finally:
+        cap.release()
+    np.savez_compressed(out_path, **arrays)
+    print(f"[CAPTURE] {len(arrays)}개 출력 저장 → {out_path}")
+
+def synthetic_outputs(n, rows=25200, buses=2, seed=0):
+    rng = np.random.default_rng(seed)
+    outs = []
+    for _ in range(n):
+        o = np.empty((1, rows, 6), dtype=np.float32)
+        o[0, :, 0:2] = rng.uniform(0, 640, (rows, 2))
+        o[0, :, 2:4] = rng.uniform(8, 120, (rows, 2))
+        o[0, :, 4] = rng.beta(0.3, 60, rows)        # 대부분 낮은 신뢰도
+        o[0, :, 5] = 1.0
+        for b in range(buses):                      # 버스 주변에 겹친 고신뢰 박스 몇 개
+            hit = rng.choice(rows, 5, replace=False)
+            o[0, hit, 0] = 160 + 320 * b + rng.normal(0, 2, 5)
+            o[0, hit, 1] = 320 + rng.normal(0, 2, 5)
+            o[0, hit, 2:4] = (90, 40)
+            o[0, hit, 4] = rng.uniform(0.6, 0.95, 5)
+        outs.append(o)
+    return outs
+
+def load_outputs(path):
+    data = np.load(path)
+    return [data[k] for k in sorted(data.files, key=lambda k: int(k.split("_")[-1]))]
+
+
+# ───────────────── 측정 ─────────────────
+def bench(name, fn, outs, repeat):
+    times = []
+    for _ in range(repeat):
+        for o in outs:
+            t0 = time.perf_counter()
+            fn(o)
+            times.append(time.perf_counter() - t0)
+    t = np.array(times) * 1e3
+    print(f"{name:<12} mean {t.mean():7.3f}ms  p50 {np.percentile(t, 50):7.3f}ms  "
+          f"p99 {np.percentile(t, 99):7.3f}ms")
+    return t.mean()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", help="--capture 로 저장한 .npz")
+    ap.add_argument("--capture", type=int, default=0, help="카메라에서 N개 출력 캡처")
+    ap.add_argument("--out", default="yolo_outs.npz")
+    ap.add_argument("--frames", type=int, default=50, help="합성 출력 개수")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.capture:
+        capture_outputs(args.capture, args.out)
+        return
+
+    outs = load_outputs(args.input) if args.input else synthetic_outputs(args.frames)
+    print(f"[BENCH] 출력 {len(outs)}개, shape {outs[0].shape}")
+
+    scale, pad, _ = letterbox_params(640, 480, 640)
+    decode = lambda o: decode_yolo_output(o, CONF_THRESHOLD, 0.45, scale, pad, (640, 480))
+
+    found = sum(len(decode(o)) for o in outs)
+    legacy_found = sum(legacy_best_box(o) is not None for o in outs)
+    print(f"[BENCH] 검출 박스: max() {legacy_found}개 / vectorized {found}개")
+
+    t_old = bench("max()", legacy_best_box, outs, args.repeat)
+    t_new = bench("vectorized", decode, outs, args.repeat)
+    print(f"[BENCH] speedup x{t_old / max(t_new, 1e-9):.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bus_vision.py  (버스 번호 인식 체인: 전처리 → YOLO → 디코드 → OCR)
+# 하드웨어(GPIO/카메라/오디오)에 의존하지 않아 stop_node 와 오프라인 벤치마크가 같이 쓴다.
+
+import os
+import time
+
+from model_manager import SESSION_PROFILES, create_session, select_model, model_input_size, warm_up
+from preprocess import YoloPreprocessor
+from yolo_decoder import decode_yolo_output
+from ocr_engine import create_ocr_engine
+
+DEFAULT_OCR_CONFIG = "--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789"
+
+
+class BusVision:
+    """
+    timings 인자로 dict 를 넘기면 단계별 소요 시간(초)을 기록한다.
+      "pre" 전처리, "infer" YOLO 추론, "decode" 출력 디코드, "ocr" 박스 OCR 합계
+    """
+
+    def __init__(self, model_path, variant="fp32", ort_profile="default", input_size=640,
+                 gamma=0.8, saturation=1.3, conf_threshold=0.30, nms_iou=0.45,
+                 ocr_backend="tesseract-cli", ocr_config=DEFAULT_OCR_CONFIG,
+                 ocr_model_path=None, ocr_profile="single"):
+        self.model_file = select_model(model_path, variant)
+        self.ort_profile = ort_profile
+        self.session = create_session(self.model_file, ort_profile)
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = model_input_size(self.session, input_size)   # 축소 모델이면 320 등
+        self.conf_threshold = conf_threshold
+        self.nms_iou = nms_iou
+        # 감마/채도 LUT 는 한 번만 만들고, 보정·레터박스·정규화를 재사용 버퍼 위에서 한 번에 처리
+        self.pre = YoloPreprocessor(gamma, saturation, self.input_size)
+        self.ocr = create_ocr_engine(ocr_backend, ocr_config, ocr_model_path,
+                                     lambda path: create_session(path, ocr_profile))
+
+    def make_input(self, frame_bgr):
+        """ 색 보정 + 레터박스 + 정규화 → (blob, scale, pad). blob 은 다음 호출에서 재사용됨 """
+        return self.pre(frame_bgr)
+
+    def detect(self, frame_bgr, timings=None):
+        """ YOLO 단계: 프레임 안의 모든 번호판 박스 [(x1,y1,x2,y2,conf), ...] 반환 """
+        t0 = time.perf_counter()
+        blob, scale, pad = self.pre(frame_bgr)
+        t1 = time.perf_counter()
+        outs = self.session.run(None, {self.input_name: blob})[0]
+        t2 = time.perf_counter()
+        boxes = decode_yolo_output(outs, self.conf_threshold, self.nms_iou,
+                                   scale, pad, (frame_bgr.shape[1], frame_bgr.shape[0]))
+        if timings is not None:
+            timings["pre"], timings["infer"] = t1 - t0, t2 - t1
+            timings["decode"] = time.perf_counter() - t2
+        return boxes
+
+    def read(self, frame_bgr, box, timings=None):
+        """ OCR 단계: 원본 프레임의 박스 영역만 색 보정해서 숫자만 읽어 반환 """
+        t0 = time.perf_counter()
+        x1, y1, x2, y2 = box[:4]
+        num = self.ocr.read(self.pre.correct(frame_bgr[y1:y2, x1:x2]))
+        if timings is not None:
+            timings["ocr"] = timings.get("ocr", 0.0) + time.perf_counter() - t0
+        return num
+
+    def run(self, frame_bgr, timings=None):
+        """ 프레임 한 장에서 읽힌 버스 번호 목록 (여러 대가 동시에 들어와도 모두 반환) """
+        boxes = self.detect(frame_bgr, timings)
+        nums = [self.read(frame_bgr, box, timings) for box in boxes]
+        return [n for n in nums if n]
+
+    def warm_up(self, runs=3):
+        return warm_up(self.session, runs, self.input_size)
+
+    @property
+    def threads(self):
+        """ 지금 YOLO 세션의 intra 스레드 수 (0 = ORT 기본값, 코어 수) """
+        return self.session.get_session_options().intra_op_num_threads or os.cpu_count()
+
+    def set_threads(self, intra):
+        """
+        YOLO 세션을 intra 스레드로 다시 만들어 교체 (governor.py).
+        새 세션을 만들고 워밍업하는 동안은 기존 세션으로 계속 추론하고, 참조만 바꿔 끼운다.
+        """
+        profile = SESSION_PROFILES[self.ort_profile] if isinstance(self.ort_profile, str) else self.ort_profile
+        session = create_session(self.model_file, dict(profile, intra=intra))
+        warm_up(session, 1, self.input_size)
+        self.session = session
@@ -0,0 +1,98 @@
+# button_events.py  (call_node 버튼 이벤트 파이프라인)
+#
+# GPIO 엣지 콜백은 타임스탬프만 찍어서 큐에 넣고 즉시 반환한다.
+# 디바운스와 실제 처리(TTS, 네트워크 전송)는 워커 스레드가 큐를 비우면서 한다.
+# 디바운스는 핀마다 따로 도는 상태 기계이고, 판단은 큐에 들어간 시각이 아니라
+# 엣지가 발생한 시각 기준이라 워커가 늦게 깨어나도 결과가 같다.
+
+import itertools
+import queue
+import threading
+import time
+
+
+class ButtonEvent:
+    __slots__ = ("pin", "bus", "t_edge", "t_wall", "seq")
+
+    def __init__(self, pin, bus, t_edge, t_wall, seq):
+        self.pin = pin
+        self.bus = bus
+        self.t_edge = t_edge     # time.monotonic() 기준 엣지 시각 (지연 측정용)
+        self.t_wall = t_wall     # time.time() 기준 엣지 시각 (다른 노드로 전달용)
+        self.seq = seq
+
+    def since_edge_ms(self, t=None):
+        return ((t or time.monotonic()) - self.t_edge) * 1000.0
+
+
+class PinDebouncer:
+    """
+    핀 하나의 디바운스 상태 기계.
+      IDLE    --엣지-->  LOCKED (눌림 인정, lock_until = t + window)
+      LOCKED  --엣지, t < lock_until--> LOCKED (채터링으로 보고 버림, 잠금은 그대로)
+      LOCKED  --t >= lock_until--> IDLE (창이 끝나면 풀림, 다음 엣지는 새 눌림)
+    채터링이 잠금을 늘리지 않으므로 접점이 계속 튀어도 창이 끝난 뒤의 진짜 눌림은 인정된다.
+    """
+    IDLE, LOCKED = "idle", "locked"
+
+    def __init__(self, window=0.3):
+        self.window = window
+        self.state = self.IDLE
+        self.lock_until = 0.0
+
+    def feed(self, t):
+        """ 엣지 시각 t 를 넣으면 눌림으로 인정할지 여부 반환 """
+        if self.state == self.LOCKED and t >= self.lock_until:
+            self.state = self.IDLE
+        if self.state == self.LOCKED:
+            return False
+        self.state = self.LOCKED
+        self.lock_until = t + self.window
+        return True
+
+
+class ButtonEventPipeline:
+    """
+    pipeline = ButtonEventPipeline(handle_press, debounce=0.3)
+    pipeline.start()
+    GPIO.add_event_detect(pin, GPIO.FALLING, callback=lambda ch, b=bus: pipeline.on_edge(ch, b))
+    handle_press(event) 는 워커 스레드에서 디바운스를 통과한 눌림마다 호출된다.
+    """
+
+    def __init__(self, handler, debounce=0.3, workers=1):
+        self.handler = handler
+        self.debounce = debounce
+        self.workers = workers
+        self._queue = queue.SimpleQueue()
+        self._debouncers = {}
+        self._deb_lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.counters = {"edges": 0, "accepted": 0, "bounced": 0}
+
+    def on_edge(self, pin, bus):
+        """ GPIO 콜백에서 호출. 시각만 기록하고 바로 반환 """
+        self._queue.put(ButtonEvent(pin, bus, time.monotonic(), time.time(), next(self._seq)))
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"button-worker-{i}", daemon=True).start()
+
+    def _accept(self, ev):
+        with self._deb_lock:
+            self.counters["edges"] += 1
+            deb = self._debouncers.get(ev.pin)
+            if deb is None:
+                deb = self._debouncers[ev.pin] = PinDebouncer(self.debounce)
+            ok = deb.feed(ev.t_edge)
+            self.counters["accepted" if ok else "bounced"] += 1
+            return ok
+
+    def _worker(self):
+        while True:
+            ev = self._queue.get()
+            if not self._accept(ev):
+                continue
+            try:
+                self.handler(ev)
+            except Exception as e:
+                print(f"[ERROR] 버튼 처리 실패 ({ev.bus}): {e}")
@@ -1,9 +1,15 @@
 import threading
 import time
-import requests
-import OPi.GPIO as GPIO
-import subprocess, os
+import hal
 from flask import Flask, request
+from audio_engine import AudioEngine, PRIORITY_FEEDBACK
+from button_events import ButtonEventPipeline
+from dispatcher import Dispatcher
+from event_bus import EventBusServer, RecentIds
+from http_server import serve_in_thread
+from coordinator import start_registration
+from tracing import Tracer, new_trace_id
+from metrics import MetricsRegistry, add_metrics_endpoint
 
 # ---------------- 설정 (물리 핀 번호 BOARD 기준) ----------------
 # 주의: 보드의 실제 핀 번호를 확인하세요! 
@@ -21,70 +27,139 @@ BUTTON_PINS = {
 PI_STOP_URL   = "http://172.30.1.36:5000/call"
 PI_DRIVER_URL = "http://172.30.1.45:5000/call"
 
+# "bus" = 지속 TCP 이벤트 버스로 전송 (ACK 없으면 위 HTTP 주소로 대체), "http" = 기존 방식
+TRANSPORT     = "bus"
+BUS_PORT      = 5100
+PI_STOP_BUS   = ("172.30.1.36", 5100)
+PI_DRIVER_BUS = ("172.30.1.45", 5100)
+
+# 중앙 코디네이터 (coordinator.py). 설정하면 CALL 을 코디네이터로만 보내고,
+# 코디네이터가 이 정류장의 stop 노드와 해당 노선 기사 단말에 전달한다. None 이면 직접 전송.
+COORDINATOR_URL = None          # 예) "http://172.30.1.10:5200"
+COORDINATOR_BUS = ("172.30.1.10", 5300)
+STOP_ID   = "광주대학교 정류장"
+NODE_ID   = "call-gwangju-univ"
+NODE_ADDR = "172.30.1.100"      # 코디네이터가 RELEASE 를 보낼 이 노드 주소
+
+DEBOUNCE_SEC = 0.3   # 핀별 디바운스 시간
+
+HTTP_PORT    = 5001
+HTTP_SERVER  = "waitress"   # "waitress" (스레드 풀 WSGI) | "werkzeug" (기존 app.run)
+HTTP_THREADS = 2
+
+TRACE_DIR = "/home/pi/bus_detection/trace"   # 호출별 구간 기록 (trace_report.py), None 이면 끔
+TTS_DIR   = "/home/pi/bus_detection/tts"
+
+# 시뮬레이션 (HAL_BACKEND=sim, sim_system.py): 가상 승객이 분당 이 횟수만큼 임의의 버튼을 누름
+SIM_PRESS_RATE = 0
+SIM_SEED       = None
+
+hal.apply_config(globals())     # NODE_CONFIG 로 위 설정값 덮어쓰기
+GPIO = hal.load_gpio()
+
 # ---------------- 상태 ----------------
 active_calls = set()
-last_pressed = {} # 소프트웨어 디바운스용
+call_traces = {}                # 버스 번호 → (trace id, 누른 시각)
+calls_lock = threading.Lock()   # 버튼 워커와 Flask 스레드가 함께 사용
+tracer = Tracer("call", TRACE_DIR)
+metrics = MetricsRegistry()     # GET /metrics
 
 # ---------------- TTS 재생 ----------------
-TTS_DIR = "/home/pi/bus_detection/tts"
-play_lock = threading.Lock()
+audio = AudioEngine(TTS_DIR, AMP_SD_PIN, GPIO, sink=hal.audio_sink())
+audio.register_metrics(metrics)
 
 def play_tts(bus, kind):
-    files = []
-    for lang in ("ko","en"):
-        path = os.path.join(TTS_DIR, f"{bus}_{kind}_{lang}.mp3")
-        if os.path.isfile(path):
-            files.append(path)
-    if files:
-        with play_lock:
-            try:
-                GPIO.output(AMP_SD_PIN, GPIO.HIGH)
-                time.sleep(0.05)
-                # mpg123 재생
-                subprocess.run(["mpg123", "-q"] + files, check=False)
-            finally:
-                GPIO.output(AMP_SD_PIN, GPIO.LOW)
+    # 캐시된 클립을 큐에 넣고 바로 반환 (mpg123 프로세스 없음)
+    audio.play([f"{bus}_{kind}_ko", f"{bus}_{kind}_en"], PRIORITY_FEEDBACK)
 
 # ---------------- 버튼 동작 ----------------
-def on_button_pressed(bus):
-    # 소프트웨어 디바운스 (0.3초 이내 중복 클릭 방지)
-    current_time = time.time()
-    if current_time - last_pressed.get(bus, 0) < 0.3:
-        return
-    last_pressed[bus] = current_time
-
-    if bus in active_calls:
+# GPIO 콜백은 시각만 찍어 큐에 넣고, 아래 on_button_pressed 는 워커 스레드에서 실행된다.
+# CALL 은 stop / driver 로 동시에, 노드별 keep-alive 연결 + 실패 시 재시도
+dispatcher = Dispatcher(TRANSPORT, timeout=0.5)
+if COORDINATOR_URL:
+    dispatcher.add_peer("coord", COORDINATOR_URL + "/event", bus_addr=COORDINATOR_BUS)
+else:
+    dispatcher.add_peer("stop", PI_STOP_URL, bus_addr=PI_STOP_BUS)
+    dispatcher.add_peer("driver", PI_DRIVER_URL, bus_addr=PI_DRIVER_BUS)
+dispatcher.register_metrics(metrics)
+
+m_edge_to_handled = metrics.histogram("call_edge_to_handled_seconds", "버튼 엣지 → 워커 처리 시작 (디바운스/큐 대기)")
+m_calls = {k: metrics.counter("call_presses_total", "디바운스 통과한 버튼 입력", result=k)
+           for k in ("new", "already")}
+metrics.gauge_fn("call_active_calls", "해제를 기다리는 호출 수", lambda: len(active_calls))
+
+def m_press_to_dispatch(peer):
+    return metrics.histogram("call_press_to_dispatch_seconds", "버튼 엣지 → peer 전송 완료 (ACK/HTTP 200)",
+                             peer=peer)
+
+def on_button_pressed(ev):
+    bus = ev.bus
+    with calls_lock:
+        already = bus in active_calls
+        active_calls.add(bus)
+
+    if already:
+        m_calls["already"].inc()
         print(f"[BUTTON] {bus} 이미 호출 중")
         play_tts(bus, "already")
         return
 
-    print(f"[BUTTON] {bus} 새 호출 전송")
-    active_calls.add(bus)
-    play_tts(bus, "select")
-    
-    payload = {"type": "CALL", "bus": bus, "stop": "광주대학교 정류장"}
-    for url in [PI_STOP_URL, PI_DRIVER_URL]:
-        try:
-            requests.post(url, json=payload, timeout=0.5)
-        except:
-            pass
+    # 호출 한 건의 trace id: CALL → 도착 → RELEASE 까지 모든 노드가 같은 id 로 기록
+    trace = new_trace_id()
+    t_handled = time.time()
+    m_calls["new"].inc()
+    m_edge_to_handled.observe(ev.since_edge_ms() / 1000.0)
+    tracer.span(trace, "gpio_edge", ev.t_wall, t_handled, bus=bus, pin=ev.pin)   # 엣지 → 워커 처리 시작
+    print(f"[BUTTON] {bus} 새 호출 전송 (엣지 후 {ev.since_edge_ms():.1f}ms)")
+    play_tts(bus, "select")   # 오디오 큐에 넣기만 하고 바로 전송 시작
+
+    payload = {"type": "CALL", "bus": bus, "stop": STOP_ID, "pressed_at": ev.t_wall, "caller": NODE_ID,
+               "trace": trace}
+    with calls_lock:
+        call_traces[bus] = (trace, ev.t_wall)
+    def on_sent(peer, ok, latency_ms):
+        if ok:
+            m_press_to_dispatch(peer).observe(ev.since_edge_ms() / 1000.0)
+            print(f"[NOTIFY] {bus} → {peer} (엣지 후 {ev.since_edge_ms():.1f}ms, 요청 {latency_ms:.1f}ms)")
+        tracer.span(trace, "call_send", t_handled, time.time(), peer=peer, ok=ok)
+    dispatcher.send(payload, on_done=on_sent)
+
+buttons = ButtonEventPipeline(on_button_pressed, debounce=DEBOUNCE_SEC)
+for _key in ("edges", "bounced"):
+    metrics.counter_fn(f"call_gpio_{_key}_total", f"GPIO 엣지 ({_key})", lambda k=_key: buttons.counters[k])
 
 # ---------------- Flask 서버 ----------------
 app = Flask(__name__)
+add_metrics_endpoint(app, metrics)
+
+def release(bus, trace=None):
+    with calls_lock:
+        released = bool(bus) and bus in active_calls
+        active_calls.discard(bus)
+        trace_id, pressed_at = call_traces.pop(bus, (None, None))
+    if released:
+        print(f"[RESET] {bus} 해제 완료")
+        # 누른 순간 → 해제 수신까지 전체 (trace 가 안 실려 와도 이 노드가 기억한 id 로 기록)
+        tracer.span(trace or trace_id, "release_received", pressed_at or time.time(), time.time(), bus=bus)
+
+def on_bus_event(msg_type, data):
+    if msg_type == "RELEASE":
+        release(data.get("bus"), data.get("trace"))
+
+recent_ids = RecentIds()    # 이벤트 버스 + HTTP 대체 전송 공용 중복 제거
 
 @app.route("/release", methods=["POST"])
 def release_bus():
     data = request.get_json(force=True)
-    bus = data.get("bus")
-    if bus and bus in active_calls:
-        active_calls.remove(bus)
-        print(f"[RESET] {bus} 해제 완료")
+    if not recent_ids.first_time(data.get("msg_id")):
+        return {"ok": True, "duplicate": True}, 200
+    release(data.get("bus"), data.get("trace"))
     return {"ok": True}, 200
 
 # ---------------- 메인 실행 ----------------
 if __name__ == "__main__":
     # 1. 이전 설정 강제 초기화 (unexport)
-    for pin in [AMP_SD_PIN] + list(BUTTON_PINS.values()):
+    for pin in ([AMP_SD_PIN] + list(BUTTON_PINS.values())) if hal.HAL_BACKEND == "board" else ():
         try:
             with open(f"/sys/class/gpio/unexport", "w") as f:
                 f.write(str(pin))
@@ -92,7 +167,13 @@ if __name__ == "__main__":
             pass
 
     print("[READY] Pi-Call 시작 (Orange Pi Mode)")
-    threading.Thread(target=lambda: app.run(host="0.0.0.0", port=5001), daemon=True).start()
+    serve_in_thread(app, "0.0.0.0", HTTP_PORT, HTTP_SERVER, HTTP_THREADS)
+    if TRANSPORT == "bus":
+        EventBusServer("0.0.0.0", BUS_PORT, on_bus_event, seen=recent_ids).start()
+    if COORDINATOR_URL:
+        start_registration(dispatcher, "coord", {
+            "role": "call", "node_id": NODE_ID, "stop": STOP_ID,
+            "http": f"http://{NODE_ADDR}:{HTTP_PORT}", "bus_port": BUS_PORT if TRANSPORT == "bus" else None})
 
     # 2. GPIO 초기화 (BOARD 모드)
     GPIO.setwarnings(False)
@@ -100,17 +181,21 @@ if __name__ == "__main__":
 
     # 3. 앰프 핀 설정
     GPIO.setup(AMP_SD_PIN, GPIO.OUT, initial=GPIO.LOW)
+    audio.start()
 
     # 4. 버튼 핀 설정 (소프트웨어 풀업 미사용)
+    buttons.start()
     for bus, pin in BUTTON_PINS.items():
         try:
             GPIO.setup(pin, GPIO.IN) # pull_up_down 옵션 제거
-            # 디바운스 옵션 없이 이벤트 등록
+            # 디바운스는 ButtonEventPipeline 이 핀별로 처리, 콜백은 큐에 넣기만 함
             GPIO.add_event_detect(pin, GPIO.FALLING, 
-                                  callback=lambda ch, b=bus: on_button_pressed(b))
+                                  callback=lambda ch, b=bus: buttons.on_edge(ch, b))
             print(f"[GPIO] Pin {pin} ({bus}번) 설정 완료")
         except Exception as e:
             print(f"[ERROR] Pin {pin} 설정 실패: {e}")
+    if SIM_PRESS_RATE > 0 and isinstance(GPIO, hal.SimGPIO):
+        GPIO.start_passengers(BUTTON_PINS.values(), SIM_PRESS_RATE, SIM_SEED)
 
     try:
         while True:
@@ -0,0 +1,443 @@
+# coordinator.py  (중앙 배차 코디네이터)
+#
+# 정류장/버스/기사 단말이 많아지면 노드마다 상대 주소를 하드코딩할 수 없다.
+# 노드는 시작할 때 코디네이터에 자기 역할과 ID 를 등록하고, 이벤트는 코디네이터가 중계한다.
+#
+#   등록  : {"type": "REGISTER", "role": "stop"|"call"|"driver", "node_id": ...,
+#            "stop": 정류장 ID (stop/call), "bus": 노선 번호 (driver),
+#            "http": "http://IP:PORT", "bus_port": 5100 | None}
+#   호출  : call   → 코디네이터 {"type": "CALL", "stop", "bus", "caller"}
+#           코디네이터 → 해당 정류장의 stop 노드 + 해당 노선의 driver 단말에만 CALL
+#   도착  : stop   → 코디네이터 {"type": "ARRIVAL", "stop", "bus"}
+#           코디네이터 → 호출한 call 노드에 RELEASE, 해당 노선 driver 단말에 ARRIVAL
+#
+# 대기 호출은 (stop, bus) 키로 샤딩된 테이블에 둔다 (샤드마다 락, 라우팅 스레드 간 경합 최소화).
+# 노드는 REGISTER_INTERVAL 마다 다시 등록하고, NODE_TTL 동안 소식이 없으면 라우팅에서 빠진다.
+# 전달은 dispatcher.Dispatcher (이벤트 버스 우선, ACK 없으면 HTTP) 로 한다.
+#
+#   python3 coordinator.py                                   # 서비스 실행 (HTTP 5200, 버스 5300)
+#   python3 coordinator.py --simulate --stops 50 --buses 200 --events 200000 --workers 4
+
+import argparse
+import threading
+import time
+import zlib
+import numpy as np
+from flask import Flask, request
+
+from dispatcher import Dispatcher
+from event_bus import EventBusServer, RecentIds
+
+# ───────────────── 설정값 ─────────────────
+HOST          = "0.0.0.0"
+PORT          = 5200
+BUS_PORT      = 5300
+TRANSPORT     = "bus"
+NODE_TTL      = 90.0    # 이 시간(초) 동안 재등록이 없으면 노드 제외
+PENDING_TTL   = 1800.0  # 도착 없이 이만큼 지난 호출은 정리
+SHARDS        = 16
+REGISTER_INTERVAL = 30.0
+
+# 역할별로 받는 이벤트와 HTTP 호환 경로
+ROUTE_PATHS = {"CALL": "/call", "ARRIVAL": "/arrival", "RELEASE": "/release"}
+
+
+# ───────────────── 노드 등록부 ─────────────────
+class Node:
+    __slots__ = ("node_id", "role", "key", "http", "bus_addr", "last_seen")
+
+    def __init__(self, node_id, role, key, http, bus_addr):
+        self.node_id = node_id
+        self.role = role
+        self.key = key            # stop/call → 정류장 ID, driver → 노선 번호
+        self.http = http
+        self.bus_addr = bus_addr
+        self.last_seen = time.monotonic()
+
+
+class Registry:
+    def __init__(self, ttl=NODE_TTL):
+        self.ttl = ttl
+        self._nodes = {}
+        self._index = {}          # (role, key) → {node_id: Node}
+        self._lock = threading.Lock()
+
+    def register(self, info):
+        """ 등록/갱신. (Node, 새로 등록됐는지) 반환 """
+        role = info["role"]
+        key = str(info["bus"] if role == "driver" else info["stop"])
+        http = (info.get("http") or "").rstrip("/")
+        bus_addr = None
+        if info.get("bus_port"):
+            host = info.get("host") or http.split("//")[-1].split(":")[0]
+            bus_addr = (host, int(info["bus_port"]))
+        node = Node(info["node_id"], role, key, http, bus_addr)
+        with self._lock:
+            old = self._nodes.get(node.node_id)
+            if old is not None:
+                self._index.get((old.role, old.key), {}).pop(old.node_id, None)
+            self._nodes[node.node_id] = node
+            self._index.setdefault((role, key), {})[node.node_id] = node
+        return node, old is None
+
+    def lookup(self, role, key):
+        now = time.monotonic()
+        with self._lock:
+            nodes = self._index.get((role, str(key)))
+            if not nodes:
+                return []
+            return [n for n in nodes.values() if now - n.last_seen < self.ttl]
+
+    def get(self, node_id):
+        return self._nodes.get(node_id)
+
+    def expire(self):
+        now = time.monotonic()
+        with self._lock:
+            dead = [n for n in self._nodes.values() if now - n.last_seen >= self.ttl]
+            for n in dead:
+                del self._nodes[n.node_id]
+                self._index.get((n.role, n.key), {}).pop(n.node_id, None)
+        return dead
+
+    def snapshot(self):
+        with self._lock:
+            return [{"node_id": n.node_id, "role": n.role, "key": n.key, "http": n.http,
+                     "bus_addr": n.bus_addr, "age": round(time.monotonic() - n.last_seen, 1)}
+                    for n in self._nodes.values()]
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+# ───────────────── 대기 호출 테이블 (샤딩) ─────────────────
+class PendingCall:
+    __slots__ = ("stop", "bus", "caller", "created")
+
+    def __init__(self, stop, bus, caller):
+        self.stop = stop
+        self.bus = bus
+        self.caller = caller
+        self.created = time.monotonic()
+
+
+class PendingTable:
+    def __init__(self, shards=SHARDS):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, stop, bus):
+        # hash() 는 프로세스마다 달라서 결정적인 crc32 사용
+        return self._shards[zlib.crc32(f"{stop}\x00{bus}".encode("utf-8")) % len(self._shards)]
+
+    def add(self, stop, bus, caller=None):
+        """ (PendingCall, 새 호출인지) 반환 """
+        table, lock = self._shard(stop, bus)
+        with lock:
+            call = table.get((stop, bus))
+            if call is not None:
+                return call, False
+            call = table[(stop, bus)] = PendingCall(stop, bus, caller)
+            return call, True
+
+    def pop(self, stop, bus):
+        table, lock = self._shard(stop, bus)
+        with lock:
+            return table.pop((stop, bus), None)
+
+    def get(self, stop, bus):
+        table, lock = self._shard(stop, bus)
+        with lock:
+            return table.get((stop, bus))
+
+    def expire(self, ttl):
+        now = time.monotonic()
+        dead = []
+        for table, lock in self._shards:
+            with lock:
+                for key, call in list(table.items()):
+                    if now - call.created >= ttl:
+                        dead.append(table.pop(key))
+        return dead
+
+    def snapshot(self):
+        out = []
+        for table, lock in self._shards:
+            with lock:
+                out.extend({"stop": c.stop, "bus": c.bus, "caller": c.caller,
+                            "age": round(time.monotonic() - c.created, 1)} for c in table.values())
+        return out
+
+    def __len__(self):
+        return sum(len(table) for table, _ in self._shards)
+
+
+# ───────────────── 라우팅 ─────────────────
+class Router:
+    """ 이벤트 하나를 받아 [(Node, 이벤트 종류, payload)] 전달 목록을 만든다 (네트워크 없음) """
+
+    def __init__(self, registry, pending):
+        self.registry = registry
+        self.pending = pending
+        self.counters = {"decisions": 0, "calls": 0, "duplicates": 0, "arrivals": 0,
+                         "unmatched": 0, "deliveries": 0}
+        self._lock = threading.Lock()   # route() 는 여러 스레드(HTTP / 버스 연결)에서 동시에 불림
+
+    def route(self, msg_type, data):
+        out, outcome = self._route(msg_type, data)
+        with self._lock:
+            self.counters["decisions"] += 1
+            if outcome:
+                self.counters[outcome] += 1
+            self.counters["deliveries"] += len(out)
+        return out
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _route(self, msg_type, data):
+        """ (전달 목록, 결과 카운터 이름) """
+        if msg_type == "REGISTER":
+            self.registry.register(data)
+            return [], None
+        stop, bus = data.get("stop"), data.get("bus")
+        if not stop or not bus:
+            return [], None
+        out = []
+        if msg_type == "CALL":
+            _, is_new = self.pending.add(stop, bus, data.get("caller"))
+            if not is_new:
+                return [], "duplicates"
+            payload = {"type": "CALL", "stop": stop, "bus": bus, "trace": data.get("trace")}
+            for node in self.registry.lookup("stop", stop) + self.registry.lookup("driver", bus):
+                out.append((node, "CALL", payload))
+            return out, "calls"
+        if msg_type == "ARRIVAL":
+            call = self.pending.pop(stop, bus)
+            if call is None:
+                return [], "unmatched"
+            payload = {"stop": stop, "bus": bus, "trace": data.get("trace")}
+            caller = self.registry.get(call.caller) if call.caller else None
+            for node in ([caller] if caller is not None else self.registry.lookup("call", stop)):
+                out.append((node, "RELEASE", dict(payload, type="RELEASE")))
+            for node in self.registry.lookup("driver", bus):
+                out.append((node, "ARRIVAL", dict(payload, type="ARRIVAL")))
+            return out, "arrivals"
+        return out, None
+
+
+# ───────────────── 서비스 ─────────────────
+class Coordinator:
+    def __init__(self, transport=TRANSPORT, node_ttl=NODE_TTL, shards=SHARDS):
+        self.registry = Registry(node_ttl)
+        self.pending = PendingTable(shards)
+        self.router = Router(self.registry, self.pending)
+        self.dispatcher = Dispatcher(transport, timeout=0.5, max_attempts=4)
+        self._peer_lock = threading.Lock()
+        self.recent_ids = RecentIds()   # 이벤트 버스 + HTTP 대체 전송 공용 중복 제거
+        self.app = self._make_app()
+
+    def handle(self, msg_type, data):
+        for node, kind, payload in self.router.route(msg_type, data):
+            self.dispatcher.send(payload, peers=[self._peer_for(node, kind)], msg_type=kind)
+
+    def _peer_for(self, node, kind):
+        name = f"{node.node_id}/{kind}"
+        url = node.http + ROUTE_PATHS[kind]
+        with self._peer_lock:
+            peer = self.dispatcher.peers.get(name)
+            if peer is None or peer.url != url or peer.bus_addr != node.bus_addr:
+                self.dispatcher.add_peer(name, url, bus_addr=node.bus_addr)   # 바뀌었으면 기존 peer 정리 후 교체
+        return name
+
+    def _drop_peers(self, node):
+        """ 만료된 노드로 가는 peer (전송 스레드, 버스 연결) 정리 """
+        with self._peer_lock:
+            for kind in ROUTE_PATHS:
+                self.dispatcher.remove_peer(f"{node.node_id}/{kind}")
+
+    def _make_app(self):
+        app = Flask(__name__)
+
+        @app.route("/event", methods=["POST"])
+        def handle_event():
+            data = request.get_json(force=True)
+            msg_type = data.get("type")
+            if msg_type not in ("REGISTER", "CALL", "ARRIVAL"):
+                return {"ok": False, "error": "unknown type"}, 400
+            if msg_type == "REGISTER" and not (data.get("node_id") and data.get("role")):
+                return {"ok": False, "error": "node_id/role required"}, 400
+            if not self.recent_ids.first_time(data.get("msg_id")):
+                return {"ok": True, "duplicate": True}, 200
+            self.handle(msg_type, data)
+            return {"ok": True}, 200
+
+        @app.route("/nodes")
+        def list_nodes():
+            return {"nodes": self.registry.snapshot()}
+
+        @app.route("/pending")
+        def list_pending():
+            return {"pending": self.pending.snapshot()}
+
+        @app.route("/stats")
+        def stats():
+            return dict(self.router.stats(), nodes=len(self.registry), pending=len(self.pending))
+
+        return app
+
+    def _housekeeping(self):
+        while True:
+            time.sleep(10)
+            for n in self.registry.expire():
+                print(f"[COORD] {n.role} {n.node_id} 응답 없음 → 등록 해제")
+                self._drop_peers(n)
+            for c in self.pending.expire(PENDING_TTL):
+                print(f"[COORD] {c.stop} / {c.bus} 호출 만료")
+
+    def serve(self, host=HOST, port=PORT, bus_port=BUS_PORT):
+        from http_server import serve
+        if self.dispatcher.transport == "bus":
+            EventBusServer(host, bus_port, self.handle, seen=self.recent_ids).start()
+        threading.Thread(target=self._housekeeping, daemon=True).start()
+        print(f"[COORD] 코디네이터 시작 http://{host}:{port}/event")
+        serve(self.app, host, port, "waitress", 4)
+
+
+# ───────────────── 노드 쪽 등록 헬퍼 ─────────────────
+def start_registration(dispatcher, peer, info, interval=REGISTER_INTERVAL):
+    """ 노드 시작 시 호출. 코디네이터 peer 로 REGISTER 를 주기적으로 보냄 (재시작/만료 대비) """
+    payload = dict(info, type="REGISTER")
+
+    def loop():
+        while True:
+            dispatcher.send(payload, peers=[peer], msg_type="REGISTER")
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name="coord-register", daemon=True).start()
+
+
+# ───────────────── 시뮬레이션 (한 대에서) ─────────────────
+def simulate(args):
+    """
+    가상의 정류장/버스/기사 단말을 등록하고 CALL/ARRIVAL 을 workers 개 스레드로 쏟아부어
+    라우팅 결정 처리량과 결정당 지연을 잰다.
+    --sink bus 면 모든 가상 노드를 루프백 이벤트 버스 서버 하나(fleet)로 묶어 실제 전송까지 한다.
+    """
+    rng = np.random.default_rng(0)
+    stops = [f"S{i:03d}" for i in range(args.stops)]
+    buses = [str(100 + i) for i in range(args.buses)]
+
+    fleet_counts = {"CALL": 0, "RELEASE": 0, "ARRIVAL": 0}
+    fleet_lock = threading.Lock()
+    bus_port = None
+    if args.sink == "bus":
+        def fleet(msg_type, data):
+            with fleet_lock:
+                fleet_counts[msg_type] = fleet_counts.get(msg_type, 0) + 1
+        bus_port = EventBusServer("127.0.0.1", 0, fleet).start().port
+
+    coord = Coordinator("bus", args.node_ttl, args.shards)
+    base = {"http": "http://127.0.0.1:1", "bus_port": bus_port, "host": "127.0.0.1"}
+    for s in stops:
+        coord.registry.register(dict(base, role="stop", node_id=f"stop-{s}", stop=s))
+        coord.registry.register(dict(base, role="call", node_id=f"call-{s}", stop=s))
+    for b in buses:
+        for k in range(args.drivers_per_bus):
+            coord.registry.register(dict(base, role="driver", node_id=f"drv-{b}-{k}", bus=b))
+    print(f"[SIM] 노드 {len(coord.registry)}개 등록 (정류장 {len(stops)}, 노선 {len(buses)}, "
+          f"노선당 기사 {args.drivers_per_bus}), 샤드 {args.shards}, 스레드 {args.workers}")
+
+    # 호출과 도착을 번갈아: 새 호출은 50 이벤트 뒤에 ARRIVAL 하나. 이미 대기 중인 (stop, bus) 호출은
+    # 중복 CALL 로 보내고 ARRIVAL 을 더 만들지 않음 → 순서가 지켜지면 매칭 실패 0
+    pairs = list(zip(rng.integers(0, len(stops), args.events // 2),
+                     rng.integers(0, len(buses), args.events // 2)))
+    events, waiting, arrivals = [], set(), {}
+    for i, (si, bi) in enumerate(pairs):
+        key = (stops[si], buses[bi])
+        events.append(("CALL", {"stop": key[0], "bus": key[1], "caller": f"call-{key[0]}"}))
+        if key not in waiting:
+            waiting.add(key)
+            arrivals.setdefault(i + 50, []).append(key)
+        for stop, bus in arrivals.pop(i, ()):
+            waiting.discard((stop, bus))
+            events.append(("ARRIVAL", {"stop": stop, "bus": bus}))
+    for i in sorted(arrivals):                                  # 끝에 남은 호출도 모두 도착 처리
+        events.extend(("ARRIVAL", {"stop": stop, "bus": bus}) for stop, bus in arrivals[i])
+
+    handle = coord.handle if args.sink == "bus" else coord.router.route
+    if args.sink == "bus":
+        # 첫 이벤트 전에 fleet 연결이 열려 있도록
+        coord.handle("CALL", {"stop": stops[0], "bus": buses[0]})
+        coord.handle("ARRIVAL", {"stop": stops[0], "bus": buses[0]})
+        while not all(c.connected for c in coord.dispatcher.bus_clients.values()):
+            time.sleep(0.01)
+
+    lat = np.zeros(len(events))
+    def worker(idx):
+        for i in idx:
+            if args.rate:
+                wait = t0 + i / args.rate - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            t1 = time.perf_counter()
+            handle(*events[i])
+            lat[i] = time.perf_counter() - t1
+
+    # 같은 (stop, bus) 이벤트는 같은 스레드로 (스레드끼리 속도가 달라도 CALL → ARRIVAL 순서 유지)
+    parts = [[] for _ in range(args.workers)]
+    for i, (_, data) in enumerate(events):
+        key = f"{data['stop']}\x00{data['bus']}".encode("utf-8")
+        parts[zlib.crc32(key) % args.workers].append(i)
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in parts]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+
+    c = coord.router.stats()
+    us = lat * 1e6
+    print(f"[SIM] 이벤트 {len(events)}개 {wall:.2f}s → {len(events) / wall:,.0f} 결정/s "
+          f"(결정당 p50 {np.percentile(us, 50):.1f}us, p99 {np.percentile(us, 99):.1f}us)")
+    print(f"[SIM] 호출 {c['calls']}, 중복 {c['duplicates']}, 도착 {c['arrivals']}, 매칭 실패 {c['unmatched']}, "
+          f"전달 {c['deliveries']}, 남은 대기 {len(coord.pending)}")
+    ok = not c["unmatched"] and not len(coord.pending)
+    if not ok:
+        print(f"[FAIL] 매칭 실패 {c['unmatched']}, 남은 대기 {len(coord.pending)} "
+              f"(ARRIVAL 이 CALL 보다 먼저 처리됨)")
+    if args.sink == "bus":
+        deadline = time.monotonic() + 10
+        while sum(fleet_counts.values()) < c["deliveries"] and time.monotonic() < deadline:
+            time.sleep(0.1)
+        print(f"[SIM] fleet 수신 {fleet_counts} / 전달 {c['deliveries']}, "
+              f"HTTP 대체 {coord.dispatcher.bus_fallbacks}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--bus-port", type=int, default=BUS_PORT)
+    ap.add_argument("--transport", default=TRANSPORT, choices=("bus", "http"))
+    ap.add_argument("--shards", type=int, default=SHARDS)
+    ap.add_argument("--node-ttl", type=float, default=NODE_TTL)
+    ap.add_argument("--simulate", action="store_true", help="가상 노드로 라우팅 처리량 측정")
+    ap.add_argument("--stops", type=int, default=50)
+    ap.add_argument("--buses", type=int, default=200)
+    ap.add_argument("--drivers-per-bus", type=int, default=3)
+    ap.add_argument("--events", type=int, default=100000)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--sink", default="null", choices=("null", "bus"),
+                    help="null = 라우팅만, bus = 루프백 이벤트 버스로 실제 전달까지")
+    ap.add_argument("--rate", type=float, default=0, help="초당 이벤트 수 제한 (0 = 최대 속도)")
+    args = ap.parse_args()
+
+    if args.simulate:
+        if not simulate(args):
+            raise SystemExit(1)
+    else:
+        Coordinator(args.transport, args.node_ttl, args.shards).serve(args.host, args.port, args.bus_port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# dispatcher.py  (노드 간 HTTP 알림 전송기)
+#
+# - 상대 노드(peer)마다 keep-alive requests.Session 하나를 계속 재사용
+# - 상대마다 전용 전송 스레드가 있어서 느린 노드가 다른 노드 전송을 막지 않는다
+# - 실패한 메시지는 크기 제한 outbox 에 남아 지수 백오프로 재시도
+# - 상대별 성공/실패/재시도/폐기 횟수와 지연(ms) 통계
+#
+#   disp = Dispatcher()
+#   disp.add_peer("stop", "http://172.30.1.36:5000/call")
+#   disp.add_peer("driver", "http://172.30.1.45:5000/call")
+#   disp.send({"type": "CALL", "bus": "77"})                 # 모든 peer 로 동시에
+#   disp.send({"bus": "77"}, peers=["stop"], on_done=cb)     # cb(peer, ok, latency_ms)
+#   disp.remove_peer("driver")                               # 전송 스레드 종료, 안 쓰는 버스 연결 닫기
+#
+# transport="bus" 이고 add_peer 에 bus_addr 를 주면 event_bus 의 지속 TCP 연결로 먼저 보내고,
+# ACK 가 제때 오지 않으면 같은 메시지를 HTTP outbox 로 넘긴다 (기존 Flask 엔드포인트 = 호환 경로).
+
+import heapq
+import itertools
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from event_bus import EventBusClient
+
+
+class _Message:
+    __slots__ = ("payload", "attempts", "created", "on_done")
+
+    def __init__(self, payload, on_done):
+        self.payload = payload
+        self.attempts = 0
+        self.created = time.monotonic()
+        self.on_done = on_done
+
+
+class Peer:
+    def __init__(self, name, url, timeout=0.5, outbox_size=64, max_attempts=6,
+                 backoff=0.2, backoff_max=5.0):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+        self.outbox_size = outbox_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._outbox = []                 # (보낼 시각, 순번, 메시지) 힙
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.counters = {"sent": 0, "failed": 0, "retried": 0, "dropped": 0}
+        self._lat_sum = 0.0
+        self.last_latency_ms = None
+        self.max_latency_ms = 0.0
+        self._started = False     # 전송 스레드는 첫 메시지 때 시작 (peer 가 많아도 유휴 스레드 없음)
+        self._closed = False
+        self.bus_addr = None      # Dispatcher.add_peer 가 채움 (주소가 바뀌었는지 비교용)
+
+    def enqueue(self, msg, delay=0.0):
+        dropped = None
+        with self._cond:
+            if self._closed:
+                return
+            if not self._started:
+                self._started = True
+                threading.Thread(target=self._worker, name=f"dispatch-{self.name}", daemon=True).start()
+            if len(self._outbox) >= self.outbox_size:
+                # 가장 오래 기다린 메시지를 버린다
+                oldest = min(range(len(self._outbox)), key=lambda i: self._outbox[i][2].created)
+                dropped = self._outbox.pop(oldest)[2]
+                heapq.heapify(self._outbox)
+                self.counters["dropped"] += 1
+            heapq.heappush(self._outbox, (time.monotonic() + delay, next(self._seq), msg))
+            self._cond.notify()
+        if dropped is not None:
+            print(f"[WARN] {self.name} outbox 가득 참 → 메시지 폐기 {dropped.payload}")
+            self._finish(dropped, False, None)
+
+    def pending(self):
+        with self._cond:
+            return len(self._outbox)
+
+    def close(self):
+        """ 전송 스레드 종료. outbox 에 남은 메시지는 실패로 끝냄 """
+        with self._cond:
+            self._closed = True
+            left = [m for _, _, m in self._outbox]
+            self._outbox.clear()
+            self._cond.notify()
+        self.session.close()
+        for msg in left:
+            self._finish(msg, False, None)
+
+    def _finish(self, msg, ok, latency_ms):
+        if msg.on_done is not None:
+            try:
+                msg.on_done(self.name, ok, latency_ms)
+            except Exception as e:
+                print(f"[WARN] on_done 콜백 오류: {e}")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    if self._outbox:
+                        wait = self._outbox[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                _, _, msg = heapq.heappop(self._outbox)
+            self._deliver(msg)
+
+    def _deliver(self, msg):
+        msg.attempts += 1
+        t0 = time.monotonic()
+        try:
+            r = self.session.post(self.url, json=msg.payload, timeout=self.timeout)
+            if 400 <= r.status_code < 500:
+                # 요청 자체가 잘못된 경우는 다시 보내도 같으므로 재시도하지 않음
+                self.counters["failed"] += 1
+                print(f"[WARN] {self.name} 요청 거부 {r.status_code}: {msg.payload}")
+                self._finish(msg, False, None)
+                return
+            r.raise_for_status()
+        except Exception as e:
+            self.counters["failed"] += 1
+            if msg.attempts >= self.max_attempts:
+                self.counters["dropped"] += 1
+                print(f"[WARN] {self.name} 전송 포기 ({msg.attempts}회 실패): {e}")
+                self._finish(msg, False, None)
+                return
+            delay = min(self.backoff * (2 ** (msg.attempts - 1)), self.backoff_max)
+            self.counters["retried"] += 1
+            print(f"[WARN] {self.name} 전송 실패 ({msg.attempts}회), {delay:.1f}s 후 재시도: {e}")
+            self.enqueue(msg, delay)
+            return
+        latency_ms = (time.monotonic() - t0) * 1000.0
+        self.counters["sent"] += 1
+        self._lat_sum += latency_ms
+        self.last_latency_ms = latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self._finish(msg, True, latency_ms)
+
+    def stats(self):
+        sent = self.counters["sent"]
+        return dict(self.counters, pending=self.pending(),
+                    avg_ms=self._lat_sum / sent if sent else None,
+                    last_ms=self.last_latency_ms, max_ms=self.max_latency_ms)
+
+
+class Dispatcher:
+    def __init__(self, transport="http", **peer_defaults):
+        self.transport = transport
+        self.peers = {}
+        self.bus_clients = {}
+        self._bus_by_addr = {}    # 같은 노드로 가는 peer 끼리 TCP 연결 하나 공유
+        self.bus_fallbacks = 0
+        self._peer_defaults = peer_defaults
+
+    def add_peer(self, name, url, bus_addr=None, **kwargs):
+        """ peer 추가. 같은 이름이 이미 있으면 기존 전송 스레드/버스 연결을 정리하고 바꿈 """
+        if name in self.peers:
+            self.remove_peer(name)
+        bus_addr = tuple(bus_addr) if bus_addr else None
+        peer = self.peers[name] = Peer(name, url, **dict(self._peer_defaults, **kwargs))
+        peer.bus_addr = bus_addr
+        if self.transport == "bus" and bus_addr:
+            client = self._bus_by_addr.get(bus_addr)
+            if client is None:
+                client = self._bus_by_addr[bus_addr] = EventBusClient(*bus_addr, name=name).start()
+            self.bus_clients[name] = client
+        return peer
+
+    def remove_peer(self, name):
+        """ peer 제거. 전송 스레드를 멈추고, 그 주소를 쓰는 peer 가 더 없으면 버스 연결도 닫음 """
+        peer = self.peers.pop(name, None)
+        if peer is not None:
+            peer.close()
+        client = self.bus_clients.pop(name, None)
+        if client is not None and not any(c is client for c in self.bus_clients.values()):
+            for addr, c in list(self._bus_by_addr.items()):
+                if c is client:
+                    del self._bus_by_addr[addr]
+            client.close()
+        return peer is not None
+
+    def send(self, payload, peers=None, on_done=None, msg_type=None):
+        """ 지정한 peer(없으면 전부)로 보내도록 넣고 바로 반환 """
+        for name in (peers or self.peers):
+            client = self.bus_clients.get(name)
+            if client is None:
+                self.peers[name].enqueue(_Message(payload, on_done))
+            else:
+                self._send_bus(client, name, payload, on_done, msg_type or payload.get("type"))
+
+    def _send_bus(self, client, name, payload, on_done, msg_type):
+        def on_ack(_type, _data, latency_ms):
+            if on_done is not None:
+                on_done(name, True, latency_ms)
+
+        def on_fail(_type, _data):
+            self.bus_fallbacks += 1
+            peer = self.peers.get(name)
+            if peer is None:      # 그 사이 remove_peer 됨
+                return
+            print(f"[WARN] {name} 이벤트 버스 ACK 없음 → HTTP 로 전송")
+            # 버스 프레임은 도착했고 ACK 만 늦었을 수 있음 → 같은 id 를 실어 수신 측이 중복을 버리게
+            peer.enqueue(_Message(dict(payload, msg_id=msg_id), on_done))
+
+        msg_id = client.new_id()
+        client.send(msg_type, payload, on_ack=on_ack, on_fail=on_fail, msg_id=msg_id)
+
+    def register_metrics(self, registry, prefix="dispatch"):
+        """ peer 별 전송/실패/재시도/폐기 횟수와 outbox 길이를 /metrics 에 노출 (요청 시 읽기만 함) """
+        def collect():
+            for name, p in list(self.peers.items()):
+                labels = {"peer": name}
+                for key in ("sent", "failed", "retried", "dropped"):
+                    yield (f"{prefix}_{key}_total", "counter", f"peer 별 HTTP 전송 {key} 횟수",
+                           labels, p.counters[key])
+                yield f"{prefix}_pending", "gauge", "peer 별 outbox 에 남은 메시지 수", labels, p.pending()
+                if p.last_latency_ms is not None:
+                    yield (f"{prefix}_last_latency_seconds", "gauge", "peer 별 마지막 HTTP 전송 지연",
+                           labels, p.last_latency_ms / 1000.0)
+            for name, c in list(self.bus_clients.items()):
+                labels = {"peer": name}
+                yield f"{prefix}_bus_connected", "gauge", "이벤트 버스 연결 여부", labels, c.connected
+                yield f"{prefix}_bus_acked_total", "counter", "이벤트 버스 ACK 수", labels, c.acked
+                yield f"{prefix}_bus_failed_total", "counter", "이벤트 버스 ACK 시간 초과 수", labels, c.failed
+            yield f"{prefix}_bus_fallbacks_total", "counter", "이벤트 버스 → HTTP 대체 전송 수", {}, self.bus_fallbacks
+        registry.add_collector(collect)
+
+    def stats(self):
+        out = {name: p.stats() for name, p in self.peers.items()}
+        for name, c in self.bus_clients.items():
+            out[name].update(bus_connected=c.connected, bus_acked=c.acked, bus_failed=c.failed)
+        return out
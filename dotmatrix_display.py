@@ -2,92 +2,144 @@
 # 버튼으로 선택된 버스 번호를 표시하고, 도착 시 제거
 # Pi A (버튼, 스피커, OCR 감지) 시스템 연동 기반
 
-from luma.core.interface.serial import spi, noop
-from luma.led_matrix.device import max7219
-from luma.core.render import canvas
 from luma.core.legacy.font import proportional, LCD_FONT
-from luma.core.legacy import text
-from PIL import Image, ImageDraw
-import time
+from PIL import Image
+import numpy as np
+import os
 import threading
 
+# 출력 장치: "max7219" = 실제 SPI 모듈, "dummy" = luma 메모리 장치 (SPI 없는 PC/CI, 벤치마크용)
+LED_BACKEND = os.environ.get("LED_BACKEND", "max7219")
+
 # ─────────────────────────────
-# 도트매트릭스 초기화
-serial = spi(port=0, device=0, gpio=noop())
-device = max7219(
-    serial,
-    cascaded=4,
-    block_orientation=90,
-    rotate=0,
-    reverse_order=True  # ← [4][3][2][1] 순서로 설정
-)
-
-device.contrast(16)
+# 도트매트릭스 초기화 (import 시점이 아니라 start_led_display / init_device 에서)
+device = None
+
+def init_device(backend=LED_BACKEND):
+    global device
+    if backend == "max7219":
+        try:
+            from luma.core.interface.serial import spi, noop
+            from luma.led_matrix.device import max7219
+            serial = spi(port=0, device=0, gpio=noop())
+            device = max7219(
+                serial,
+                cascaded=4,
+                block_orientation=90,
+                rotate=0,
+                reverse_order=True  # ← [4][3][2][1] 순서로 설정
+            )
+            device.contrast(16)
+            return device
+        except Exception as e:
+            print(f"[WARN] MAX7219 초기화 실패 ({e}) → 메모리(dummy) 장치로 표시")
+    elif backend != "dummy":
+        print(f"[WARN] 알 수 없는 LED 백엔드 '{backend}' → 메모리(dummy) 장치로 표시")
+    from luma.core.device import dummy
+    device = dummy(width=WIDTH, height=8, mode="1")
+    return device
+
 font = proportional(LCD_FONT)
 pressed_buses = []
 pressed_lock = threading.Lock()
+pressed_cond = threading.Condition(pressed_lock)   # add_bus / remove_bus 가 표시 루프를 깨움
+_generation = 0                                    # 버스 목록이 바뀔 때마다 +1
+
+WIDTH         = 32      # 8x8 모듈 4개
+SCROLL_DELAY  = 0.15    # 스크롤 한 칸당 시간(초)
+
+# ─────────────────────────────
+# 프레임버퍼: 메시지가 바뀔 때 한 번만 만든다
+# 글자 → 열 바이트(bit j = j 번째 행) 캐시. luma.core.legacy.text 가 찍는 점과 같다.
+_glyphs = {}
+
+def glyph_columns(ch):
+    cols = _glyphs.get(ch)
+    if cols is None:
+        cols = _glyphs[ch] = bytes(font[ord(ch)])
+    return cols
+
+def message_columns(msg):
+    """ 메시지 전체를 열 단위로 비트 패킹한 프레임버퍼 (열 하나 = 1바이트) """
+    return b"".join(glyph_columns(c) for c in msg)
 
-# 텍스트 이미지를 만들기
-def render_text_image(msg, font):
-    width = sum([5 if c != ' ' else 2 for c in msg]) + 1
-    image = Image.new("1", (width, 8))
-    draw = ImageDraw.Draw(image)
-    text(draw, (0, 0), msg, font=font, fill=1)
-    return image
+def _columns_to_image(cols):
+    bits = np.unpackbits(np.frombuffer(cols, dtype=np.uint8)[None, :], axis=0, bitorder="little")
+    return Image.fromarray(bits.astype(bool))
+
+def build_windows(msg):
+    """
+    장치로 바로 보낼 32열 창 이미지 목록.
+    32열 이하면 한 장, 넘으면 스크롤 위치마다 한 장.
+    예전 루프처럼 창의 8열 타일 i 를 x = 24 - 8i 에 둔다 (모듈 배선 순서).
+    """
+    cols = message_columns(msg)
+    if len(cols) < WIDTH:
+        cols += bytes(WIDTH - len(cols))
+    windows = []
+    for offset in range(len(cols) - WIDTH + 1):
+        win = cols[offset:offset + WIDTH]
+        tiled = b"".join(win[i * 8:(i + 1) * 8] for i in reversed(range(4)))
+        windows.append(_columns_to_image(tiled))
+    return windows
 
 # LED 출력 루프
 def display_loop():
-    last_message = ""
+    seen = -1
+    windows, pos = [], 0
     while True:
-        with pressed_lock:
-            if not pressed_buses:
-                # 빈 메시지일 경우 화면 지우기
-                with canvas(device) as draw:
-                    draw.rectangle(device.bounding_box, outline=0, fill=0)
-                time.sleep(0.5)
-                last_message = ""
-                continue
-            message = ", ".join(pressed_buses) + "   "
-    
-        if message != last_message:
-            print(f"[LED] 현재 표시 메시지: {message}")
-            last_message = message
-    
-        text_img = render_text_image(message, font)
-        img_width = text_img.width
-    
-        if img_width <= 32:
-            sub_img = text_img.crop((0, 0, 32, 8))
-            with canvas(device) as draw:
-                for i in range(4):
-                    tile = sub_img.crop((i * 8, 0, (i + 1) * 8, 8))
-                    draw.bitmap((24 - i * 8, 0), tile, fill=1)
-            time.sleep(1)
-        else:
-            for offset in range(img_width - 32 + 1):
-                sub_img = text_img.crop((offset, 0, offset + 32, 8))
-                with canvas(device) as draw:
-                    for i in range(4):
-                        tile = sub_img.crop((i * 8, 0, (i + 1) * 8, 8))
-                        draw.bitmap((24 - i * 8, 0), tile, fill=1)
-                time.sleep(0.15)
+        with pressed_cond:
+            changed = _generation != seen
+            seen = _generation
+            buses = list(pressed_buses)
+
+        if changed:
+            # 새 메시지 프레임 생성은 락 밖에서 (add_bus / remove_bus 를 막지 않음)
+            if buses:
+                message = ", ".join(buses) + "   "
+                print(f"[LED] 현재 표시 메시지: {message}")
+                windows, pos = build_windows(message), 0
+            else:
+                windows = []
+                device.clear()
+
+        delay = None
+        if windows:
+            device.display(windows[pos])
+            if len(windows) > 1:
+                pos = (pos + 1) % len(windows)
+                delay = SCROLL_DELAY
+
+        # 스크롤 중이면 한 칸 시간만큼, 정지 화면이면 목록이 바뀔 때까지 대기
+        with pressed_cond:
+            if _generation == seen:
+                pressed_cond.wait(delay)
 
 
 # 외부에서 호출될 함수 (bus_station.py 등에서 사용)
-def start_led_display():
+def start_led_display(backend=None):
+    if device is None:
+        init_device(backend or LED_BACKEND)
     threading.Thread(target=display_loop, daemon=True).start()
     print("[LED] 디스플레이 루프 실행 중 - OCR 및 버튼과 연동하여 표시")
 
+def _changed():
+    global _generation
+    _generation += 1
+    pressed_cond.notify_all()
+
 def add_bus(bus):
-    with pressed_lock:
+    with pressed_cond:
         if bus not in pressed_buses:
             pressed_buses.append(bus)
+            _changed()
             print(f"[LED] 추가된 버스: {bus} → {pressed_buses}")
 
 def remove_bus(bus):
-    with pressed_lock:
+    with pressed_cond:
         if bus in pressed_buses:
             pressed_buses.remove(bus)
+            _changed()
             print(f"[LED] 제거된 버스: {bus} → {pressed_buses}")
             
 def is_bus_pressed(bus):
@@ -96,6 +148,6 @@ def is_bus_pressed(bus):
 
 def rebuild_display_from_pending(pending_calls_set):
     # 예: pending_calls_set == {"77"} 면 LED에는 "77"만 남겨라
-    with display_lock:
-        display_buses.clear()
-        display_buses.extend(sorted(pending_calls_set))
+    with pressed_cond:
+        pressed_buses[:] = sorted(pending_calls_set)
+        _changed()
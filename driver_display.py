@@ -5,142 +5,149 @@ import threading
 import subprocess
 import os
 import sys
-import textwrap
 import cv2
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
 from flask import Flask, request
-import OPi.GPIO as GPIO 
-import pygame 
+import hal
+from audio_engine import AudioEngine, PRIORITY_ALERT
+from event_bus import EventBusServer, RecentIds
+from http_server import serve
+from dispatcher import Dispatcher
+from coordinator import start_registration
+from notification_store import NotificationStore
+from tracing import Tracer
+from metrics import MetricsRegistry, add_metrics_endpoint
+from driver_gui import DriverRenderer, CONFIRM_RECT, EXIT_RECT, hit, create_output
 
 # ───────────────── 설정 ─────────────────
 HOST = "0.0.0.0"
 PORT = 5000
+HTTP_SERVER = "waitress"   # "waitress" | "werkzeug"
+HTTP_THREADS = 2
+NOTIFY_MAX = 8        # 화면에 남겨둘 최대 알림 수 (정류장+버스 단위)
+NOTIFY_TTL = 900.0    # 이 시간(초) 동안 다시 호출이 없으면 알림 자동 삭제
+DISPLAY_BACKEND = os.environ.get("DISPLAY_BACKEND", "window")   # "window" | "offscreen" (화면 없이)
+
+# 중앙 코디네이터에 이 단말이 맡은 노선(BUS_ID)을 등록하면 해당 노선 호출만 받는다.
+# None 이면 기존처럼 Pi-Call 이 직접 보내는 호출을 모두 받음.
+COORDINATOR_URL = None          # 예) "http://172.30.1.10:5200"
+COORDINATOR_BUS = ("172.30.1.10", 5300)
+BUS_ID    = "77"
+NODE_ID   = "driver-77-01"
+NODE_ADDR = "172.30.1.45"
 TTS_DIR = "/home/pi/bus_detection/tts"
 AMP_SD_PIN = 25
+TRANSPORT = "bus"   # "bus" 면 /call 과 함께 이벤트 버스(CALL, ARRIVAL)도 받음
+BUS_PORT = 5100
+TRACE_DIR = "/home/pi/bus_detection/trace"   # 호출별 구간 기록 (trace_report.py), None 이면 끔
 
-# ───────────────── GUI 디자인 설정 ─────────────────
-BG_COLOR = (30, 30, 30)
-CONTAINER_COLOR = (50, 50, 50)
-TITLE_COLOR = (255, 255, 255)
-TEXT_COLOR = (240, 240, 240)
-CONFIRM_BTN_COLOR = (50, 150, 50) # 녹색
-EXIT_BTN_COLOR = (100, 100, 100)
-BTN_TEXT_COLOR = (255, 255, 255)
-
-# 폰트 크기를 변수로 저장
-FONT_SIZE_TITLE = 28
-FONT_SIZE_TEXT = 22
-FONT_SIZE_BUTTON = 24
-
-# 폰트 로드
-font_path = "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf"
-try:
-    font_title = ImageFont.truetype(font_path, FONT_SIZE_TITLE)
-    font_text = ImageFont.truetype(font_path, FONT_SIZE_TEXT)
-    font_button = ImageFont.truetype(font_path, FONT_SIZE_BUTTON)
-except IOError:
-    print("[WARN] 나눔고딕 폰트 로드 실패. 기본 폰트를 사용합니다.")
-    font_title = ImageFont.load_default()
-    font_text = ImageFont.load_default()
-    font_button = ImageFont.load_default()
-
-# ───────────────── (수정) 버튼 위치 (480px 높이 기준) ─────────────────
-CONFIRM_RECT = (50, 400, 250, 460)   # (y 370->400, y 430->460)
-EXIT_RECT    = (550, 400, 750, 460)  # (y 370->400, y 430->460)
-BUTTON_RADIUS = 15
+hal.apply_config(globals())     # NODE_CONFIG 로 위 설정값 덮어쓰기 (sim_system.py)
+GPIO = hal.load_gpio()
 
 # ───────────────── 전역 변수 ─────────────────
-notifications = []
+notifications = NotificationStore(NOTIFY_MAX, NOTIFY_TTL)   # (stop, bus) → 알림 (ko, en)
 app = Flask(__name__)
-play_lock = threading.Lock()
 exit_requested = False
-
-# ───────────────── TTS 함수 (Pygame + GPIO) ─────────────────
-def play_tts(bus: str):
-    # (변경 없음)
-    ko_path = os.path.join(TTS_DIR, f"driver_{bus}_alert_ko.mp3")
-    en_path = os.path.join(TTS_DIR, f"driver_{bus}_alert_en.mp3")
-
-    files_to_play = []
-    if os.path.isfile(ko_path):
-        files_to_play.append(ko_path)
-    if os.path.isfile(en_path):
-        files_to_play.append(en_path)
-
-    if files_to_play:
-        with play_lock:
-            try:
-                GPIO.output(AMP_SD_PIN, GPIO.HIGH)
-                time.sleep(0.05)
-                for f in files_to_play:
-                    s = pygame.mixer.Sound(f)
-                    s.play()
-                    while pygame.mixer.get_busy():
-                        time.sleep(0.1)
-            except Exception as e:
-                print(f"[TTS-Pygame] 오디오 재생 중 오류: {e}")
-            finally:
-                GPIO.output(AMP_SD_PIN, GPIO.LOW)
-    else:
+tracer = Tracer("driver", TRACE_DIR)
+unrendered = {}          # trace id → 수신 시각 (화면에 처음 그려질 때 render 구간 기록)
+unrendered_lock = threading.Lock()
+
+metrics = MetricsRegistry()     # GET /metrics
+add_metrics_endpoint(app, metrics)
+m_update  = metrics.histogram("driver_update_seconds", "GUI 루프 한 번 (만료 + 변경 확인 + 다시 그리기)")
+m_render  = metrics.histogram("driver_render_seconds", "화면이 바뀐 프레임의 합성 + 출력 시간")
+m_frames  = metrics.counter("driver_frames_rendered_total", "다시 그린 프레임 수")
+m_recv    = {k: metrics.counter("driver_events_total", "수신한 이벤트", type=k) for k in ("CALL", "ARRIVAL")}
+metrics.gauge_fn("driver_notifications", "화면에 있는 알림 수", lambda: len(notifications))
+
+# ───────────────── TTS 함수 (오디오 엔진 + GPIO) ─────────────────
+audio = AudioEngine(TTS_DIR, AMP_SD_PIN, GPIO, sink=hal.audio_sink())
+audio.register_metrics(metrics)
+
+def play_tts(bus: str, trace=None):
+    names = [f"driver_{bus}_alert_ko", f"driver_{bus}_alert_en"]
+    if not any(audio.has(n) for n in names):
         print(f"[WARN] TTS 파일 없음 for driver_{bus}")
+        return
+    on_played = (lambda t0, t1: tracer.span(trace, "tts_alert", t0, t1)) if trace else None
+    audio.play(names, PRIORITY_ALERT, on_played=on_played)
 
-# ───────────────── GUI 헬퍼 함수 ─────────────────
-def draw_rounded_rectangle(draw, box, radius, fill):
-    # (변경 없음)
-    x1, y1, x2, y2 = box
-    draw.rectangle([x1+radius, y1, x2-radius, y2], fill=fill)
-    draw.rectangle([x1, y1+radius, x2, y2-radius], fill=fill)
-    draw.pieslice([x1, y1, x1+2*radius, y1+2*radius], 180, 270, fill=fill)
-    draw.pieslice([x2-2*radius, y1, x2, y1+2*radius], 270, 360, fill=fill)
-    draw.pieslice([x2-2*radius, y2-2*radius, x2, y2], 0, 90, fill=fill)
-    draw.pieslice([x1, y2-2*radius, x1+2*radius, y2], 90, 180, fill=fill)
-
-def get_text_center_pos(draw, box, text, font):
-    # (변경 없음)
-    (left, top, right, bottom) = draw.textbbox((0,0), text, font=font) 
-    tw = right - left
-    th = bottom - top
-    x1, y1, x2, y2 = box
-    x = x1 + (x2 - x1 - tw) // 2
-    y = y1 + (y2 - y1 - th) // 2 - (top) 
-    return (x, y)
-
+# ───────────────── GUI 입력 ─────────────────
 def on_mouse(event, x, y, flags, param):
-    # (변경 없음)
     global exit_requested
     if event == cv2.EVENT_LBUTTONDOWN:
-        if CONFIRM_RECT[0] <= x <= CONFIRM_RECT[2] and CONFIRM_RECT[1] <= y <= CONFIRM_RECT[3]:
+        if hit(CONFIRM_RECT, x, y):
             print("[GUI] '확인' 클릭. 알림 삭제.")
             notifications.clear()
-        elif EXIT_RECT[0] <= x <= EXIT_RECT[2] and EXIT_RECT[1] <= y <= EXIT_RECT[3]:
+        elif hit(EXIT_RECT, x, y):
             print("[GUI] '종료' 클릭.")
             exit_requested = True
 
+# ───────────────── 이벤트 처리 (이벤트 버스 / Flask 공용) ─────────────────
+def register_call(bus, stop, trace=None):
+    tracer.event(trace, "call_received", bus=bus)
+    m_recv["CALL"].inc()
+    msg_ko = f"{stop}에서 도움이 필요한 승객이 {bus}번 버스를 탑승할 예정입니다."
+    msg_en = f"A passenger requiring assistance will board bus {bus} at {stop}."
+
+    n, is_new = notifications.add(stop, bus, (msg_ko, msg_en))
+    print(f"[RECEIVED] {bus}번 호출 수신" + ("" if is_new else f" (중복 {n.count}회)"))
+    if trace:
+        with unrendered_lock:
+            unrendered[trace] = time.time()
+
+    play_tts(bus, trace)   # 큐에 넣고 바로 반환
+
+def clear_bus(bus, stop=None, trace=None):
+    """
+    정류장에서 도착 처리된 버스의 알림 삭제. 같은 버스를 다른 정류장에서 부른 알림은 남김.
+    stop 이 없는 (예전 HTTP 송신측) 도착은 모든 정류장의 해당 버스 알림을 지움.
+    """
+    tracer.event(trace, "arrival_received", bus=bus)
+    m_recv["ARRIVAL"].inc()
+    if stop:
+        notifications.remove(stop, bus)
+        print(f"[ARRIVAL] {stop} {bus}번 도착 → 알림 정리")
+    else:
+        notifications.remove_bus(bus)
+        print(f"[ARRIVAL] {bus}번 도착 → 알림 정리 (정류장 정보 없음, 전체)")
+
+def on_bus_event(msg_type, data):
+    bus = data.get("bus", "")
+    if not bus:
+        return
+    if msg_type == "CALL":
+        register_call(bus, data.get("stop", "정류장"), data.get("trace"))
+    elif msg_type == "ARRIVAL":
+        clear_bus(bus, data.get("stop"), data.get("trace"))
+
 # ───────────────── Flask 서버 (백그라운드 실행) ─────────────────
+recent_ids = RecentIds()    # 이벤트 버스 + HTTP 대체 전송 공용 중복 제거 (알림 TTS 두 번 재생 방지)
+
 @app.route("/call", methods=["POST"])
 def handle_call():
-    # (변경 없음)
     data = request.get_json(force=True)
     bus  = data.get("bus", "")
-    stop = data.get("stop", "정류장")
-
     if not bus:
         return {"ok": False, "error": "no bus"}, 400
+    if not recent_ids.first_time(data.get("msg_id")):
+        return {"ok": True, "duplicate": True}, 200
+    register_call(bus, data.get("stop", "정류장"), data.get("trace"))
+    return {"ok": True}, 200
 
-    msg_ko = f"{stop}에서 도움이 필요한 승객이 {bus}번 버스를 탑승할 예정입니다."
-    msg_en = f"A passenger requiring assistance will board bus {bus} at {stop}."
-
-    notifications.append((msg_ko, time.time()))
-    notifications.append((msg_en, time.time()))
-    print(f"[RECEIVED] {bus}번 호출 수신")
-    
-    threading.Thread(target=play_tts, args=(bus,), daemon=True).start()
+@app.route("/arrival", methods=["POST"])
+def handle_arrival():
+    data = request.get_json(force=True)
+    bus = data.get("bus", "")
+    if not bus:
+        return {"ok": False, "error": "no bus"}, 400
+    if not recent_ids.first_time(data.get("msg_id")):
+        return {"ok": True, "duplicate": True}, 200
+    clear_bus(bus, data.get("stop"), data.get("trace"))
     return {"ok": True}, 200
 
 def run_flask():
     print(f"[*] /call 대기 중: http://{HOST}:{PORT}/call")
-    app.run(host=HOST, port=PORT, debug=False, use_reloader=False)
+    serve(app, HOST, PORT, HTTP_SERVER, HTTP_THREADS)
 
 # ───────────────── 메인 (GUI 루프) ─────────────────
 def main():
@@ -153,8 +160,7 @@ def main():
         GPIO.setup(AMP_SD_PIN, GPIO.OUT, initial=GPIO.LOW)
         print(f"[GPIO] 앰프 셧다운 핀(GPIO {AMP_SD_PIN}) 초기화 완료 (LOW)")
         
-        pygame.mixer.init() 
-        print(f"[Pygame] 오디오 장치 초기화 성공 (시스템 기본 장치 사용)")
+        audio.start()
         
     except Exception as e:
         print(f"[ERROR] 하드웨어 초기화 실패: {e}")
@@ -162,63 +168,47 @@ def main():
         sys.exit(1)
 
     threading.Thread(target=run_flask, daemon=True).start()
-
-    WINDOW = 'Pi-Driver Display'
-    # ───────────────── (수정) 전체 화면 설정 ─────────────────
-    cv2.namedWindow(WINDOW, cv2.WND_PROP_FULLSCREEN)
-    cv2.setWindowProperty(WINDOW, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    # ─────────────────
-    
-    cv2.setMouseCallback(WINDOW, on_mouse)
+    if TRANSPORT == "bus":
+        EventBusServer(HOST, BUS_PORT, on_bus_event, seen=recent_ids).start()
+    if COORDINATOR_URL:
+        coord = Dispatcher(TRANSPORT, timeout=1)
+        coord.add_peer("coord", COORDINATOR_URL + "/event", bus_addr=COORDINATOR_BUS)
+        coord.register_metrics(metrics)
+        start_registration(coord, "coord", {
+            "role": "driver", "node_id": NODE_ID, "bus": BUS_ID,
+            "http": f"http://{NODE_ADDR}:{PORT}", "bus_port": BUS_PORT if TRANSPORT == "bus" else None})
+
+    output = create_output(DISPLAY_BACKEND)
+    output.set_mouse_callback(on_mouse)
+
+    # 제목/컨테이너/버튼은 한 번만 그려 두고, 알림이 바뀐 경우에만 해당 띠를 다시 합성
+    renderer = DriverRenderer()
+    output.present(renderer.frame, [(0, 0, renderer.frame.shape[1], renderer.frame.shape[0])])
 
     try:
         while True:
-            # 1. (수정) 배경 생성 (높이 480px)
-            frame = np.full((480, 800, 3), BG_COLOR, dtype=np.uint8)
-            pil = Image.fromarray(frame)
-            draw = ImageDraw.Draw(pil)
-
-            # 2. 제목 그리기 ("탑승 예정 알림")
-            title_text = "탑승 예정 알림"
-            (tx, ty) = get_text_center_pos(draw, (0, 0, 800, 50), title_text, font_title)
-            draw.text((tx, 15), title_text, font=font_title, fill=TITLE_COLOR)
-
-            # 3. (수정) 알림 메시지 컨테이너 (높이 380px)
-            draw_rounded_rectangle(draw, (20, 60, 780, 380), 10, fill=CONTAINER_COLOR)
-
-            # 4. 알림 목록 그리기
-            y = 75
-            for text, ts in notifications:
-                wrapped = textwrap.fill(text, width=55) 
-                draw.multiline_text((40, y), wrapped, font=font_text, fill=TEXT_COLOR)
-                
-                (l, t, r, b) = draw.textbbox((40, y), wrapped, font=font_text)
-                y += (b - t) + 15 
-                
-                # 5. (수정) 알림창 밖으로 나가지 않도록 y좌표 제한 (360px)
-                if y > 360:
-                    break 
-
-            # 6. '확인'/'종료' 버튼 그리기 (480px 기준 Y 좌표 사용)
-            draw_rounded_rectangle(draw, CONFIRM_RECT, BUTTON_RADIUS, fill=CONFIRM_BTN_COLOR)
-            txt = '알림 지우기'
-            (tx, ty) = get_text_center_pos(draw, CONFIRM_RECT, txt, font_button)
-            draw.text((tx, ty), txt, font=font_button, fill=BTN_TEXT_COLOR)
-
-            draw_rounded_rectangle(draw, EXIT_RECT, BUTTON_RADIUS, fill=EXIT_BTN_COLOR)
-            txt = '프로그램 종료'
-            (tx, ty) = get_text_center_pos(draw, EXIT_RECT, txt, font_button)
-            draw.text((tx, ty), txt, font=font_button, fill=BTN_TEXT_COLOR)
-
-            frame = np.array(pil)
-            cv2.imshow(WINDOW, frame)
-            
-            if (cv2.waitKey(100) & 0xFF == 27) or exit_requested:
+            t0 = time.perf_counter()
+            notifications.expire()
+            dirty = renderer.update(notifications)
+            if dirty:
+                output.present(renderer.frame, dirty)
+                m_render.observe(time.perf_counter() - t0)
+                m_frames.inc()
+                if unrendered:
+                    with unrendered_lock:
+                        shown = list(unrendered.items())
+                        unrendered.clear()
+                    t_shown = time.time()
+                    for trace, t_recv in shown:
+                        tracer.span(trace, "rendered", t_recv, t_shown)
+
+            m_update.observe(time.perf_counter() - t0)
+            if (output.poll(100) & 0xFF == 27) or exit_requested:
                 print("[MAIN] 종료 요청 수신...")
                 break
 
     finally:
-        cv2.destroyAllWindows()
+        output.close()
         GPIO.cleanup()
         print("[MAIN] Pi-Driver 종료.")
         sys.exit(0)
@@ -0,0 +1,254 @@
+# driver_gui.py  (기사 단말 화면 - 유지 모드 렌더러)
+#
+# 예전 GUI 루프는 100ms 마다 800x480 프레임을 처음부터 다시 만들었다
+# (numpy → PIL → numpy 변환, 둥근 사각형/버튼 다시 그리기, 모든 알림 textwrap + textbbox).
+# 여기서는
+#   - 제목/컨테이너/버튼(chrome)은 시작할 때 한 번 그려 두고
+#   - 알림 문구마다 줄바꿈+래스터화한 글자 마스크를 캐시하고
+#   - NotificationStore.version 이 바뀐 경우에만, 바뀐 줄부터 아래쪽 띠만 다시 합성한다.
+# update() 가 빈 목록을 돌려주면 화면은 그대로이므로 imshow 도 건너뛰면 된다.
+#
+#   renderer = DriverRenderer()
+#   dirty = renderer.update(store)        # [(x1, y1, x2, y2)] 다시 그린 영역
+#   if dirty: output.present(renderer.frame, dirty)
+#
+# 출력은 WindowOutput (OpenCV 전체 화면 창) 또는 OffscreenOutput (창 없이 메모리, 테스트/벤치마크용).
+
+import os
+import textwrap
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# ───────────────── GUI 디자인 설정 ─────────────────
+WIDTH, HEIGHT = 800, 480
+BG_COLOR = (30, 30, 30)
+CONTAINER_COLOR = (50, 50, 50)
+TITLE_COLOR = (255, 255, 255)
+TEXT_COLOR = (240, 240, 240)
+CONFIRM_BTN_COLOR = (50, 150, 50) # 녹색
+EXIT_BTN_COLOR = (100, 100, 100)
+BTN_TEXT_COLOR = (255, 255, 255)
+
+# 폰트 크기를 변수로 저장
+FONT_SIZE_TITLE = 28
+FONT_SIZE_TEXT = 22
+FONT_SIZE_BUTTON = 24
+FONT_PATH = "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf"
+
+TITLE_TEXT = "탑승 예정 알림"
+CONTAINER_RECT = (20, 60, 780, 380)
+CONFIRM_RECT = (50, 400, 250, 460)
+EXIT_RECT    = (550, 400, 750, 460)
+BUTTON_RADIUS = 15
+
+LIST_X, LIST_Y = 40, 75     # 첫 알림 줄 위치
+LIST_LIMIT_Y   = 360        # 이 아래로는 더 그리지 않음
+LINE_GAP       = 15
+WRAP_WIDTH     = 55         # 글자 수 기준 줄바꿈
+LAYOUT_CACHE   = 64         # 캐시할 문구 수
+
+
+def load_fonts(path=FONT_PATH):
+    try:
+        return (ImageFont.truetype(path, FONT_SIZE_TITLE),
+                ImageFont.truetype(path, FONT_SIZE_TEXT),
+                ImageFont.truetype(path, FONT_SIZE_BUTTON))
+    except IOError:
+        print("[WARN] 나눔고딕 폰트 로드 실패. 기본 폰트를 사용합니다.")
+        f = ImageFont.load_default()
+        return f, f, f
+
+
+# ───────────────── GUI 헬퍼 함수 ─────────────────
+def draw_rounded_rectangle(draw, box, radius, fill):
+    x1, y1, x2, y2 = box
+    draw.rectangle([x1+radius, y1, x2-radius, y2], fill=fill)
+    draw.rectangle([x1, y1+radius, x2, y2-radius], fill=fill)
+    draw.pieslice([x1, y1, x1+2*radius, y1+2*radius], 180, 270, fill=fill)
+    draw.pieslice([x2-2*radius, y1, x2, y1+2*radius], 270, 360, fill=fill)
+    draw.pieslice([x2-2*radius, y2-2*radius, x2, y2], 0, 90, fill=fill)
+    draw.pieslice([x1, y2-2*radius, x1+2*radius, y2], 90, 180, fill=fill)
+
+def get_text_center_pos(draw, box, text, font):
+    (left, top, right, bottom) = draw.textbbox((0,0), text, font=font)
+    tw = right - left
+    th = bottom - top
+    x1, y1, x2, y2 = box
+    x = x1 + (x2 - x1 - tw) // 2
+    y = y1 + (y2 - y1 - th) // 2 - (top)
+    return (x, y)
+
+def hit(rect, x, y):
+    return rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]
+
+
+# ───────────────── 렌더러 ─────────────────
+class TextLayout:
+    """ 문구 하나의 줄바꿈 + 글자 마스크 (어느 y 에 놓든 재사용) """
+    __slots__ = ("mask", "advance")
+
+    def __init__(self, text, font):
+        wrapped = textwrap.fill(text, width=WRAP_WIDTH)
+        probe = ImageDraw.Draw(Image.new("L", (1, 1)))
+        l, t, r, b = probe.textbbox((0, 0), wrapped, font=font)
+        img = Image.new("L", (max(r, 1), max(b, 1)), 0)
+        ImageDraw.Draw(img).multiline_text((0, 0), wrapped, font=font, fill=255)
+        self.mask = np.asarray(img, dtype=np.uint16)   # 합성할 때 곱셈 오버플로 방지
+        self.advance = (b - t) + LINE_GAP
+
+
+class DriverRenderer:
+    def __init__(self, fonts=None):
+        self.font_title, self.font_text, self.font_button = fonts or load_fonts()
+        self.chrome = self._build_chrome()
+        self.frame = self.chrome.copy()
+        self._layouts = OrderedDict()   # 문구 → TextLayout (LRU)
+        self._placed = []               # 지금 화면에 있는 줄 [(문구, y, 아래 끝 y)]
+        self._version = None
+        self._text_rgb = np.array(TEXT_COLOR, dtype=np.uint16)
+        self.counters = {"updates": 0, "composed": 0, "layouts": 0, "layout_hits": 0}
+
+    def _build_chrome(self):
+        pil = Image.new("RGB", (WIDTH, HEIGHT), BG_COLOR)
+        draw = ImageDraw.Draw(pil)
+        (tx, _) = get_text_center_pos(draw, (0, 0, WIDTH, 50), TITLE_TEXT, self.font_title)
+        draw.text((tx, 15), TITLE_TEXT, font=self.font_title, fill=TITLE_COLOR)
+        draw_rounded_rectangle(draw, CONTAINER_RECT, 10, fill=CONTAINER_COLOR)
+        for rect, color, txt in ((CONFIRM_RECT, CONFIRM_BTN_COLOR, "알림 지우기"),
+                                 (EXIT_RECT, EXIT_BTN_COLOR, "프로그램 종료")):
+            draw_rounded_rectangle(draw, rect, BUTTON_RADIUS, fill=color)
+            (tx, ty) = get_text_center_pos(draw, rect, txt, self.font_button)
+            draw.text((tx, ty), txt, font=self.font_button, fill=BTN_TEXT_COLOR)
+        return np.array(pil)
+
+    def _layout(self, text):
+        lay = self._layouts.get(text)
+        if lay is not None:
+            self._layouts.move_to_end(text)
+            self.counters["layout_hits"] += 1
+            return lay
+        lay = self._layouts[text] = TextLayout(text, self.font_text)
+        self.counters["layouts"] += 1
+        if len(self._layouts) > LAYOUT_CACHE:
+            self._layouts.popitem(last=False)
+        return lay
+
+    def _place(self, texts):
+        """ 예전 루프와 같은 배치: 그린 뒤 y 가 LIST_LIMIT_Y 를 넘으면 중단 """
+        placed, y = [], LIST_Y
+        for text in texts:
+            lay = self._layout(text)
+            placed.append((text, y, min(y + lay.mask.shape[0], HEIGHT)))
+            y += lay.advance
+            if y > LIST_LIMIT_Y:
+                break
+        return placed
+
+    def _blit(self, text, y):
+        mask = self._layout(text).mask
+        h = min(mask.shape[0], HEIGHT - y)
+        w = min(mask.shape[1], WIDTH - LIST_X)
+        a = mask[:h, :w, None]
+        region = self.frame[y:y + h, LIST_X:LIST_X + w]
+        region[:] = ((region * (255 - a) + self._text_rgb * a + 127) // 255).astype(np.uint8)
+
+    def update(self, store):
+        """ 알림이 바뀌었으면 바뀐 띠만 다시 그리고 그 영역 목록 반환, 그대로면 [] """
+        self.counters["updates"] += 1
+        if self._version is not None:
+            _, changes = store.changes_since(self._version)
+            if changes == []:
+                return []
+        version, items = store.snapshot()
+        self._version = version
+        placed = self._place([line for n in items for line in n.lines])
+        old = self._placed
+
+        first = 0
+        while first < min(len(old), len(placed)) and old[first][:2] == placed[first][:2]:
+            first += 1
+        if first == len(old) == len(placed):
+            return []
+        y0 = (old[first] if first < len(old) else placed[first])[1]
+        y1 = max([p[2] for p in old[first:]] + [p[2] for p in placed[first:]])
+
+        # 바뀐 띠: chrome 으로 되돌린 뒤 그 아래 줄들만 다시 찍음
+        self.frame[y0:y1] = self.chrome[y0:y1]
+        for text, y, _ in placed[first:]:
+            self._blit(text, y)
+        self._placed = placed
+        self.counters["composed"] += 1
+        return [(0, y0, WIDTH, y1)]
+
+
+# ───────────────── 출력 백엔드 ─────────────────
+class WindowOutput:
+    """ OpenCV 전체 화면 창 (실제 단말) """
+
+    def __init__(self, name="Pi-Driver Display", fullscreen=True):
+        self.name = name
+        cv2.namedWindow(name, cv2.WND_PROP_FULLSCREEN)
+        if fullscreen:
+            cv2.setWindowProperty(name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    def set_mouse_callback(self, cb):
+        cv2.setMouseCallback(self.name, cb)
+
+    def present(self, frame, dirty):
+        cv2.imshow(self.name, frame)   # HighGUI 는 창 전체를 다시 올림
+
+    def poll(self, ms):
+        """ 입력 대기. 눌린 키 코드 (없으면 -1) """
+        return cv2.waitKey(ms)
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class OffscreenOutput:
+    """
+    창 없이 마지막 프레임을 메모리에 유지 (헤드리스 실행, 회귀 테스트, 벤치마크).
+    snapshot_dir 를 주면 present 할 때마다 PNG 로 저장.
+    """
+
+    def __init__(self, snapshot_dir=None):
+        self.snapshot_dir = snapshot_dir
+        self.frame = None
+        self.presents = 0
+        self.dirty_pixels = 0
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def set_mouse_callback(self, cb):
+        pass
+
+    def present(self, frame, dirty):
+        if self.frame is None or self.frame.shape != frame.shape:
+            self.frame = frame.copy()
+            dirty = [(0, 0, frame.shape[1], frame.shape[0])]
+        for x1, y1, x2, y2 in dirty:
+            self.frame[y1:y2, x1:x2] = frame[y1:y2, x1:x2]
+            self.dirty_pixels += (x2 - x1) * (y2 - y1)
+        self.presents += 1
+        if self.snapshot_dir:
+            cv2.imwrite(os.path.join(self.snapshot_dir, f"frame_{self.presents:05d}.png"), self.frame)
+
+    def poll(self, ms):
+        time.sleep(ms / 1000.0)
+        return -1
+
+    def close(self):
+        pass
+
+
+def create_output(backend="window", **kwargs):
+    if backend == "offscreen":
+        return OffscreenOutput(**kwargs)
+    try:
+        return WindowOutput(**kwargs)
+    except cv2.error as e:
+        print(f"[WARN] GUI 창을 열 수 없음 ({e}) → 오프스크린 출력")
+        return OffscreenOutput()
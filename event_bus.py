@@ -0,0 +1,277 @@
+# event_bus.py  (노드 간 푸시 이벤트 버스 - 지속 TCP 연결 + 길이 프레이밍 + ACK)
+#
+# HTTP 요청마다 연결/WSGI 비용을 내는 대신, 노드끼리 TCP 연결 하나를 계속 열어두고
+# [4바이트 길이][JSON] 프레임으로 CALL / ARRIVAL / RELEASE 이벤트를 주고받는다.
+#
+#   메시지: {"id": "call-1a2b-17", "type": "CALL", "data": {...}}
+#   응답  : {"type": "ACK", "ack": "call-1a2b-17"}
+#
+# - 수신 측은 처리 후 ACK, 같은 id 가 다시 오면(재연결 후 재전송) 처리 없이 ACK 만 보냄
+# - 송신 측은 ACK 를 못 받은 메시지를 재연결 시 다시 보내고,
+#   ack_timeout 안에 ACK 가 없으면 on_fail 콜백 (→ 기존 HTTP 경로로 대체 전송)
+# - 기존 Flask 엔드포인트(/call, /release)는 그대로 두고 호환 경로로 사용
+# - ACK 만 늦은 경우 같은 메시지가 버스와 HTTP 로 두 번 도착할 수 있으므로, 대체 전송 본문에는
+#   버스 메시지 id 를 "msg_id" 로 싣고 수신 측은 두 경로가 RecentIds 하나를 같이 써서 중복을 버림
+#
+#   server = EventBusServer("0.0.0.0", 5100, handler)    # handler(type, data)
+#   server.start()
+#   client = EventBusClient("172.30.1.36", 5100, name="call")
+#   client.start()
+#   client.send("CALL", {"bus": "77"}, on_fail=lambda t, d: http_fallback(d))
+#
+#   seen = RecentIds()                                    # 수신 측: 버스 + HTTP 공용
+#   EventBusServer("0.0.0.0", 5100, handler, seen=seen)
+#   if not seen.first_time(data.get("msg_id")): ...       # HTTP 엔드포인트
+
+import itertools
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("연결 종료")
+        buf += chunk
+    return bytes(buf)
+
+def send_frame(sock, obj):
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+def recv_frame(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > MAX_FRAME:
+        raise ValueError(f"프레임이 너무 큼: {length}")
+    return json.loads(_recv_exact(sock, length).decode("utf-8"))
+
+def _tune(sock):
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+
+# ───────────────── 수신 측 ─────────────────
+class RecentIds:
+    """ 최근 처리한 메시지 id (LRU). 버스 수신과 HTTP 엔드포인트가 같이 써서 중복 처리 방지 """
+
+    def __init__(self, size=1024):
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = size
+        self.duplicates = 0
+
+    def first_time(self, msg_id):
+        """ 처음 보는 id 면 기록하고 True. id 가 없으면 (예전 송신 측) 항상 True """
+        if not msg_id:
+            return True
+        with self._lock:
+            if msg_id in self._ids:
+                self.duplicates += 1
+                return False
+            self._ids[msg_id] = True
+            if len(self._ids) > self._size:
+                self._ids.popitem(last=False)
+            return True
+
+
+class EventBusServer:
+    def __init__(self, host, port, handler, dedup_size=1024, seen=None):
+        self.host = host
+        self.port = port
+        self.handler = handler
+        self.seen = seen or RecentIds(dedup_size)
+        self.received = 0
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]   # port=0 이면 실제 할당된 포트
+        threading.Thread(target=self._accept_loop, name="bus-accept", daemon=True).start()
+        print(f"[BUS] 이벤트 버스 대기 중: {self.host}:{self.port}")
+        return self
+
+    def _accept_loop(self):
+        while True:
+            conn, addr = self._sock.accept()
+            _tune(conn)
+            threading.Thread(target=self._conn_loop, args=(conn, addr), daemon=True).start()
+
+    @property
+    def duplicates(self):
+        return self.seen.duplicates
+
+    def _conn_loop(self, conn, addr):
+        try:
+            while True:
+                msg = recv_frame(conn)
+                msg_id = msg.get("id")
+                if msg_id is None:
+                    continue
+                if self.seen.first_time(msg_id):
+                    self.received += 1
+                    try:
+                        self.handler(msg.get("type"), msg.get("data") or {})
+                    except Exception as e:
+                        print(f"[BUS] {msg.get('type')} 처리 오류: {e}")
+                send_frame(conn, {"type": "ACK", "ack": msg_id})
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+
+# ───────────────── 송신 측 ─────────────────
+class EventBusClient:
+    def __init__(self, host, port, name="node", ack_timeout=0.5, reconnect_max=5.0):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.ack_timeout = ack_timeout
+        self.reconnect_max = reconnect_max
+        self._prefix = f"{name}-{os.getpid():x}-{int(time.time()) & 0xffff:x}"
+        self._seq = itertools.count(1)
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._unacked = OrderedDict()     # id → [msg, 보낸 시각, on_ack, on_fail, 완료 Event]
+        self.acked = 0
+        self.failed = 0
+        self._closed = False
+
+    def start(self):
+        threading.Thread(target=self._conn_loop, name=f"bus-{self.name}", daemon=True).start()
+        threading.Thread(target=self._timeout_loop, daemon=True).start()
+        return self
+
+    def close(self):
+        """ 재연결/타임아웃 스레드 종료, 연결 닫기. 미확인 메시지는 콜백 없이 버림 """
+        self._closed = True
+        with self._cond:
+            entries = list(self._unacked.values())
+            self._unacked.clear()
+        for entry in entries:
+            entry[4].set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)    # recv 에 막힌 _conn_loop 깨우기
+            except OSError:
+                pass
+            self._drop(sock)
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    def new_id(self):
+        return f"{self._prefix}-{next(self._seq)}"
+
+    def send(self, msg_type, data, on_ack=None, on_fail=None, msg_id=None):
+        """ 이벤트 전송. 메시지 id 와 ACK 완료 Event 반환 (바로 반환) """
+        msg_id = msg_id or self.new_id()
+        msg = {"id": msg_id, "type": msg_type, "data": data}
+        done = threading.Event()
+        done.ok = False
+        with self._cond:
+            self._unacked[msg_id] = [msg, time.monotonic(), on_ack, on_fail, done]
+        self._write(msg)
+        return msg_id, done
+
+    def send_and_wait(self, msg_type, data, timeout=None):
+        """ ACK 를 받으면 True, 타임아웃/실패면 False """
+        _, done = self.send(msg_type, data)
+        done.wait(timeout if timeout is not None else self.ack_timeout * 2)
+        return done.ok
+
+    def _write(self, msg):
+        sock = self._sock
+        if sock is None:
+            return False          # 연결되면 _conn_loop 가 미확인 메시지를 다시 보냄
+        try:
+            with self._send_lock:
+                send_frame(sock, msg)
+            return True
+        except OSError:
+            self._drop(sock)
+            return False
+
+    def _drop(self, sock):
+        if self._sock is sock:
+            self._sock = None
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _conn_loop(self):
+        delay = 0.1
+        while not self._closed:
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=2)
+                sock.settimeout(None)
+                _tune(sock)
+            except OSError:
+                time.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max)
+                continue
+            delay = 0.1
+            if self._closed:
+                sock.close()
+                return
+            self._sock = sock
+            with self._cond:
+                pending = [entry[0] for entry in self._unacked.values()]
+            for msg in pending:
+                self._write(msg)
+            try:
+                while True:
+                    reply = recv_frame(sock)
+                    if reply.get("type") == "ACK":
+                        self._on_ack(reply.get("ack"))
+            except (ConnectionError, OSError, ValueError):
+                self._drop(sock)
+
+    def _on_ack(self, msg_id):
+        with self._cond:
+            entry = self._unacked.pop(msg_id, None)
+        if entry is None:
+            return
+        self.acked += 1
+        _, t_sent, on_ack, _, done = entry
+        done.ok = True
+        done.set()
+        if on_ack is not None:
+            try:
+                on_ack(entry[0]["type"], entry[0]["data"], (time.monotonic() - t_sent) * 1000.0)
+            except Exception as e:
+                print(f"[WARN] on_ack 콜백 오류: {e}")
+
+    def _timeout_loop(self):
+        while not self._closed:
+            time.sleep(self.ack_timeout / 4)
+            now = time.monotonic()
+            expired = []
+            with self._cond:
+                for msg_id, entry in list(self._unacked.items()):
+                    if now - entry[1] >= self.ack_timeout:
+                        expired.append(self._unacked.pop(msg_id))
+            for msg, _, _, on_fail, done in expired:
+                self.failed += 1
+                done.set()
+                if on_fail is not None:
+                    try:
+                        on_fail(msg["type"], msg["data"])
+                    except Exception as e:
+                        print(f"[BUS] on_fail 콜백 오류: {e}")
@@ -0,0 +1,156 @@
+# frame_pipeline.py  (stop_node 파이프라인 공용 부품)
+# 캡처 → 검출 → OCR 단계를 잇는 "최신 프레임" 버퍼 + 단계별 처리량 측정
+# cv2 는 InferenceGate 가 처음 프레임을 볼 때 import (stop_node 기동 시 Flask 보다 먼저 불러오지 않도록)
+
+import threading
+import time
+from collections import deque
+
+
+# ───────────────── 최신 프레임 버퍼 ─────────────────
+class LatestFrameBuffer:
+    """
+    크기가 제한된 단계 간 버퍼.
+    가득 찬 상태에서 put() 하면 가장 오래된 항목을 버린다(stale drop).
+    maxlen=1 이면 소비자는 항상 가장 최근 프레임만 받는다.
+    """
+
+    def __init__(self, maxlen=1):
+        self._items = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1   # 소비자가 못 따라온 오래된 프레임 폐기
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """ 항목이 들어올 때까지 대기. 닫혔거나 timeout 이면 None """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+# ───────────────── 단계별 처리량 측정 ─────────────────
+class StageMeter:
+    """
+    한 단계(capture / detect / ocr)의 처리 횟수와 순수 처리 시간을 누적.
+    snapshot() 은 마지막 호출 이후 구간의 fps, 평균 지연, 점유율을 돌려준다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._count = 0
+        self._busy = 0.0
+        self._since = time.monotonic()
+
+    def add(self, elapsed):
+        with self._lock:
+            self._count += 1
+            self._busy += elapsed
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            count, busy, since = self._count, self._busy, self._since
+            self._count, self._busy, self._since = 0, 0.0, now
+        span = max(now - since, 1e-9)
+        return {
+            "stage": self.name,
+            "fps": count / span,
+            "avg_ms": (busy / count * 1000.0) if count else 0.0,
+            "util": busy / span,   # 1.0 에 가까우면 이 단계가 병목
+        }
+
+
+def format_stats(snapshots, buffers=None):
+    """ [STATS] 로그 한 줄로 정리 """
+    parts = [f"{s['stage']} {s['fps']:.1f}fps {s['avg_ms']:.0f}ms {s['util']*100:.0f}%"
+             for s in snapshots]
+    if buffers:
+        parts += [f"{name} drop {buf.dropped}" for name, buf in buffers.items()]
+    return " | ".join(parts)
+
+
+# ───────────────── 추론 게이트 (수요 + 움직임) ─────────────────
+class InferenceGate:
+    """
+    YOLO/OCR 앞에서 프레임을 걸러내는 단계.
+      1) demand_fn() 이 False (호출된 버스 없음)       → "idle"  로 건너뜀
+      2) 도로 ROI 를 축소한 흑백 영상의 프레임 차이가 작음 → "still" 로 건너뜀
+    움직임이 감지되면 hold_frames 동안은 계속 통과시켜 정차한 버스도 끝까지 읽는다.
+    check(..., keep_alive=True) 이면 움직임과 상관없이 통과 (예: 아직 번호 확정 전 트랙 존재).
+    """
+
+    def __init__(self, demand_fn, roi=None, downscale=0.25, pixel_threshold=25,
+                 min_changed=0.01, hold_frames=15):
+        self.demand_fn = demand_fn
+        self.roi = roi                      # (x1, y1, x2, y2) 원본 프레임 좌표, None 이면 전체
+        self.downscale = downscale
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed      # 바뀐 픽셀 비율
+        self.hold_frames = hold_frames
+        self._prev = None
+        self._hold = 0
+        self.counters = {"passed": 0, "idle": 0, "still": 0}
+
+    def _small_gray(self, frame_bgr):
+        import cv2
+        if self.roi is not None:
+            x1, y1, x2, y2 = self.roi
+            frame_bgr = frame_bgr[y1:y2, x1:x2]
+        small = cv2.resize(frame_bgr, None, fx=self.downscale, fy=self.downscale,
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def check(self, frame_bgr, keep_alive=False):
+        """ (통과 여부, 사유) 반환 """
+        if not self.demand_fn():
+            self._prev = None
+            self._hold = 0
+            self.counters["idle"] += 1
+            return False, "idle"
+
+        small = self._small_gray(frame_bgr)
+        prev, self._prev = self._prev, small
+        if prev is None:
+            moved = True                    # 수요가 생긴 직후 첫 프레임은 무조건 검사
+        else:
+            import cv2
+            diff = cv2.absdiff(small, prev)
+            changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255,
+                                                     cv2.THRESH_BINARY)[1])
+            moved = changed >= self.min_changed * diff.size
+
+        if moved:
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            self._hold -= 1
+        elif not keep_alive:
+            self.counters["still"] += 1
+            return False, "still"
+        self.counters["passed"] += 1
+        return True, "motion" if moved else "hold"
+
+    def format_counters(self):
+        c = self.counters
+        return f"gate pass {c['passed']} idle {c['idle']} still {c['still']}"
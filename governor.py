@@ -0,0 +1,225 @@
+# governor.py  (stop_node 프레임 속도 / 추론 간격 / ORT 스레드 조절기)
+#
+# Orange Pi 는 YOLO+OCR 를 계속 돌리면 온도가 올라 클럭이 떨어지고, 그때부터 검출 지연이 들쭉날쭉해진다.
+# 조절기는 CPU 온도, 부하(loadavg), 단계별 지연(검출/OCR 이동 평균)을 보고 네 가지 모드 중 하나를 고른다.
+#
+#   idle     : 호출된 버스 없음            → 캡처 저속, 검출은 게이트가 어차피 건너뜀
+#   expect   : 호출된 버스를 기다리는 중    → 최대 속도
+#   hot      : 온도 >= temp_hot 또는 과부하 → 캡처/검출 속도와 ORT 스레드를 줄임
+#   critical : 온도 >= temp_critical       → 최소 속도, 스레드 1개
+# 온도 모드는 (기준 - hysteresis) 아래로 내려가야 풀린다.
+#
+# 검출 간격은 모드의 상한 fps 와 "검출 점유율 <= duty_max" 중 느린 쪽이라
+# 클럭이 떨어져 추론이 느려지면 간격이 자동으로 늘어난다 → 최악의 검출 지연이 모드별로 묶인다.
+#   예상 최대 지연 ≈ 캡처 간격 + 검출 간격 + 검출 시간
+#
+#   gov = Governor(demand_fn=lambda: bool(pending_calls), on_threads=vision.set_threads)
+#   gov.start()
+#   gov.observe("detect", elapsed)          # 검출 루프
+#   time.sleep(gov.capture_interval)        # 캡처 루프 (간격 계산은 조절기가)
+#   gov.status()                            # 현재 결정 + 근거 (GET /governor)
+
+import glob
+import os
+import threading
+import time
+
+IDLE, EXPECT, HOT, CRITICAL = "idle", "expect", "hot", "critical"
+MODES = (IDLE, EXPECT, HOT, CRITICAL)
+
+# 모드 → 캡처 fps, 검출 fps 상한, ORT intra 스레드
+# 스레드 None 은 설정된 세션 그대로 (ORT_PROFILE 의 intra), 숫자는 그 값을 넘지 않는 상한
+DEFAULT_POLICY = {
+    IDLE:     {"capture_fps": 2.0,  "detect_fps": 2.0, "threads": None},
+    EXPECT:   {"capture_fps": 15.0, "detect_fps": 8.0, "threads": None},
+    HOT:      {"capture_fps": 8.0,  "detect_fps": 3.0, "threads": 2},
+    CRITICAL: {"capture_fps": 4.0,  "detect_fps": 1.0, "threads": 1},
+}
+
+THERMAL_GLOB = "/sys/class/thermal/thermal_zone*/temp"
+
+
+def read_temperature(paths):
+    """ 여러 thermal zone 중 가장 높은 온도(°C). 읽을 수 없으면 None """
+    temps = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                v = float(f.read().strip())
+            temps.append(v / 1000.0 if v > 1000 else v)   # 대부분 밀리도
+        except (OSError, ValueError):
+            continue
+    return max(temps) if temps else None
+
+
+class Governor:
+    def __init__(self, demand_fn, on_threads=None, policy=None, temp_hot=75.0, temp_critical=85.0,
+                 hysteresis=5.0, load_high=1.5, duty_max=0.6, tick=2.0, thread_cooldown=120.0,
+                 temp_paths=None, enabled=True, threads=None):
+        self.demand_fn = demand_fn
+        self.on_threads = on_threads          # on_threads(n): ORT 세션을 n 스레드로 다시 만듦
+        self.policy = {m: dict(DEFAULT_POLICY[m], **(policy or {}).get(m, {})) for m in MODES}
+        self.temp_hot = temp_hot
+        self.temp_critical = temp_critical
+        self.hysteresis = hysteresis
+        self.load_high = load_high            # 코어당 1분 loadavg
+        self.duty_max = duty_max              # 검출이 차지할 수 있는 시간 비율
+        self.tick = tick
+        self.thread_cooldown = thread_cooldown
+        self.temp_paths = temp_paths if temp_paths is not None else sorted(glob.glob(THERMAL_GLOB))
+        self.enabled = enabled
+        self.cores = os.cpu_count() or 1
+
+        # 루프들이 매 프레임 읽는 값 (대입만 하므로 잠금 없음). 조절기가 꺼져 있으면 0 = 제한 없음
+        self.capture_interval = 0.0
+        self.detect_interval = 0.0
+
+        self.mode = None
+        self.reason = ""
+        self.base_threads = threads           # 설정된 세션의 intra 스레드 수 (모르면 None)
+        self.threads = threads
+        self.temp = None
+        self.load = None
+        self.latency = {"detect": None, "ocr": None}   # 이동 평균 (초)
+        self.changes = 0
+        self._mode_since = time.monotonic()
+        self._threads_at = -thread_cooldown
+        self._threads_busy = False
+        self._wake = threading.Event()
+
+    # ───────────── 입력 ─────────────
+    def observe(self, stage, seconds, alpha=0.2):
+        """ 단계 한 번 처리 시간 (검출 루프 / OCR 루프에서 호출, 대입 몇 번이라 1us 미만) """
+        prev = self.latency.get(stage)
+        self.latency[stage] = seconds if prev is None else prev + alpha * (seconds - prev)
+
+    def poke(self):
+        """ 수요가 바뀌었을 때 (호출 등록/도착) 다음 틱을 기다리지 않고 바로 재평가 """
+        self._wake.set()
+
+    # ───────────── 결정 ─────────────
+    def _choose_mode(self):
+        temp, load = self.temp, self.load
+        thermal = None
+        if temp is not None:
+            if temp >= self.temp_critical or (self.mode == CRITICAL and temp > self.temp_critical - self.hysteresis):
+                thermal = CRITICAL
+            elif temp >= self.temp_hot or (self.mode in (HOT, CRITICAL) and temp > self.temp_hot - self.hysteresis):
+                thermal = HOT
+        if thermal is None and load is not None and load >= self.load_high:
+            thermal = HOT
+        if not self.demand_fn():
+            return IDLE, "호출 없음"
+        if thermal == CRITICAL:
+            return CRITICAL, f"온도 {temp:.1f}°C"
+        if thermal == HOT:
+            return HOT, (f"온도 {temp:.1f}°C" if temp is not None and temp > self.temp_hot - self.hysteresis
+                         else f"부하 {load:.2f}/코어")
+        return EXPECT, "호출 대기"
+
+    def _detect_interval(self, p):
+        interval = 1.0 / p["detect_fps"] if p["detect_fps"] else 0.0
+        det = self.latency["detect"]
+        if det is not None and self.duty_max > 0:
+            # 추론이 느려지면 (스로틀링) 점유율이 duty_max 를 넘지 않게 간격을 늘림
+            interval = max(interval, det / self.duty_max)
+        return interval
+
+    def evaluate(self):
+        """ 한 번 재평가해서 값 갱신. 모드가 바뀌었으면 True """
+        self.temp = read_temperature(self.temp_paths)
+        try:
+            self.load = os.getloadavg()[0] / self.cores
+        except OSError:
+            self.load = None
+        mode, reason = self._choose_mode()
+        p = self.policy[mode]
+        self.capture_interval = 1.0 / p["capture_fps"] if p["capture_fps"] else 0.0
+        self.detect_interval = self._detect_interval(p)
+        self.reason = reason
+
+        changed = mode != self.mode
+        if changed:
+            print(f"[GOV] {self.mode or '-'} → {mode} ({reason}): 캡처 {p['capture_fps']:g}fps, "
+                  f"검출 간격 {self.detect_interval * 1000:.0f}ms")
+            self.mode = mode
+            self._mode_since = time.monotonic()
+            self.changes += 1
+        target = self._target_threads(p["threads"])
+        if target and target != self.threads:
+            self._set_threads(target)
+        return changed
+
+    def _target_threads(self, policy_threads):
+        if policy_threads is None:
+            return self.base_threads
+        return min(policy_threads, self.base_threads) if self.base_threads else policy_threads
+
+    def _set_threads(self, n):
+        """ 세션 재생성은 느리므로 별도 스레드에서. 늘리는 쪽은 thread_cooldown 에 한 번까지만 (줄이는 건 바로) """
+        if self.on_threads is None:
+            self.threads = n
+            return
+        now = time.monotonic()
+        if self._threads_busy:
+            return
+        if self.threads is not None and n > self.threads and now - self._threads_at < self.thread_cooldown:
+            return
+        self._threads_busy, self._threads_at = True, now
+
+        def rebuild():
+            try:
+                self.on_threads(n)
+                print(f"[GOV] ORT 스레드 {self.threads} → {n}")
+                self.threads = n
+            except Exception as e:
+                print(f"[WARN] ORT 스레드 변경 실패: {e}")
+            finally:
+                self._threads_busy = False
+        threading.Thread(target=rebuild, name="gov-threads", daemon=True).start()
+
+    # ───────────── 실행 / 조회 ─────────────
+    def start(self, threads=None):
+        """ threads: 지금 세션의 intra 스레드 수 (모델 로드 뒤에야 알 수 있으므로 여기서도 받음) """
+        if threads:
+            self.base_threads = self.threads = threads
+        if not self.enabled:
+            return self
+        self.evaluate()
+        threading.Thread(target=self._loop, name="governor", daemon=True).start()
+        return self
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.tick)
+            self._wake.clear()
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"[WARN] 조절기 평가 실패: {e}")
+
+    def latency_bound(self):
+        """ 버스가 화면에 들어온 뒤 검출되기까지 예상 최대 지연 (초) """
+        det = self.latency["detect"] or 0.0
+        return self.capture_interval + self.detect_interval + det
+
+    def status(self):
+        p = self.policy.get(self.mode) or {}
+        ms = lambda v: None if v is None else round(v * 1000.0, 1)
+        return {"enabled": self.enabled, "mode": self.mode, "reason": self.reason,
+                "since_s": round(time.monotonic() - self._mode_since, 1),
+                "temp_c": self.temp, "load_per_core": None if self.load is None else round(self.load, 2),
+                "capture_fps": p.get("capture_fps"), "detect_interval_ms": ms(self.detect_interval),
+                "ort_threads": self.threads, "detect_ms": ms(self.latency["detect"]),
+                "ocr_ms": ms(self.latency["ocr"]), "latency_bound_ms": ms(self.latency_bound()),
+                "changes": self.changes}
+
+    def register_metrics(self, registry, prefix="governor"):
+        registry.gauge_fn(f"{prefix}_mode", "현재 모드 (0 idle, 1 expect, 2 hot, 3 critical)",
+                          lambda: MODES.index(self.mode) if self.mode else None)
+        registry.gauge_fn(f"{prefix}_temp_celsius", "CPU 온도 (thermal zone 최대)", lambda: self.temp)
+        registry.gauge_fn(f"{prefix}_capture_interval_seconds", "캡처 간격", lambda: self.capture_interval)
+        registry.gauge_fn(f"{prefix}_detect_interval_seconds", "검출 최소 간격", lambda: self.detect_interval)
+        registry.gauge_fn(f"{prefix}_ort_threads", "YOLO 세션 intra 스레드 수", lambda: self.threads)
+        registry.gauge_fn(f"{prefix}_latency_bound_seconds", "예상 최대 검출 지연", self.latency_bound)
+        registry.counter_fn(f"{prefix}_mode_changes_total", "모드 변경 횟수", lambda: self.changes)
@@ -0,0 +1,372 @@
+# hal.py  (하드웨어 추상화 계층: 실제 보드 / 시뮬레이션)
+#
+# 노드들은 GPIO, 앰프 핀, 오디오 출력, 카메라를 이 모듈을 통해서만 얻는다.
+#   HAL_BACKEND=board (기본) : OPi.GPIO, pygame 믹서, cv2.VideoCapture 그대로
+#     (OPi.GPIO 를 못 불러오면 노드가 뜨지 않음. HAL_GPIO_FALLBACK=1 이면 SimGPIO 로 계속)
+#   HAL_BACKEND=sim          : 보드 없이 한 리눅스 머신에서 여러 노드를 돌리기 위한 가짜 장치
+#     SimGPIO        가상 버튼(press / 승객 스크립트) + 출력 핀 기록 (앰프 SD 핀은 기록만 하는 null 핀)
+#     SimAudioSink   소리 없이 클립 길이만큼만 시간을 보내는 오디오 출력
+#     VideoFileCamera 녹화 영상을 카메라 속도로 반복 재생
+#     SimCamera      합성 프레임 + 스크립트된 버스 도착 (SimVision 이 번호를 "읽음")
+# LED 는 dotmatrix_display 의 LED_BACKEND=dummy (luma 메모리 장치) 를 쓴다.
+#
+# 노드 설정값은 NODE_CONFIG 환경 변수(JSON 문자열 또는 JSON 파일 경로)로 덮어쓸 수 있다.
+# sim_system.py 가 이것으로 노드마다 포트/주소/ID 를 다르게 준다.
+#
+#   GPIO = hal.load_gpio()
+#   hal.apply_config(globals())                    # 설정값 블록 끝에서
+#   audio = AudioEngine(TTS_DIR, AMP_SD_PIN, GPIO, sink=hal.audio_sink())
+#   cap = hal.open_camera(CAMERA_SOURCE, buses=SIM_BUSES, arrivals_per_min=SIM_ARRIVAL_RATE)
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import wave
+from collections import deque
+import numpy as np
+
+HAL_BACKEND = os.environ.get("HAL_BACKEND", "board")   # "board" | "sim"
+# board 에서 OPi.GPIO 를 못 불러오면 기본은 실패. 1 이면 경고 후 SimGPIO 로 계속 (버튼/앰프 없이 개발할 때만)
+HAL_GPIO_FALLBACK = os.environ.get("HAL_GPIO_FALLBACK", "") == "1"
+
+SIM_CLIP_SECONDS = float(os.environ.get("HAL_SIM_CLIP_SECONDS", 1.5))   # 파일 없는 가상 클립 길이
+SIM_MP3_BITRATE  = 32000     # gTTS mp3 (24kHz 모노) 비트레이트, 파일 크기로 길이 추정
+
+
+# ───────────────── 설정 덮어쓰기 ─────────────────
+def apply_config(namespace, env="NODE_CONFIG"):
+    """ NODE_CONFIG 의 대문자 키를 모듈 설정값에 덮어씀. 덮어쓴 dict 반환 """
+    raw = os.environ.get(env, "").strip()
+    if not raw:
+        return {}
+    try:
+        if not raw.startswith("{"):
+            with open(raw, encoding="utf-8") as f:
+                raw = f.read()
+        cfg = json.loads(raw)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] {env} 읽기 실패 ({e}) → 기본 설정 사용")
+        return {}
+    applied = {}
+    for key, value in cfg.items():
+        if not key.isupper():
+            continue
+        if key not in namespace:
+            print(f"[WARN] 알 수 없는 설정 {key} (무시)")
+            continue
+        namespace[key] = applied[key] = tuple(value) if isinstance(value, list) else value
+    print(f"[HAL] 설정 {len(applied)}개 덮어씀: {', '.join(applied)}")
+    return applied
+
+
+# ───────────────── GPIO ─────────────────
+class SimGPIO:
+    """ OPi.GPIO 와 같은 이름의 함수/상수. 엣지 콜백은 실제처럼 별도 스레드에서 호출 """
+    BOARD, BCM = 10, 11
+    OUT, IN = 0, 1
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+
+    def __init__(self):
+        self.mode = None
+        self.levels = {}                 # 핀 → 현재 값
+        self.writes = deque(maxlen=1024) # (monotonic, 핀, 값) 출력 기록 (앰프 on/off 확인용)
+        self.high_time = {}              # 핀 → HIGH 로 있던 누적 시간 (앰프 사용률)
+        self._high_since = {}
+        self._callbacks = {}             # 핀 → [callback(channel)]
+        self._edges = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.presses = 0
+        threading.Thread(target=self._edge_loop, name="simgpio-edge", daemon=True).start()
+
+    def setwarnings(self, flag):
+        pass
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction, initial=None, pull_up_down=None):
+        with self._lock:
+            self.levels[pin] = self.HIGH if initial is None and direction == self.IN else (initial or self.LOW)
+
+    def output(self, pin, value):
+        now = time.monotonic()
+        with self._lock:
+            if value and pin not in self._high_since:
+                self._high_since[pin] = now
+            elif not value and pin in self._high_since:
+                self.high_time[pin] = self.high_time.get(pin, 0.0) + now - self._high_since.pop(pin)
+            self.levels[pin] = value
+            self.writes.append((now, pin, value))
+
+    def input(self, pin):
+        return self.levels.get(pin, self.HIGH)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self._lock:
+            self._callbacks.setdefault(pin, [])
+            if callback is not None:
+                self._callbacks[pin].append(callback)
+
+    def add_event_callback(self, pin, callback):
+        self.add_event_detect(pin, self.FALLING, callback)
+
+    def remove_event_detect(self, pin):
+        with self._lock:
+            self._callbacks.pop(pin, None)
+
+    def cleanup(self, pins=None):
+        with self._lock:
+            for pin in ([pins] if isinstance(pins, int) else pins or list(self.levels)):
+                self._callbacks.pop(pin, None)
+                self.levels.pop(pin, None)
+
+    # ───────────── 가상 버튼 ─────────────
+    def press(self, pin, chatter=0):
+        """ 버튼 한 번 누름 (FALLING 엣지). chatter 만큼 1ms 간격 채터링 엣지를 더 보냄 """
+        self.presses += 1
+        for i in range(chatter + 1):
+            self._edges.put((pin, i * 0.001))
+
+    def _edge_loop(self):
+        while True:
+            pin, delay = self._edges.get()
+            if delay:
+                time.sleep(delay)
+            with self._lock:
+                callbacks = list(self._callbacks.get(pin, ()))
+            for cb in callbacks:
+                try:
+                    cb(pin)
+                except Exception as e:
+                    print(f"[SIM] 핀 {pin} 콜백 오류: {e}")
+
+    def start_passengers(self, pins, per_minute, seed=None, chatter_prob=0.3):
+        """ 승객 스크립트: 분당 per_minute 번(포아송) 임의의 버튼을 누름 """
+        rng = random.Random(seed)
+        pins = list(pins)
+
+        def loop():
+            while True:
+                time.sleep(rng.expovariate(per_minute / 60.0))
+                self.press(rng.choice(pins), chatter=rng.randint(1, 3) if rng.random() < chatter_prob else 0)
+        threading.Thread(target=loop, name="sim-passengers", daemon=True).start()
+        print(f"[SIM] 승객 버튼 스크립트 시작 (분당 {per_minute}회, 핀 {pins})")
+
+
+def load_gpio(backend=None, fallback=None):
+    """
+    board 면 OPi.GPIO 모듈, sim 이면 SimGPIO.
+    board 에서 OPi.GPIO 를 못 불러오면 ImportError 그대로 (버튼/앰프 없이 "준비됨" 으로 뜨지 않게).
+    fallback=True (또는 HAL_GPIO_FALLBACK=1) 일 때만 경고 후 SimGPIO.
+    """
+    backend = backend or HAL_BACKEND
+    fallback = HAL_GPIO_FALLBACK if fallback is None else fallback
+    if backend == "board":
+        try:
+            import OPi.GPIO as GPIO
+            return GPIO
+        except ImportError as e:
+            if not fallback:
+                print(f"[ERROR] OPi.GPIO 사용 불가 ({e}). 보드가 아니면 HAL_BACKEND=sim 으로 실행")
+                raise
+            print(f"[WARN] OPi.GPIO 사용 불가 ({e}) → 시뮬레이션 GPIO (HAL_GPIO_FALLBACK)")
+    elif backend != "sim":
+        raise ValueError(f"알 수 없는 HAL 백엔드 '{backend}' (board | sim)")
+    return SimGPIO()
+
+
+# ───────────────── 오디오 출력 ─────────────────
+class SimClip:
+    __slots__ = ("name", "length")
+
+    def __init__(self, name, length):
+        self.name = name
+        self.length = length
+
+    def get_length(self):
+        return self.length
+
+
+class SimAudioSink:
+    """
+    AudioEngine 의 pygame 믹서 대신 쓰는 출력. 재생은 기록만 하고 AudioEngine 이 클립 길이만큼 기다린다.
+    fill_missing=True 면 TTS_DIR 에 없는 클립도 SIM_CLIP_SECONDS 길이로 있는 것처럼 취급.
+    """
+    fill_missing = True
+
+    def __init__(self, clip_seconds=SIM_CLIP_SECONDS, fill_missing=True):
+        self.clip_seconds = clip_seconds
+        self.fill_missing = fill_missing
+        self.played = deque(maxlen=256)   # (monotonic, 클립 이름)
+
+    def load(self, name, path=None):
+        length = self.clip_seconds
+        if path:
+            try:
+                if path.endswith(".wav"):
+                    with wave.open(path) as w:
+                        length = w.getnframes() / w.getframerate()
+                else:
+                    length = os.path.getsize(path) * 8.0 / SIM_MP3_BITRATE
+            except (OSError, wave.Error):
+                pass
+        return SimClip(name, length)
+
+    def play(self, clip):
+        self.played.append((time.monotonic(), clip.name))
+
+
+def audio_sink(backend=None):
+    """ board 면 None (AudioEngine 이 pygame 믹서 사용), sim 이면 SimAudioSink """
+    return SimAudioSink() if (backend or HAL_BACKEND) == "sim" else None
+
+
+# ───────────────── 카메라 ─────────────────
+class VideoFileCamera:
+    """ 녹화 영상을 원래 속도(또는 fps)로 끝없이 반복 재생. cv2.VideoCapture 와 같은 read/set/release """
+
+    def __init__(self, path, fps=None, loop=True):
+        import cv2
+        self._cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 15.0
+        self.loop = loop
+        self._next = time.monotonic()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return False    # 해상도/버퍼 설정은 영상 파일에 의미 없음
+
+    def read(self):
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + 1.0 / self.fps, time.monotonic())
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class SimFrame(np.ndarray):
+    """ 합성 프레임. bus / box 는 SimVision 이 "검출" 할 정답 """
+    bus = None
+    box = None
+
+
+class SimCamera:
+    """
+    회색 배경 위로 버스(밝은 사각형)가 들어와 dwell 초 동안 정차했다가 떠나는 합성 영상.
+    도착은 분당 arrivals_per_min 번(포아송), 버스 번호는 buses 중에서 고름.
+    들어오는 동안은 사각형이 움직여 InferenceGate 의 움직임 감지를 통과한다.
+    """
+
+    def __init__(self, buses=("77",), arrivals_per_min=2.0, dwell=4.0, approach=1.0, fps=10.0,
+                 size=(160, 120), seed=None):
+        self.buses = list(buses)
+        self.rate = arrivals_per_min / 60.0
+        self.dwell = dwell
+        self.approach = approach
+        self.fps = fps
+        self.w, self.h = size
+        self.rng = random.Random(seed)
+        self.arrivals = 0
+        self._bg = np.full((self.h, self.w, 3), 90, dtype=np.uint8)
+        self._next = time.monotonic()
+        self._bus, self._t_in = None, None
+        self._next_arrival = time.monotonic() + self._gap()
+        self._opened = True
+
+    def _gap(self):
+        return self.rng.expovariate(self.rate) if self.rate > 0 else float("inf")
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False
+
+    def read(self):
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+        self._next = max(self._next + 1.0 / self.fps, now)
+
+        if self._bus is None and now >= self._next_arrival:
+            self._bus, self._t_in = self.rng.choice(self.buses), now
+            self.arrivals += 1
+        frame = self._bg.copy().view(SimFrame)
+        if self._bus is not None:
+            t = now - self._t_in
+            if t > self.approach + self.dwell:
+                self._bus = None
+                self._next_arrival = now + self._gap()
+            else:
+                bw, bh = self.w // 2, self.h // 2
+                x = int((self.w - bw) * min(t / self.approach, 1.0))   # 왼쪽에서 들어와 정차
+                y = (self.h - bh) // 2
+                frame[y:y + bh, x:x + bw] = 230
+                frame.bus, frame.box = self._bus, (x, y, x + bw, y + bh)
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+class SimVision:
+    """ BusVision 대신: SimFrame 에 적힌 정답을 돌려줌. misread 확률로 다른 번호를 읽음 (투표 확인용) """
+
+    def __init__(self, misread=0.1, seed=None):
+        self.misread = misread
+        self.rng = random.Random(seed)
+
+    def detect(self, frame_bgr, timings=None):
+        box = getattr(frame_bgr, "box", None)
+        return [(*box, 0.9)] if box else []
+
+    def read(self, frame_bgr, box, timings=None):
+        bus = getattr(frame_bgr, "bus", None)
+        if bus and self.rng.random() < self.misread:
+            return str(self.rng.randint(1, 999))
+        return bus or ""
+
+    def run(self, frame_bgr, timings=None):
+        return [n for n in (self.read(frame_bgr, b) for b in self.detect(frame_bgr)) if n]
+
+    def warm_up(self, runs=3):
+        return [0.0] * runs
+
+    def set_threads(self, intra):
+        pass
+
+
+def open_camera(source=0, backend=None, width=640, height=480, **sim_kwargs):
+    """
+    board : cv2.VideoCapture(source) (장치 번호 또는 파일)
+    sim   : source 가 영상 파일이면 VideoFileCamera, 아니면 SimCamera(**sim_kwargs)
+    """
+    backend = backend or HAL_BACKEND
+    if backend == "sim":
+        if isinstance(source, str) and os.path.exists(source):
+            return VideoFileCamera(source)
+        return SimCamera(**sim_kwargs)
+    import cv2
+    cap = cv2.VideoCapture(source)
+    # 해상도 설정 (YOLO 입력에 맞게 640x480 등 설정)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    # V4L2 내부 큐에 프레임이 쌓이지 않도록 최소화
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
@@ -0,0 +1,41 @@
+# http_server.py  (노드 Flask 앱 실행기 - 개발 서버 / 멀티스레드 WSGI 서버 선택)
+#
+# 예전에는 노드마다 app.run(...) (Werkzeug 개발 서버)을 데몬 스레드로 띄웠다.
+# 요청마다 스레드를 새로 만들고 keep-alive 가 없어서 호출이 몰리면 카메라/GUI 루프와
+# GIL 을 더 많이 다툰다. backend 로 서버를 고를 수 있게 한다.
+#
+#   "werkzeug" : 기존 app.run (기본값, 추가 패키지 없음)
+#   "waitress" : 고정 크기 스레드 풀 + 비동기 소켓 루프 (pip install waitress, 순수 파이썬이라 ARM OK)
+#
+# waitress 가 없으면 경고 후 werkzeug 로 실행한다.
+#
+#   serve(app, "0.0.0.0", 5000, backend="waitress", threads=4)
+#   serve_in_thread(app, "0.0.0.0", 5000, backend=HTTP_SERVER)
+
+import threading
+
+BACKENDS = ("werkzeug", "waitress")
+
+
+def serve(app, host, port, backend="werkzeug", threads=4):
+    """ 블로킹 실행 """
+    if backend == "waitress":
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            print("[WARN] waitress 미설치 → Werkzeug 개발 서버로 실행")
+        else:
+            print(f"[HTTP] waitress ({threads} threads) {host}:{port}")
+            waitress_serve(app, host=host, port=port, threads=threads,
+                           connection_limit=1000, channel_timeout=30, backlog=1024)
+            return
+    elif backend != "werkzeug":
+        print(f"[WARN] 알 수 없는 HTTP 서버 '{backend}' → Werkzeug 개발 서버로 실행")
+    app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+
+
+def serve_in_thread(app, host, port, backend="werkzeug", threads=4):
+    t = threading.Thread(target=serve, args=(app, host, port, backend, threads),
+                         name="http", daemon=True)
+    t.start()
+    return t
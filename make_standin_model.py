@@ -0,0 +1,64 @@
+# make_standin_model.py  (CI / 오프라인 벤치마크용 가짜 bus_number.onnx 생성)
+#
+# 실제 모델과 입출력 모양이 같은 아주 작은 ONNX 모델을 만든다.
+#   입력  : (1, 3, size, size) float32
+#   출력  : (1, N, 6)  = (cx, cy, w, h, conf, cls), N = (size/32)^2
+# 32x32 칸마다 평균 밝기가 높을수록 conf 가 커지는 "밝은 번호판 검출기"라서
+# bench_pipeline.py --synthetic 이 만드는 흰 번호판 프레임에서는 실제로 박스를 찾는다.
+#
+#   python3 make_standin_model.py --out standin.onnx [--size 640]
+
+import argparse
+import numpy as np
+
+CELL      = 32
+BOX_W     = 176     # bench_pipeline 합성 번호판(160x64) + 여백
+BOX_H     = 72
+GAIN      = 20.0    # conf = sigmoid(GAIN * (밝기 - THRESHOLD))
+THRESHOLD = 0.72
+
+
+def build(path, size=640):
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+
+    g = size // CELL
+    ys, xs = np.mgrid[0:g, 0:g].astype(np.float32)
+    const = lambda v: np.full((1, 1, g, g), v, dtype=np.float32)
+    consts = {
+        "cx": (xs * CELL + CELL / 2)[None, None],
+        "cy": (ys * CELL + CELL / 2)[None, None],
+        "bw": const(BOX_W), "bh": const(BOX_H), "cls": const(1.0),
+        "gain": np.array(GAIN, dtype=np.float32),
+        "thr": np.array(THRESHOLD, dtype=np.float32),
+        "shape": np.array([1, 6, g * g], dtype=np.int64),
+    }
+    nodes = [
+        helper.make_node("ReduceMean", ["images"], ["gray"], axes=[1], keepdims=1),
+        helper.make_node("AveragePool", ["gray"], ["cell"], kernel_shape=[CELL, CELL],
+                         strides=[CELL, CELL]),
+        helper.make_node("Sub", ["cell", "thr"], ["d"]),
+        helper.make_node("Mul", ["d", "gain"], ["logit"]),
+        helper.make_node("Sigmoid", ["logit"], ["conf"]),
+        helper.make_node("Concat", ["cx", "cy", "bw", "bh", "conf", "cls"], ["grid"], axis=1),
+        helper.make_node("Reshape", ["grid", "shape"], ["flat"]),
+        helper.make_node("Transpose", ["flat"], ["output0"], perm=[0, 2, 1]),
+    ]
+    graph = helper.make_graph(
+        nodes, "standin_bus_number",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, size, size])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [1, g * g, 6])],
+        [numpy_helper.from_array(v, k) for k, v in consts.items()],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+    return path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="standin.onnx")
+    ap.add_argument("--size", type=int, default=640)
+    args = ap.parse_args()
+    print(f"[STANDIN] 저장: {build(args.out, args.size)}")
@@ -0,0 +1,204 @@
+# metrics.py  (노드 내부 지표 레지스트리 + /metrics 엔드포인트)
+#
+# 카메라 루프처럼 뜨거운 경로에서 부르는 observe()/inc() 는 잠금 하나 + 정수 덧셈뿐이라 1us 안팎.
+# 이미 다른 곳에서 세고 있는 값(버퍼 drop 수, peer 실패 수, 큐 길이 등)은 새로 세지 않고
+# 읽는 함수만 등록해 두면 /metrics 요청이 올 때 한 번 읽는다 (평소 비용 0).
+# 출력은 Prometheus 텍스트 형식이라 사람이 curl 로 봐도 되고 수집기에 물려도 된다.
+#
+#   metrics = MetricsRegistry()
+#   yolo = metrics.histogram("stop_yolo_seconds", "YOLO 검출 시간")
+#   yolo.observe(0.083)
+#   metrics.gauge_fn("stop_pending_calls", "호출 대기 버스 수", lambda: len(pending_calls))
+#   add_metrics_endpoint(app, metrics)        # GET /metrics
+
+import bisect
+import threading
+import time
+
+# 초 단위 지연용 기본 구간 (카메라 추론 ~ TTS 재생까지 한 벌로)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _fmt(v):
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, int):
+        return str(v)
+    return repr(float(v))
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+# ───────────────── 지표 ─────────────────
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self):
+        yield self.name, self.labels, self._value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, v):
+        self._value = v      # 대입 하나라 잠금 불필요
+
+    def dec(self, n=1):
+        self.inc(-n)
+
+
+class Histogram:
+    """ 누적 구간 히스토그램. 구간 경계는 고정이라 observe 는 이진 탐색 + 덧셈 """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)   # 마지막 칸 = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, v):
+        i = bisect.bisect_left(self.buckets, v)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += v
+            self._count += 1
+
+    def time(self):
+        """ with hist.time(): ...  (perf_counter 기준 초) """
+        return _Timer(self)
+
+    @property
+    def count(self):
+        return self._count
+
+    def samples(self):
+        with self._lock:
+            counts, total, n = list(self._counts), self._sum, self._count
+        acc = 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            acc += c
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield self.name + "_bucket", dict(self.labels, le=le), acc
+        yield self.name + "_sum", self.labels, total
+        yield self.name + "_count", self.labels, n
+
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+
+
+class FuncMetric:
+    """ 요청이 올 때 fn() 을 불러 값을 읽는 지표 (다른 객체가 이미 세고 있는 값) """
+
+    def __init__(self, name, help_text, labels, fn, kind):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        try:
+            v = self.fn()
+        except Exception as e:
+            print(f"[WARN] 지표 {self.name} 읽기 실패: {e}")
+            return
+        if v is not None:
+            yield self.name, self.labels, v
+
+
+# ───────────────── 레지스트리 ─────────────────
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}      # (이름, 라벨) → 지표, 등록 순서 유지
+        self._collectors = []   # fn() → [(이름, 종류, 설명, 라벨, 값)]
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kw):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            m = self._metrics.get(key)
+            if m is None:
+                m = self._metrics[key] = cls(name, help_text, labels, **kw)
+            return m
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def gauge_fn(self, name, help_text, fn, **labels):
+        return self._get(FuncMetric, name, help_text, labels, fn=fn, kind="gauge")
+
+    def counter_fn(self, name, help_text, fn, **labels):
+        return self._get(FuncMetric, name, help_text, labels, fn=fn, kind="counter")
+
+    def add_collector(self, fn):
+        """ 라벨이 늘었다 줄었다 하는 지표 묶음 (예: dispatcher peer 별 통계) """
+        self._collectors.append(fn)
+
+    def render(self):
+        """ Prometheus 텍스트 형식 """
+        families = {}   # 이름 → (종류, 설명, [(샘플 이름, 라벨, 값)])
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            fam = families.setdefault(m.name, (m.kind, m.help, []))
+            fam[2].extend(m.samples())
+        for fn in self._collectors:
+            try:
+                rows = list(fn())
+            except Exception as e:
+                print(f"[WARN] 지표 수집 실패: {e}")
+                continue
+            for name, kind, help_text, labels, value in rows:
+                families.setdefault(name, (kind, help_text, []))[2].append((name, labels, value))
+
+        out = []
+        for name, (kind, help_text, samples) in families.items():
+            if help_text:
+                out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for sname, labels, value in samples:
+                out.append(f"{sname}{_labels_text(labels)} {_fmt(value)}")
+        return "\n".join(out) + "\n"
+
+
+def add_metrics_endpoint(app, registry, path="/metrics"):
+    """ Flask 앱에 GET /metrics 추가 """
+    def metrics_view():
+        return registry.render(), 200, {"Content-Type": CONTENT_TYPE}
+    app.add_url_rule(path, "metrics", metrics_view)
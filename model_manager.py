@@ -0,0 +1,100 @@
+# model_manager.py  (onnxruntime 세션 / 모델 변형 관리)
+#
+# - 모델 변형 선택: bus_number.onnx 옆에 quantize_model.py 로 만든
+#     bus_number.int8.onnx / bus_number.320.onnx / bus_number.int8-320.onnx 를 두고 이름으로 고른다.
+# - 세션 프로파일: 스레드 수, 실행 모드, 그래프 최적화 수준을 이름 붙인 설정으로 관리
+# - 워밍업: 카메라 루프 시작 전에 더미 입력으로 몇 번 돌려 첫 프레임 지연을 없앤다
+
+import os
+import time
+import numpy as np
+import onnxruntime as ort
+
+# ───────────────── 세션 프로파일 ─────────────────
+# intra : 연산자 하나를 나눠 돌리는 스레드 수
+# inter : 병렬 실행 모드에서 연산자들을 동시에 돌리는 스레드 수
+# mode  : "sequential" | "parallel"
+# opt   : "disable" | "basic" | "extended" | "all"
+SESSION_PROFILES = {
+    "default": {},
+    # Orange Pi 4코어를 YOLO 에 모두 사용
+    "opi-full":   {"intra": 4, "inter": 1, "mode": "sequential", "opt": "all"},
+    # 캡처/OCR 스레드 몫으로 코어를 남겨둠
+    "opi-shared": {"intra": 3, "inter": 1, "mode": "sequential", "opt": "all"},
+    # OCR 숫자 인식처럼 작은 모델용
+    "single":     {"intra": 1, "inter": 1, "mode": "sequential", "opt": "all"},
+}
+
+_OPT_LEVELS = {
+    "disable":  ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic":    ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all":      ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+_EXEC_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel":   ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def make_session_options(profile="default"):
+    """ 프로파일 이름 또는 dict → ort.SessionOptions """
+    cfg = SESSION_PROFILES[profile] if isinstance(profile, str) else dict(profile)
+    opts = ort.SessionOptions()
+    if "intra" in cfg:
+        opts.intra_op_num_threads = cfg["intra"]
+    if "inter" in cfg:
+        opts.inter_op_num_threads = cfg["inter"]
+    if "mode" in cfg:
+        opts.execution_mode = _EXEC_MODES[cfg["mode"]]
+    if "opt" in cfg:
+        opts.graph_optimization_level = _OPT_LEVELS[cfg["opt"]]
+    if cfg.get("spin") is False:
+        # 스레드 풀이 busy-wait 하지 않게 (발열/전력 우선)
+        opts.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        opts.add_session_config_entry("session.inter_op.allow_spinning", "0")
+    return opts
+
+def create_session(path, profile="default"):
+    return ort.InferenceSession(path, sess_options=make_session_options(profile),
+                                providers=["CPUExecutionProvider"])
+
+
+# ───────────────── 모델 변형 ─────────────────
+def variant_path(base_path, variant):
+    """ ("…/bus_number.onnx", "int8") → "…/bus_number.int8.onnx" """
+    if not variant or variant == "fp32":
+        return base_path
+    root, ext = os.path.splitext(base_path)
+    return f"{root}.{variant}{ext}"
+
+def select_model(base_path, variant):
+    """ 변형 파일이 있으면 그 경로, 없으면 경고 후 원본 경로 """
+    path = variant_path(base_path, variant)
+    if path != base_path and not os.path.isfile(path):
+        print(f"[WARN] 모델 변형 '{variant}' 없음 ({path}) → 원본 모델 사용")
+        return base_path
+    return path
+
+def model_input_size(session, default=640):
+    """ (1, 3, H, W) 입력의 H. 동적 축이면 default """
+    h = session.get_inputs()[0].shape[2]
+    return h if isinstance(h, int) else default
+
+
+# ───────────────── 워밍업 ─────────────────
+_ORT_DTYPES = {"tensor(float)": np.float32, "tensor(float16)": np.float16,
+               "tensor(uint8)": np.uint8, "tensor(int8)": np.int8}
+
+def warm_up(session, runs=3, size=None):
+    """ 더미 입력으로 runs 번 실행. 각 실행 시간(ms) 목록 반환 """
+    inp = session.get_inputs()[0]
+    shape = [d if isinstance(d, int) else (size or 640) for d in inp.shape]
+    shape[0] = 1
+    x = np.zeros(shape, dtype=_ORT_DTYPES.get(inp.type, np.float32))
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        session.run(None, {inp.name: x})
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
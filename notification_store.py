@@ -0,0 +1,148 @@
+# notification_store.py  (기사 단말 알림 저장소)
+#
+# (stop, bus) 키 하나에 알림 하나. 같은 버스 호출이 다시 오면 새로 쌓지 않고 갱신만 한다.
+# - 스레드 안전 (Flask/이벤트 버스 스레드가 쓰고 GUI 루프가 읽음)
+# - max_size 를 넘으면 가장 오래된 알림부터 버림, ttl 초 동안 갱신이 없으면 만료
+# - 바뀔 때마다 version 이 1씩 증가하고 변경 로그에 (version, op, key) 를 남긴다
+#   → 화면은 changes_since(마지막으로 그린 version) 으로 바뀐 것만 받아 다시 그림 (변경 수에 비례)
+#
+#   store = NotificationStore(max_size=10, ttl=600)
+#   store.add("광주대학교 정류장", "77", (msg_ko, msg_en))
+#   version, changes = store.changes_since(drawn_version)   # changes 가 None 이면 snapshot() 으로 전체 다시
+#   store.remove("광주대학교 정류장", "77")      # 도착 처리 (stop 없는 도착만 remove_bus("77"))
+
+import threading
+import time
+from collections import OrderedDict
+
+ADD, UPDATE, REMOVE = "add", "update", "remove"
+
+
+class Notification:
+    __slots__ = ("stop", "bus", "lines", "created", "updated", "count", "version")
+
+    def __init__(self, stop, bus, lines, now, version):
+        self.stop = stop
+        self.bus = bus
+        self.lines = tuple(lines)
+        self.created = now
+        self.updated = now
+        self.count = 1            # 같은 호출이 몇 번 들어왔는지
+        self.version = version    # 마지막으로 바뀐 store version
+
+    @property
+    def key(self):
+        return (self.stop, self.bus)
+
+
+class NotificationStore:
+    def __init__(self, max_size=10, ttl=600.0, log_size=256):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.log_size = log_size
+        self._items = OrderedDict()   # key → Notification, 오래 갱신 안 된 것이 앞
+        self._lock = threading.Lock()
+        self._version = 0
+        self._log = []                # [(version, op, key)], version 이 연속이라 위치로 바로 찾음
+        self._log_base = 1            # _log[0] 의 version
+
+    @property
+    def version(self):
+        return self._version
+
+    def __len__(self):
+        return len(self._items)
+
+    # ───────────── 변경 ─────────────
+    def _record(self, op, key):
+        self._version += 1
+        self._log.append((self._version, op, key))
+        if len(self._log) > self.log_size * 2:
+            # 앞 절반 버림 (분할 상환 O(1)), 그보다 오래된 version 은 전체 다시 그리기
+            drop = len(self._log) - self.log_size
+            del self._log[:drop]
+            self._log_base += drop
+        return self._version
+
+    def _expire_locked(self, now):
+        while self._items:
+            key, n = next(iter(self._items.items()))
+            if now - n.updated < self.ttl:
+                break
+            del self._items[key]
+            self._record(REMOVE, key)
+
+    def add(self, stop, bus, lines, now=None):
+        """ 알림 추가/갱신. (Notification, 새 알림인지) 반환 """
+        now = time.time() if now is None else now
+        key = (stop, bus)
+        with self._lock:
+            self._expire_locked(now)
+            n = self._items.get(key)
+            if n is not None:
+                n.lines = tuple(lines)
+                n.updated = now
+                n.count += 1
+                n.version = self._record(UPDATE, key)
+                self._items.move_to_end(key)
+                return n, False
+            n = self._items[key] = Notification(stop, bus, lines, now, self._version + 1)
+            self._record(ADD, key)
+            while len(self._items) > self.max_size:
+                old, _ = self._items.popitem(last=False)
+                self._record(REMOVE, old)
+            return n, True
+
+    def remove(self, stop, bus):
+        with self._lock:
+            if self._items.pop((stop, bus), None) is None:
+                return False
+            self._record(REMOVE, (stop, bus))
+            return True
+
+    def remove_bus(self, bus):
+        """ 모든 정류장의 해당 버스 알림 삭제 (도착 처리). 지운 개수 반환 """
+        with self._lock:
+            keys = [k for k in self._items if k[1] == bus]
+            for k in keys:
+                del self._items[k]
+                self._record(REMOVE, k)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._items)
+            self._items.clear()
+            for k in keys:
+                self._record(REMOVE, k)
+            return len(keys)
+
+    def expire(self, now=None):
+        """ TTL 지난 알림 정리. 오래된 순으로 정렬돼 있어 만료된 개수만큼만 봄 """
+        with self._lock:
+            before = self._version
+            self._expire_locked(time.time() if now is None else now)
+            return self._version - before
+
+    # ───────────── 조회 ─────────────
+    def snapshot(self):
+        """ (version, 알림 목록) - 목록은 오래된 것부터 """
+        with self._lock:
+            return self._version, list(self._items.values())
+
+    def get(self, stop, bus):
+        with self._lock:
+            return self._items.get((stop, bus))
+
+    def changes_since(self, version):
+        """
+        (현재 version, [(version, op, key)]) 반환.
+        version 이 로그보다 오래됐으면 changes 는 None → snapshot() 으로 전체 다시 읽을 것.
+        """
+        with self._lock:
+            if version >= self._version:
+                return self._version, []
+            start = version + 1 - self._log_base
+            if start < 0:
+                return self._version, None
+            return self._version, self._log[start:]
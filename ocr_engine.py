@@ -0,0 +1,157 @@
+# ocr_engine.py  (stop_node 번호판 OCR 백엔드)
+# 모든 백엔드는 read(roi_rgb) -> 숫자 문자열 하나로 동일하게 사용한다.
+#
+#   "tesseract-cli" : 기존 방식. pytesseract 가 ROI 마다 tesseract 프로세스를 새로 띄움
+#   "tesseract-api" : tesserocr 로 프로세스 안에 Tesseract 핸들을 한 번만 만들고 재사용
+#   "onnx-digits"   : 작은 CRNN(CTC) 숫자 인식 모델을 onnxruntime 으로 실행
+#   "none"          : OCR 생략 (검출 단계만 벤치마크할 때)
+
+import re
+import threading
+import cv2
+import numpy as np
+
+
+# ───────────────── OCR_CONFIG 해석 ─────────────────
+def parse_whitelist(config, default="0123456789"):
+    m = re.search(r"tessedit_char_whitelist=(\S+)", config)
+    return m.group(1) if m else default
+
+def parse_psm(config, default=7):
+    m = re.search(r"--psm\s+(\d+)", config)
+    return int(m.group(1)) if m else default
+
+def parse_oem(config, default=3):
+    m = re.search(r"--oem\s+(\d+)", config)
+    return int(m.group(1)) if m else default
+
+
+# ───────────────── 공통 전처리 ─────────────────
+def preprocess_for_ocr(roi_rgb):
+    gray = cv2.cvtColor(roi_rgb, cv2.COLOR_RGB2GRAY)
+    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    _, thr = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    inv = cv2.bitwise_not(thr)
+    return inv
+
+
+# ───────────────── 백엔드 ─────────────────
+class OcrEngine:
+    name = "base"
+
+    def __init__(self, config):
+        self.config = config
+        self.whitelist = parse_whitelist(config)
+
+    def recognize(self, roi_rgb):
+        """ 백엔드별 원문 인식 결과 (화이트리스트 밖 문자가 섞여 있을 수 있음) """
+        raise NotImplementedError
+
+    def read(self, roi_rgb):
+        if roi_rgb.size == 0:
+            return ""
+        raw = self.recognize(roi_rgb)
+        return "".join(c for c in raw if c in self.whitelist)
+
+    def close(self):
+        pass
+
+
+class NullOCR(OcrEngine):
+    name = "none"
+
+    def recognize(self, roi_rgb):
+        return ""
+
+
+class TesseractCliOCR(OcrEngine):
+    name = "tesseract-cli"
+
+    def __init__(self, config):
+        super().__init__(config)
+        import pytesseract
+        self._pytesseract = pytesseract
+
+    def recognize(self, roi_rgb):
+        proc = preprocess_for_ocr(roi_rgb)
+        return self._pytesseract.image_to_string(proc, config=self.config).strip()
+
+
+class TesseractApiOCR(OcrEngine):
+    name = "tesseract-api"
+
+    def __init__(self, config, lang="eng"):
+        super().__init__(config)
+        import tesserocr
+        from PIL import Image
+        self._Image = Image
+        self._api = tesserocr.PyTessBaseAPI(lang=lang, psm=parse_psm(config), oem=parse_oem(config))
+        self._api.SetVariable("tessedit_char_whitelist", self.whitelist)
+        self._lock = threading.Lock()   # PyTessBaseAPI 는 스레드 안전하지 않음
+
+    def recognize(self, roi_rgb):
+        proc = preprocess_for_ocr(roi_rgb)
+        with self._lock:
+            self._api.SetImage(self._Image.fromarray(proc))
+            return self._api.GetUTF8Text().strip()
+
+    def close(self):
+        self._api.End()
+
+
+class OnnxDigitOCR(OcrEngine):
+    """
+    CRNN 계열 숫자 인식 모델.
+      입력  : (1, 1, H, W) float32 흑백, 0~1
+      출력  : (1, T, C) 또는 (T, 1, C) 로짓, C = len(charset) + 1, 0번이 CTC blank
+    charset 은 OCR_CONFIG 의 화이트리스트 순서를 그대로 따른다.
+    """
+    name = "onnx-digits"
+
+    def __init__(self, config, session):
+        super().__init__(config)
+        self._session = session
+        inp = session.get_inputs()[0]
+        self._input_name = inp.name
+        _, _, h, w = inp.shape
+        self._h = h if isinstance(h, int) else 32
+        self._w = w if isinstance(w, int) else 128
+
+    def recognize(self, roi_rgb):
+        gray = cv2.cvtColor(roi_rgb, cv2.COLOR_RGB2GRAY)
+        gray = cv2.resize(gray, (self._w, self._h), interpolation=cv2.INTER_AREA)
+        x = (gray.astype(np.float32) * (1 / 255.0))[None, None]
+        logits = self._session.run(None, {self._input_name: x})[0]
+        if logits.ndim == 3:
+            logits = logits[0] if logits.shape[0] == 1 else logits[:, 0]
+        return self._ctc_greedy(logits.argmax(axis=-1))
+
+    def _ctc_greedy(self, ids):
+        # 연속 중복 제거 → blank(0) 제거
+        keep = np.ones(len(ids), dtype=bool)
+        keep[1:] = ids[1:] != ids[:-1]
+        ids = ids[keep]
+        return "".join(self.whitelist[i - 1] for i in ids if 0 < i <= len(self.whitelist))
+
+
+# ───────────────── 생성 ─────────────────
+def create_ocr_engine(backend, config, model_path=None, session_factory=None):
+    """
+    backend 이름으로 OCR 엔진 생성.
+    필요한 라이브러리/모델이 없으면 경고 후 tesseract-cli 로 대체한다.
+    session_factory(path) 는 onnxruntime 세션을 만드는 함수 (stop_node 와 같은 설정 사용).
+    """
+    try:
+        if backend == "none":
+            return NullOCR(config)
+        if backend == "tesseract-api":
+            return TesseractApiOCR(config)
+        if backend == "onnx-digits":
+            if not model_path or session_factory is None:
+                raise ValueError("onnx-digits 에는 model_path 와 session_factory 가 필요")
+            return OnnxDigitOCR(config, session_factory(model_path))
+        if backend != "tesseract-cli":
+            print(f"[WARN] 알 수 없는 OCR 백엔드 '{backend}'")
+    except Exception as e:
+        print(f"[WARN] OCR 백엔드 '{backend}' 초기화 실패: {e} → tesseract-cli 사용")
+    return TesseractCliOCR(config)
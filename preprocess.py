@@ -0,0 +1,83 @@
+# preprocess.py  (YOLO 입력용 색 보정 + 레터박스 + 정규화 통합 단계)
+#
+# 기존 adjust_gamma → adjust_saturation → letterbox → blobFromImage 와 같은 결과를
+# 전부 uint8 로, 미리 만든 LUT 와 재사용 버퍼 위에서 만든다.
+#   - 감마 LUT / 채도 LUT 는 생성 시 한 번만 계산
+#   - 채도는 HSV(uint8) 의 S 채널에만 LUT 적용 (float 변환 없음)
+#   - 보정 결과는 레터박스 캔버스 안쪽에 바로 기록
+#   - float 은 모델 입력 blob 하나뿐이고 이것도 프레임마다 재사용
+#
+# 주의: blob 은 다음 호출에서 덮어쓰므로 session.run 이 끝난 뒤에는 보관하지 말 것.
+
+import cv2
+import numpy as np
+
+from yolo_decoder import letterbox_params, LETTERBOX_COLOR
+
+
+def gamma_lut(gamma):
+    inv = 1.0 / gamma
+    return np.array([((i/255.0)**inv)*255 for i in range(256)], dtype=np.uint8)
+
+def saturation_lut(saturation):
+    # HSV 의 H, V 는 그대로, S 만 배율 적용 (기존 구현처럼 clip 후 버림)
+    s = np.clip(np.arange(256, dtype=np.float32) * saturation, 0, 255).astype(np.uint8)
+    ident = np.arange(256, dtype=np.uint8)
+    return np.dstack([ident, s, ident]).reshape(256, 1, 3)
+
+
+class YoloPreprocessor:
+    """
+    pre = YoloPreprocessor(GAMMA, SATURATION, 640)
+    blob, scale, pad = pre(frame_bgr)      # 모델 입력 (1, 3, size, size) float32, BGR 순서
+    roi_rgb = pre.correct(frame_bgr[y1:y2, x1:x2])   # OCR 용 작은 영역만 같은 보정
+    """
+
+    def __init__(self, gamma, saturation, size=640):
+        self.size = size
+        self._gamma = gamma_lut(gamma)
+        self._sat = saturation_lut(saturation)
+        self._shape = None
+        self.blob = np.empty((1, 3, size, size), dtype=np.float32)
+        self._canvas = np.empty((size, size, 3), dtype=np.uint8)
+
+    def _prepare(self, h, w):
+        """ 입력 해상도가 바뀔 때만 버퍼 재할당 """
+        self.scale, self.pad, (new_w, new_h) = letterbox_params(w, h, self.size)
+        pad_x, pad_y = self.pad
+        self._canvas[:] = LETTERBOX_COLOR
+        self._inner = self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+        self._resized = None if (new_w, new_h) == (w, h) else np.empty((new_h, new_w, 3), np.uint8)
+        self._tmp = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._shape = (h, w)
+
+    def __call__(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+        if self._shape != (h, w):
+            self._prepare(h, w)
+
+        src = frame_bgr
+        if self._resized is not None:
+            # 먼저 줄이면 LUT/HSV 변환할 픽셀 수가 줄어든다
+            src = cv2.resize(frame_bgr, self._resized.shape[1::-1], dst=self._resized,
+                             interpolation=cv2.INTER_LINEAR)
+        tmp = self._tmp
+        cv2.LUT(src, self._gamma, dst=tmp)                 # 감마 (채널 순서 무관)
+        cv2.cvtColor(tmp, cv2.COLOR_BGR2HSV, dst=tmp)
+        cv2.LUT(tmp, self._sat, dst=tmp)                   # 채도
+        if self._inner.flags.c_contiguous:                 # 가로 패딩이 없으면 캔버스에 바로 기록
+            cv2.cvtColor(tmp, cv2.COLOR_HSV2BGR, dst=self._inner)
+        else:
+            cv2.cvtColor(tmp, cv2.COLOR_HSV2BGR, dst=tmp)
+            self._inner[...] = tmp
+
+        # HWC uint8 → NCHW float32 /255 (blobFromImage(swapRB=True) 와 같은 BGR 순서)
+        np.multiply(self._canvas.transpose(2, 0, 1), np.float32(1 / 255.0), out=self.blob[0])
+        return self.blob, self.scale, self.pad
+
+    def correct(self, img_bgr):
+        """ 작은 영역용: 같은 감마/채도 보정 후 RGB 로 반환 (새 배열) """
+        out = cv2.LUT(img_bgr, self._gamma)
+        cv2.cvtColor(out, cv2.COLOR_BGR2HSV, dst=out)
+        cv2.LUT(out, self._sat, dst=out)
+        return cv2.cvtColor(out, cv2.COLOR_HSV2RGB)
@@ -0,0 +1,154 @@
+# preview.py  (stop_node 카메라 미리보기: MJPEG over HTTP)
+#
+# 예전 camera_loop 는 매 프레임 cv2.imshow + cv2.waitKey(1) 을 불러 X 화면이 있어야 했고
+# 캡처 루프가 GUI 왕복을 기다렸다. 기둥에 달린 보드에는 화면이 없으므로 창 대신
+# 노드의 Flask 앱에서 저속 MJPEG 스트림을 내보낸다.
+#
+#   preview = PreviewStream(fps=3, width=480)
+#   preview.add_routes(app)                 # GET /preview.mjpg (스트림), GET /preview.jpg (한 장)
+#   preview.publish(frame_bgr)              # 캡처 루프: 참조만 넘김 (복사 없음)
+#   if preview.active: preview.annotate([(box, "47"), ...])   # 검출 루프: 박스 + OCR 결과
+#
+# 보는 사람이 없으면 publish / annotate 는 속성 확인 한 번으로 끝나고 인코더 스레드도 돌지 않는다.
+# 접속이 있으면 인코더 스레드 하나가 fps 주기로 최신 프레임을 줄이고(이때 새 배열이 생김)
+# 박스를 그려 JPEG 로 만든 뒤 모든 클라이언트에 같은 바이트를 보낸다.
+# 스트림 하나가 waitress 스레드 하나를 붙잡으므로 max_clients 로 동시 접속을 제한한다.
+
+import threading
+import time
+
+BOUNDARY = "frame"
+
+
+class PreviewStream:
+    def __init__(self, fps=3.0, width=480, quality=70, max_clients=1, overlay_ttl=1.0):
+        self.interval = 1.0 / fps
+        self.width = width
+        self.quality = quality
+        self.max_clients = max_clients
+        self.overlay_ttl = overlay_ttl      # 이보다 오래된 검출 결과는 그리지 않음
+        self.clients = 0
+        self.active = False                 # 접속 중인 클라이언트가 있을 때만 True
+        self.encoded = 0
+        self._frame = None                  # 캡처 루프가 넘긴 최신 프레임 (참조)
+        self._overlay = (0.0, [])           # (시각, [(box, label), ...])
+        self._jpeg = None
+        self._seq = 0
+        self._gen = 0                       # 인코더 스레드 세대 (끊겼다 바로 다시 붙어도 하나만 돌게)
+        self._cond = threading.Condition()
+
+    # ───────────── 생산자 (캡처 / 검출 루프) ─────────────
+    def publish(self, frame_bgr):
+        if self.active:
+            self._frame = frame_bgr
+
+    def annotate(self, items):
+        """ items: [(box, label), ...]. box 는 원본 프레임 좌표 (x1, y1, x2, y2, ...) """
+        if self.active:
+            self._overlay = (time.monotonic(), items)
+
+    # ───────────── 인코더 ─────────────
+    def _render(self, frame_bgr):
+        import cv2
+        scale = self.width / frame_bgr.shape[1] if self.width else 1.0
+        if scale < 1.0:
+            img = cv2.resize(frame_bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            img, scale = frame_bgr.copy(), 1.0    # 그리기 전에 원본과 분리
+        t, items = self._overlay
+        if time.monotonic() - t <= self.overlay_ttl:
+            for box, label in items:
+                x1, y1, x2, y2 = (int(v * scale) for v in box[:4])
+                cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                if label:
+                    cv2.putText(img, label, (x1, max(y1 - 6, 12)), cv2.FONT_HERSHEY_SIMPLEX,
+                                0.6, (0, 255, 0), 2)
+        ok, buf = cv2.imencode(".jpg", img, (cv2.IMWRITE_JPEG_QUALITY, self.quality))
+        return buf.tobytes() if ok else None
+
+    def _encode_loop(self, gen):
+        last = None
+        while self.active and gen == self._gen:
+            t0 = time.monotonic()
+            frame = self._frame
+            if frame is not None and frame is not last:
+                try:
+                    jpeg = self._render(frame)
+                except Exception as e:
+                    print(f"[WARN] 미리보기 인코딩 실패: {e}")
+                    jpeg = None
+                if jpeg:
+                    last = frame
+                    with self._cond:
+                        self._jpeg, self._seq = jpeg, self._seq + 1
+                        self.encoded += 1
+                        self._cond.notify_all()
+            time.sleep(max(self.interval - (time.monotonic() - t0), 0.0))
+        if gen == self._gen:
+            self._frame = None              # 마지막 프레임 참조를 놓아줌
+
+    # ───────────── 클라이언트 ─────────────
+    def _connect(self):
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            if not self.active:
+                self.active = True
+                self._gen += 1
+                threading.Thread(target=self._encode_loop, args=(self._gen,), name="preview",
+                                 daemon=True).start()
+            return True
+
+    def _disconnect(self):
+        with self._cond:
+            self.clients -= 1
+            if self.clients == 0:
+                self.active = False
+                self._jpeg = None
+
+    def _wait_jpeg(self, seq, timeout):
+        """ seq 다음 JPEG 을 기다려 (seq, bytes). 시간 안에 없으면 (seq, None) """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq and self._jpeg is not None, timeout)
+            return self._seq, (self._jpeg if self._seq != seq else None)
+
+    def frames(self):
+        """ multipart/x-mixed-replace 본문 (연결 정리는 응답 close 에서) """
+        seq = 0
+        while True:
+            seq, jpeg = self._wait_jpeg(seq, 5.0)
+            if jpeg is None:
+                continue
+            yield (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                   f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
+
+    def add_routes(self, app, path="/preview"):
+        from flask import Response
+
+        def stream_view():
+            if not self._connect():
+                return {"ok": False, "error": f"preview busy ({self.max_clients} client max)"}, 503
+            resp = Response(self.frames(), mimetype=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+                            headers={"Cache-Control": "no-cache"})
+            resp.call_on_close(self._disconnect)    # 클라이언트가 끊으면 서버가 close() 호출
+            return resp
+
+        def snapshot_view():
+            if not self._connect():
+                return {"ok": False, "error": "preview busy"}, 503
+            try:
+                _, jpeg = self._wait_jpeg(0, 3.0)
+            finally:
+                self._disconnect()
+            if jpeg is None:
+                return {"ok": False, "error": "no frame"}, 503
+            return Response(jpeg, mimetype="image/jpeg", headers={"Cache-Control": "no-cache"})
+
+        app.add_url_rule(path + ".mjpg", "preview_stream", stream_view)
+        app.add_url_rule(path + ".jpg", "preview_snapshot", snapshot_view)
+
+    def register_metrics(self, registry, prefix="preview"):
+        registry.gauge_fn(f"{prefix}_clients", "미리보기 접속 수", lambda: self.clients)
+        registry.counter_fn(f"{prefix}_frames_encoded_total", "인코딩한 미리보기 프레임 수",
+                            lambda: self.encoded)
@@ -0,0 +1,162 @@
+# quantize_model.py  (bus_number.onnx 변형 생성 도구 - 오프라인, PC 에서 실행 권장)
+#
+#   INT8 정적 양자화 (보정용 이미지 폴더 필요, Conv 모델은 static/QDQ 가 ARM CPU 에서 빠름)
+#     python3 quantize_model.py int8 --model bus_number.onnx --calib calib_imgs/
+#   INT8 동적 양자화 (보정 이미지 없이)
+#     python3 quantize_model.py int8 --model bus_number.onnx --dynamic
+#   입력 크기 축소 (예: 320). 모델 안에 크기가 고정된 Reshape 가 있으면 실패하므로
+#   그럴 땐 원본 학습 코드에서 imgsz=320 으로 다시 export 해야 한다.
+#     python3 quantize_model.py resize --model bus_number.onnx --size 320
+#   원본 대비 검출 결과 비교 (정확도 손실 확인)
+#     python3 quantize_model.py compare --model bus_number.onnx --variant int8 --calib calib_imgs/
+#
+# 결과 파일 이름은 model_manager.variant_path 규칙을 따른다 (bus_number.int8.onnx 등).
+
+import argparse
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+from onnxruntime.quantization import CalibrationDataReader
+
+from model_manager import create_session, variant_path, model_input_size
+from preprocess import YoloPreprocessor
+from yolo_decoder import decode_yolo_output
+
+# stop_node 설정과 같은 값으로 맞출 것
+GAMMA          = 0.8
+SATURATION     = 1.3
+CONF_THRESHOLD = 0.30
+
+
+def load_images(folder, limit):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp")
+                   for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    return [cv2.imread(p) for p in paths[:limit]]
+
+
+# ───────────────── INT8 ─────────────────
+class YoloCalibrationReader(CalibrationDataReader):
+    """ onnxruntime.quantization 용 보정 데이터 (stop_node 와 같은 전처리) """
+
+    def __init__(self, images, input_name, size):
+        self._pre = YoloPreprocessor(GAMMA, SATURATION, size)
+        self._images = list(images)
+        self._it = iter(self._images)
+        self._input_name = input_name
+
+    def get_next(self):
+        img = next(self._it, None)
+        if img is None:
+            return None
+        blob, _, _ = self._pre(img)
+        return {self._input_name: blob.copy()}
+
+    def rewind(self):
+        # entropy / percentile 등 여러 번 훑는 보정 방식이 두 번째부터 빈 데이터를 받지 않게
+        self._it = iter(self._images)
+
+def make_int8(args):
+    from onnxruntime.quantization import quantize_static, quantize_dynamic, QuantType, QuantFormat
+    out = args.out or variant_path(args.model, "int8" if args.size is None else f"int8-{args.size}")
+    if args.dynamic:
+        quantize_dynamic(args.model, out, weight_type=QuantType.QUInt8)
+    else:
+        if not args.calib:
+            raise SystemExit("[ERROR] 정적 양자화에는 --calib 이미지 폴더가 필요합니다 (또는 --dynamic)")
+        sess = create_session(args.model)
+        reader = YoloCalibrationReader(load_images(args.calib, args.limit),
+                                       sess.get_inputs()[0].name, model_input_size(sess))
+        quantize_static(args.model, out, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        per_channel=True)
+    print(f"[INT8] 저장: {out} ({os.path.getsize(args.model)//1024} KiB → {os.path.getsize(out)//1024} KiB)")
+
+
+# ───────────────── 입력 크기 축소 ─────────────────
+def make_resized(args):
+    import onnx
+    model = onnx.load(args.model)
+    dims = model.graph.input[0].type.tensor_type.shape.dim
+    dims[2].dim_value = args.size
+    dims[3].dim_value = args.size
+    # 출력/중간 텐서 모양은 크기에 따라 바뀌므로 비워두고 런타임 추론에 맡긴다
+    for out in model.graph.output:
+        out.type.tensor_type.ClearField("shape")
+    del model.graph.value_info[:]
+    out_path = args.out or variant_path(args.model, str(args.size))
+    onnx.save(model, out_path)
+    try:
+        sess = create_session(out_path)
+        x = np.zeros((1, 3, args.size, args.size), dtype=np.float32)
+        shape = sess.run(None, {sess.get_inputs()[0].name: x})[0].shape
+    except Exception as e:
+        os.remove(out_path)
+        raise SystemExit(f"[ERROR] {args.size} 입력으로 실행 불가: {e}\n"
+                         f"        원본 학습 코드에서 imgsz={args.size} 로 다시 export 하세요.")
+    print(f"[RESIZE] 저장: {out_path} (출력 {shape})")
+
+
+# ───────────────── 비교 ─────────────────
+def detect(sess, pre, img):
+    blob, scale, pad = pre(img)
+    outs = sess.run(None, {sess.get_inputs()[0].name: blob})[0]
+    return decode_yolo_output(outs, CONF_THRESHOLD, 0.45, scale, pad, (img.shape[1], img.shape[0]))
+
+def box_iou(a, b):
+    iw = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2]-a[0])*(a[3]-a[1]) + (b[2]-b[0])*(b[3]-b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def compare(args):
+    images = load_images(args.calib, args.limit)
+    results = {}
+    for name, path in (("fp32", args.model), (args.variant, variant_path(args.model, args.variant))):
+        sess = create_session(path, args.profile)
+        pre = YoloPreprocessor(GAMMA, SATURATION, model_input_size(sess))
+        dets, times = [], []
+        for img in images:
+            t0 = time.perf_counter()
+            dets.append(detect(sess, pre, img))
+            times.append(time.perf_counter() - t0)
+        results[name] = (dets, np.array(times) * 1000)
+
+    (ref, t_ref), (var, t_var) = results["fp32"], results[args.variant]
+    agree, ious = 0, []
+    for a, b in zip(ref, var):
+        agree += len(a) == len(b)
+        for box in a:
+            ious.append(max((box_iou(box, o) for o in b), default=0.0))
+    print(f"[COMPARE] 이미지 {len(images)}장, 프로파일 '{args.profile}'")
+    print(f"  fp32        {t_ref.mean():7.1f}ms  ({1000 / t_ref.mean():.1f} fps)")
+    print(f"  {args.variant:<11} {t_var.mean():7.1f}ms  ({1000 / t_var.mean():.1f} fps)")
+    print(f"  박스 개수 일치 {agree}/{len(images)},  fp32 박스 대비 평균 IoU "
+          f"{np.mean(ious) if ious else float('nan'):.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("command", choices=("int8", "resize", "compare"))
+    ap.add_argument("--model", required=True)
+    ap.add_argument("--out")
+    ap.add_argument("--calib", help="보정/비교용 이미지 폴더 (카메라 캡처 원본)")
+    ap.add_argument("--limit", type=int, default=200)
+    ap.add_argument("--dynamic", action="store_true")
+    ap.add_argument("--size", type=int, help="resize 크기, int8 에선 이미 축소된 모델 표시용")
+    ap.add_argument("--variant", default="int8")
+    ap.add_argument("--profile", default="opi-full")
+    args = ap.parse_args()
+
+    if args.command == "int8":
+        make_int8(args)
+    elif args.command == "resize":
+        make_resized(args)
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# sim_system.py  (전체 시스템 부하 시뮬레이터: 한 리눅스 머신에서 call / stop / driver 노드 여러 벌)
+#
+# 정류장 하나 = call_node + stop_node + driver_display 프로세스 세 개 (직접 연결, 이벤트 버스 + HTTP).
+# 모든 노드는 HAL_BACKEND=sim 으로 뜬다 (hal.py):
+#   call   : SimGPIO 가상 승객이 분당 --press-rate 번 버튼을 누름 (가끔 채터링)
+#   stop   : SimCamera 합성 영상에 분당 --arrival-rate 번 버스 도착 + SimVision, LED 는 luma dummy
+#   driver : 오프스크린 화면, 오디오는 모두 SimAudioSink (클립당 --clip-seconds 초)
+# 정류장 수를 --stops 로 늘려 가며 --duration 초씩 돌리고, 각 노드의 추적 파일(tracing.py)을 모아
+# 처리량과 단계별 지연, /metrics 의 전송 실패 수, 자식 프로세스 CPU 사용률을 출력한다.
+#
+#   python3 sim_system.py                                       # 1, 2, 4 정류장, 각 30초
+#   python3 sim_system.py --stops 1 4 8 16 --duration 60 --press-rate 12 --arrival-rate 6 --json sim.json
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import requests
+
+from trace_report import load_spans, milestones
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUSES = ("03", "47", "77", "177")
+
+# (이름, 시작 시점, 끝 시점) - trace_report.MILESTONES 이름
+REPORT_STAGES = [
+    ("press→stop",     "press", "stop_received"),
+    ("press→driver",   "press", "driver_received"),
+    ("press→screen",   "press", "driver_rendered"),
+    ("press→alert",    "press", "driver_alert"),
+    ("frame→arrival",  "frame_captured", "arrival"),
+    ("tts→release",    "arrival_tts_end", "released"),
+]
+
+
+# ───────────────── 노드 설정 ─────────────────
+def group_configs(i, workdir, port_base, args):
+    """ 정류장 i 의 세 노드 NODE_CONFIG. 포트는 정류장마다 10개씩 """
+    p = port_base + i * 10
+    stop_http, stop_bus, call_http, call_bus, drv_http, drv_bus = p, p + 1, p + 2, p + 3, p + 4, p + 5
+    local = "127.0.0.1"
+    common = {"TRANSPORT": args.transport, "TTS_DIR": os.path.join(workdir, "tts"),
+              "TRACE_DIR": os.path.join(workdir, f"stop{i:02d}", "trace")}
+    stop_id = f"정류장 {i:02d}"
+    return {
+        "stop": dict(common, HOST=local, PORT=stop_http, BUS_PORT=stop_bus, STOP_ID=stop_id,
+                     NODE_ID=f"stop-{i:02d}", STATS_INTERVAL=0,
+                     PI_CALL_RELEASE_URL=f"http://{local}:{call_http}/release",
+                     PI_DRIVER_ARRIVAL_URL=f"http://{local}:{drv_http}/arrival",
+                     PI_CALL_BUS=[local, call_bus], PI_DRIVER_BUS=[local, drv_bus],
+                     VISION_BACKEND="sim", CAMERA_SOURCE="sim", CAMERA_PREVIEW=False,
+                     SIM_BUSES=list(BUSES), SIM_ARRIVAL_RATE=args.arrival_rate, SIM_SEED=args.seed + i),
+        "call": dict(common, HTTP_PORT=call_http, BUS_PORT=call_bus, STOP_ID=stop_id,
+                     NODE_ID=f"call-{i:02d}", BUTTON_PINS={b: 11 + k for k, b in enumerate(BUSES)},
+                     PI_STOP_URL=f"http://{local}:{stop_http}/call",
+                     PI_DRIVER_URL=f"http://{local}:{drv_http}/call",
+                     PI_STOP_BUS=[local, stop_bus], PI_DRIVER_BUS=[local, drv_bus],
+                     SIM_PRESS_RATE=args.press_rate, SIM_SEED=args.seed + 1000 + i),
+        "driver": dict(common, HOST=local, PORT=drv_http, BUS_PORT=drv_bus, NODE_ID=f"driver-{i:02d}"),
+    }, {"stop": stop_http, "call": call_http, "driver": drv_http}
+
+SCRIPTS = {"stop": "stop_node.py", "call": "call_node.py", "driver": "driver_display.py"}
+
+
+def launch(role, cfg, log_path, args):
+    env = dict(os.environ, HAL_BACKEND="sim", NODE_CONFIG=json.dumps(cfg, ensure_ascii=False),
+               DISPLAY_BACKEND="offscreen", LED_BACKEND="dummy", SDL_AUDIODRIVER="dummy",
+               HAL_SIM_CLIP_SECONDS=str(args.clip_seconds), PYTHONUNBUFFERED="1")
+    log = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen([sys.executable, os.path.join(HERE, SCRIPTS[role])], env=env, cwd=HERE,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(ports, timeout):
+    """ stop 은 /ready 200, call / driver 는 /metrics 응답이 오면 준비된 것으로 봄 """
+    deadline = time.time() + timeout
+    sess = requests.Session()
+    for role, port in ports:
+        path = "/ready" if role == "stop" else "/metrics"
+        while True:
+            try:
+                if sess.get(f"http://127.0.0.1:{port}{path}", timeout=0.5).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"{role}:{port} 준비 안 됨 ({timeout}s)")
+            time.sleep(0.1)
+
+
+def scrape_sum(ports, names):
+    """ 모든 노드 /metrics 에서 names 지표 값 합계 """
+    totals = dict.fromkeys(names, 0.0)
+    for _, port in ports:
+        try:
+            text = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1).text
+        except requests.RequestException:
+            continue
+        for line in text.splitlines():
+            if line.startswith("#") or not line:
+                continue
+            name = line.split("{", 1)[0].split(" ", 1)[0]
+            if name in totals:
+                totals[name] += float(line.rsplit(" ", 1)[1])
+    return totals
+
+
+# ───────────────── 한 번 실행 ─────────────────
+def run_scale(n_stops, args, workdir):
+    os.makedirs(os.path.join(workdir, "tts"), exist_ok=True)
+    procs, ports = [], []
+    cpu0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    try:
+        for i in range(n_stops):
+            cfgs, p = group_configs(i, workdir, args.port_base, args)
+            os.makedirs(os.path.join(workdir, f"stop{i:02d}"), exist_ok=True)
+            for role in ("driver", "stop", "call"):   # 받는 쪽부터
+                log = os.path.join(workdir, f"stop{i:02d}", f"{role}.log")
+                procs.append(launch(role, cfgs[role], log, args))
+                ports.append((role, p[role]))
+        t_launch = time.time()
+        wait_ready(ports, args.ready_timeout)
+        print(f"[SIM] 정류장 {n_stops}개 ({len(procs)} 프로세스) 준비 {time.time() - t_launch:.1f}s → {args.duration}s 실행")
+        t0 = time.time()
+        time.sleep(args.duration)
+        elapsed = time.time() - t0
+        errors = scrape_sum(ports, ("dispatch_failed_total", "dispatch_bus_fallbacks_total",
+                                    "dispatch_dropped_total"))
+    finally:
+        for proc in procs:
+            proc.send_signal(signal.SIGINT)
+        for proc in procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+    cpu1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (cpu1.ru_utime - cpu0.ru_utime) + (cpu1.ru_stime - cpu0.ru_stime)
+
+    traces = load_spans([os.path.join(workdir, f"stop{i:02d}", "trace", "*.jsonl") for i in range(n_stops)])
+    ms = [milestones(spans) for spans in traces.values()]
+    ms = [m for m in ms if "press" in m and m["press"] >= t0]   # 준비 전 호출 제외
+    out = {"stops": n_stops, "processes": len(procs), "seconds": elapsed,
+           "calls": len(ms), "calls_per_s": len(ms) / elapsed,
+           "released": sum("released" in m for m in ms),
+           "released_per_s": sum("released" in m for m in ms) / elapsed,
+           "errors": errors, "cpu_s": cpu, "cpu_pct": cpu / elapsed * 100.0 / (os.cpu_count() or 1),
+           "stages": {}}
+    for label, a, b in REPORT_STAGES:
+        v = np.array([(m[b] - m[a]) * 1000.0 for m in ms if a in m and b in m])
+        if v.size:
+            out["stages"][label] = {"n": int(v.size), "p50": float(np.percentile(v, 50)),
+                                    "p99": float(np.percentile(v, 99)), "max": float(v.max())}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stops", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--duration", type=float, default=30.0, help="정류장 수마다 실행 시간(초)")
+    ap.add_argument("--press-rate", type=float, default=12.0, help="call 노드마다 분당 버튼 입력")
+    ap.add_argument("--arrival-rate", type=float, default=6.0, help="stop 노드마다 분당 버스 도착")
+    ap.add_argument("--clip-seconds", type=float, default=1.5, help="가상 TTS 클립 길이")
+    ap.add_argument("--transport", choices=("bus", "http"), default="bus")
+    ap.add_argument("--port-base", type=int, default=7000)
+    ap.add_argument("--ready-timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workdir", help="로그/추적 파일 위치 (기본: 임시 폴더, 끝나면 삭제)")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    args = ap.parse_args()
+
+    keep = bool(args.workdir)
+    root = args.workdir or tempfile.mkdtemp(prefix="sim_system_")
+    results = []
+    try:
+        for n in args.stops:
+            results.append(run_scale(n, args, os.path.join(root, f"n{n:02d}")))
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n[SIM] 버튼 분당 {args.press_rate}회, 도착 분당 {args.arrival_rate}회 (노드당), "
+          f"transport={args.transport}, 코어 {os.cpu_count()}개")
+    head = f"{'stops':>5}{'procs':>6}{'calls/s':>9}{'rel/s':>7}{'err':>5}{'cpu%':>6}"
+    for label, _, _ in REPORT_STAGES:
+        head += f"{label + ' p50/p99 ms':>28}"
+    print(head)
+    for r in results:
+        err = int(sum(r["errors"].values()))
+        row = f"{r['stops']:5d}{r['processes']:6d}{r['calls_per_s']:9.2f}{r['released_per_s']:7.2f}{err:5d}{r['cpu_pct']:6.0f}"
+        for label, _, _ in REPORT_STAGES:
+            s = r["stages"].get(label)
+            cell = f"{s['p50']:.1f} / {s['p99']:.1f}" if s else "-"
+            row += f"{cell:>28}"
+        print(row)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# startup.py  (노드 단계별 기동 + 준비 상태)
+#
+# 예전 stop_node 는 import 하는 동안 cv2 / onnxruntime / OCR 을 불러오고 세션을 만든 뒤
+# __main__ 에서 GPIO → 믹서/오디오 캐시 → 워밍업 → LED → Flask → 카메라를 차례로 띄웠다.
+# 전원이 들어온 뒤 /call 을 받기까지 이 시간을 모두 기다려야 했다.
+#
+# 여기서는 가벼운 엔드포인트(Flask, 이벤트 버스)를 먼저 띄워 호출을 바로 받아 두고,
+# 무거운 하위 시스템은 백그라운드 스레드에서 의존 관계대로 동시에 올린다.
+#
+#   boot = Startup("stop")
+#   boot.add("model",  load_model)
+#   boot.add("warmup", warm_up, after=("model",))
+#   boot.add("camera", open_camera)
+#   boot.add("pipeline", start_loops, after=("warmup", "camera"))
+#   boot.start()
+#   add_ready_endpoint(app, boot)        # GET /ready → 200 (모두 준비) / 503 (아직, 실패)
+#
+# 하위 시스템 상태: pending → running → ready | failed | skipped (의존한 단계가 실패)
+# required=False 로 넣은 것은 실패해도 /ready 를 막지 않는다 (예: LED 없이도 안내는 가능).
+
+import threading
+import time
+
+PENDING, RUNNING, READY, FAILED, SKIPPED = "pending", "running", "ready", "failed", "skipped"
+
+
+class Subsystem:
+    __slots__ = ("name", "fn", "after", "required", "state", "started", "finished", "error", "done")
+
+    def __init__(self, name, fn, after, required):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.required = required
+        self.state = PENDING
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+    def as_dict(self):
+        d = {"state": self.state, "required": self.required}
+        if self.seconds is not None:
+            d["seconds"] = round(self.seconds, 3)
+        if self.after:
+            d["after"] = list(self.after)
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+class Startup:
+    def __init__(self, node):
+        self.node = node
+        self.subsystems = {}      # 이름 → Subsystem, 등록 순서 유지
+        self.t0 = time.monotonic()
+        self.ready_at = None      # 필수 하위 시스템이 모두 준비된 시각 (t0 기준 초)
+        self._lock = threading.Lock()
+
+    def add(self, name, fn, after=(), required=True):
+        for dep in after:
+            if dep not in self.subsystems:
+                raise ValueError(f"{name}: 알 수 없는 선행 단계 {dep}")
+        self.subsystems[name] = Subsystem(name, fn, after, required)
+
+    def mark(self, name, required=True):
+        """ 이미 끝난 단계 기록 (예: 메인 스레드에서 먼저 띄운 Flask) """
+        s = self.subsystems[name] = Subsystem(name, None, (), required)
+        s.started = s.finished = time.monotonic()
+        s.state = READY
+        s.done.set()
+
+    def start(self):
+        """ 모든 단계를 각자 스레드로 시작 (선행 단계가 끝날 때까지 그 스레드 안에서 대기) """
+        for s in self.subsystems.values():
+            if s.state == PENDING:
+                threading.Thread(target=self._run, args=(s,), name=f"boot-{s.name}", daemon=True).start()
+        return self
+
+    def _run(self, s):
+        for dep in s.after:
+            d = self.subsystems[dep]
+            d.done.wait()
+            if d.state != READY:
+                s.state, s.error = SKIPPED, f"{dep} {d.state}"
+                print(f"[BOOT] {s.name} 건너뜀 ({s.error})")
+                self._finish(s)
+                return
+        s.state, s.started = RUNNING, time.monotonic()
+        try:
+            s.fn()
+            s.state = READY
+            print(f"[BOOT] {s.name} 준비 ({s.seconds:.2f}s)")
+        except Exception as e:
+            s.state, s.error = FAILED, f"{type(e).__name__}: {e}"
+            print(f"[ERROR] {s.name} 기동 실패: {s.error}")
+        self._finish(s)
+
+    def _finish(self, s):
+        s.finished = time.monotonic()
+        s.done.set()
+        with self._lock:
+            if self.ready_at is None and self.ready:
+                self.ready_at = s.finished - self.t0
+                print(f"[BOOT] {self.node} 준비 완료 ({self.ready_at:.2f}s) " + self.format_times())
+
+    # ───────────── 조회 ─────────────
+    @property
+    def ready(self):
+        return all(s.state == READY for s in self.subsystems.values() if s.required)
+
+    def is_ready(self, name):
+        s = self.subsystems.get(name)
+        return s is not None and s.state == READY
+
+    def wait(self, name=None, timeout=None):
+        """ 한 단계 (None 이면 전부) 가 끝날 때까지 대기. 준비됐으면 True """
+        names = [name] if name else list(self.subsystems)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for n in names:
+            left = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not self.subsystems[n].done.wait(left):
+                return False
+        return all(self.subsystems[n].state == READY for n in names)
+
+    def status(self):
+        return {"node": self.node, "ready": self.ready,
+                "uptime": round(time.monotonic() - self.t0, 3),
+                "ready_after": None if self.ready_at is None else round(self.ready_at, 3),
+                "subsystems": {n: s.as_dict() for n, s in self.subsystems.items()}}
+
+    def format_times(self):
+        return ", ".join(f"{n} {s.seconds:.2f}s" if s.seconds is not None else f"{n} {s.state}"
+                         for n, s in self.subsystems.items())
+
+
+def add_ready_endpoint(app, startup, path="/ready"):
+    """ Flask 앱에 GET /ready 추가. 필수 단계가 모두 준비되면 200, 아니면 503 """
+    def ready_view():
+        st = startup.status()
+        return st, (200 if st["ready"] else 503)
+    app.add_url_rule(path, "ready", ready_view)
@@ -1,218 +1,458 @@
 # stop_node.py  (Pi-Stop: 정류장 본체, 카메라 + 도트매트릭스)
 # Pygame 속도 + GPIO 앰프 제어(노이즈 제거) + 순서 보장
+#
+# 기동 순서: Flask / 이벤트 버스를 먼저 띄워 /call 을 바로 받고, 모델 로드·워밍업·믹서·카메라·LED 는
+# startup.Startup 이 백그라운드에서 동시에 올린다. cv2 / onnxruntime / OCR 은 그 단계에서 import.
+# 진행 상황은 GET /ready (하위 시스템별 상태, 모두 준비되면 200).
 
-import threading, time, subprocess, os
-import cv2
-import numpy as np
-import pytesseract
-import onnxruntime as ort
-import requests
+import threading, time, os
+import hal
 from flask import Flask, request
 from dotmatrix_display import start_led_display, add_bus, remove_bus
-import pygame
-import OPi.GPIO as GPIO 
+from frame_pipeline import LatestFrameBuffer, StageMeter, InferenceGate, format_stats
+from tracker import BusTracker
+from dispatcher import Dispatcher
+from event_bus import EventBusServer, RecentIds
+from http_server import serve
+from coordinator import start_registration
+from tracing import Tracer
+from metrics import MetricsRegistry, add_metrics_endpoint
+from startup import Startup, add_ready_endpoint
+from audio_engine import AudioEngine, PRIORITY_ALERT
+from governor import Governor
+from preview import PreviewStream
 
 # ───────────────── 설정값 ─────────────────
 TTS_DIR        = "/home/pi/bus_detection/tts"
 MODEL_PATH     = "/home/pi/bus_detection/models/bus_number.onnx"
+MODEL_VARIANT  = "fp32"        # "fp32" | "int8" | "320" | "int8-320"  (quantize_model.py 로 생성)
+ORT_PROFILE    = "opi-shared"  # model_manager.SESSION_PROFILES 이름 또는 dict
+OCR_ORT_PROFILE = "single"
+WARMUP_RUNS    = 3
 CONF_THRESHOLD = 0.30
+NMS_IOU_THRESHOLD = 0.45
+YOLO_INPUT_SIZE   = 640
 GAMMA          = 0.8
 SATURATION     = 1.3
 OCR_CONFIG     = "--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789"
+OCR_BACKEND    = "tesseract-api"   # "tesseract-cli" | "tesseract-api" | "onnx-digits"
+OCR_MODEL_PATH = "/home/pi/bus_detection/models/bus_digits.onnx"   # onnx-digits 용
+OCR_MIN_VOTES  = 3      # 같은 번호가 이 횟수만큼 읽혀야 트랙 번호 확정
+TRACK_MAX_MISSED = 10   # 이 프레임 수 동안 안 보이면 버스가 떠난 것으로 보고 트랙 삭제
+TRACK_MAX_AGE    = 5.0  # 검출을 건너뛰는 동안에도 마지막으로 본 뒤 이 초가 지나면 트랙 삭제
+MOTION_ROI     = None   # 움직임을 볼 도로 영역 (x1, y1, x2, y2), None 이면 전체 프레임
+MOTION_PIXEL_THRESHOLD = 25    # 이 이상 밝기가 변한 픽셀을 "변화"로 셈
+MOTION_MIN_CHANGED     = 0.01  # 변화 픽셀 비율이 이 이상이면 움직임으로 판단
+STATS_INTERVAL = 10.0   # 단계별 처리량 로그 주기(초), 0 이면 끔
+TRACE_DIR      = "/home/pi/bus_detection/trace"   # 호출별 구간 기록 (trace_report.py), None 이면 끔
+
+PI_CALL_RELEASE_URL = "http://172.30.1.100:5001/release"   # Pi-Call 주소/포트
+PI_DRIVER_ARRIVAL_URL = "http://172.30.1.45:5000/arrival"
+
+# 노드 간 이벤트 전송: "bus" = 지속 TCP 이벤트 버스 (ACK 없으면 HTTP 로 대체), "http" = 기존 방식
+TRANSPORT      = "bus"
+BUS_PORT       = 5100
+PI_CALL_BUS    = ("172.30.1.100", 5100)
+PI_DRIVER_BUS  = ("172.30.1.45", 5100)
+
+# 중앙 코디네이터 (coordinator.py). 주소를 넣으면 위 PI_* 주소 대신 코디네이터가 도착 알림을
+# 호출한 Pi-Call 과 해당 노선 기사 단말에 중계한다. None 이면 기존처럼 직접 전송.
+COORDINATOR_URL = None          # 예) "http://172.30.1.10:5200"
+COORDINATOR_BUS = ("172.30.1.10", 5300)
+STOP_ID        = "광주대학교 정류장"
+NODE_ID        = "stop-gwangju-univ"
+NODE_ADDR      = "172.30.1.36"  # 코디네이터가 이 노드로 접속할 주소
 
 HOST           = "0.0.0.0"
 PORT           = 5000
+HTTP_SERVER    = "waitress"   # "waitress" (스레드 풀 WSGI) | "werkzeug" (기존 app.run)
+HTTP_THREADS   = 2
 
 AMP_SD_PIN = 25  # 앰프 SD 핀에 연결한 GPIO 번호 (BCM 기준)
 
+CAMERA_SOURCE  = 0          # 장치 번호 또는 영상 파일 (HAL_BACKEND=sim 이면 파일 반복 재생, 없으면 합성 영상)
+CAMERA_PREVIEW = "window"   # "window" = cv2 "Stop Cam" 창, "mjpeg" = GET /preview.mjpg (화면 없는 보드), None = 끔
+PREVIEW_FPS     = 3         # mjpeg 미리보기 프레임 속도 (접속이 있을 때만 인코딩)
+PREVIEW_WIDTH   = 480
+PREVIEW_QUALITY = 70
+VISION_BACKEND = "onnx"     # "onnx" = BusVision, "sim" = hal.SimVision (합성 영상의 정답 번호)
+
+# 조절기 (governor.py): 온도/부하/검출 지연에 따라 캡처 fps, 검출 간격, ORT 스레드 조절. GET /governor
+GOVERNOR_ENABLED  = True
+GOVERNOR_POLICY   = None     # 모드별 덮어쓰기, 예) {"expect": {"capture_fps": 10, "threads": 2}}
+GOVERNOR_TEMP_HOT = 75.0     # °C, 이 이상이면 hot (hysteresis 5°C)
+GOVERNOR_TEMP_CRITICAL = 85.0
+GOVERNOR_DUTY_MAX = 0.6      # 검출이 차지할 수 있는 시간 비율 (스로틀링으로 추론이 느려지면 간격이 늘어남)
+
+# 시뮬레이션 (HAL_BACKEND=sim, sim_system.py): 합성 카메라에 분당 이 횟수만큼 버스가 도착
+SIM_BUSES        = ("03", "47", "77", "177")
+SIM_ARRIVAL_RATE = 2.0
+SIM_SEED         = None
+
+hal.apply_config(globals())     # NODE_CONFIG 로 위 설정값 덮어쓰기
+GPIO = hal.load_gpio()
+
+if CAMERA_PREVIEW is True:
+    CAMERA_PREVIEW = "window"       # 예전 설정값 (True / False) 호환
+if CAMERA_PREVIEW == "window" and not os.environ.get("DISPLAY"):
+    print("[WARN] DISPLAY 없음 → 미리보기 창 대신 mjpeg (GET /preview.mjpg)")
+    CAMERA_PREVIEW = "mjpeg"
+
 # ───────────────── 초기화 ─────────────────
 pending_calls = set()
-session    = ort.InferenceSession(MODEL_PATH, providers=["CPUExecutionProvider"])
-input_name = session.get_inputs()[0].name
+call_traces = {}        # 버스 번호 → 호출 trace id (도착/해제 알림에 그대로 실어 보냄)
+tracer = Tracer("stop", TRACE_DIR)
+metrics = MetricsRegistry()     # GET /metrics
+boot = Startup("stop")          # GET /ready
+
+vision = None                   # BusVision, 기동 단계 "model" 에서 생성
 app = Flask(__name__)
+add_ready_endpoint(app, boot)
+metrics.gauge_fn("stop_ready", "필수 하위 시스템이 모두 준비됐는지", lambda: boot.ready)
+dispatcher = Dispatcher(TRANSPORT, timeout=1)
+if COORDINATOR_URL:
+    dispatcher.add_peer("coord", COORDINATOR_URL + "/event", bus_addr=COORDINATOR_BUS)
+else:
+    dispatcher.add_peer("call", PI_CALL_RELEASE_URL, bus_addr=PI_CALL_BUS)
+    dispatcher.add_peer("driver", PI_DRIVER_ARRIVAL_URL, bus_addr=PI_DRIVER_BUS)
+dispatcher.register_metrics(metrics)
+add_metrics_endpoint(app, metrics)
 
 # ───────────────── 유틸 (TTS) ─────────────────
-play_lock = threading.Lock()
-
-def play_tts(bus: str, event: str):
-    ko_path = os.path.join(TTS_DIR, f"{bus}_{event}_ko.mp3")
-    en_path = os.path.join(TTS_DIR, f"{bus}_{event}_en.mp3")
-
-    with play_lock:
-        try:
-            # 앰프 켜기
-            GPIO.output(AMP_SD_PIN, GPIO.HIGH)
-            time.sleep(0.05) # 앰프가 켜질 때까지 잠시 대기
-
-            # 1. 한국어 재생
-            if os.path.isfile(ko_path):
-                s_ko = pygame.mixer.Sound(ko_path)
-                s_ko.play()
-                # 재생이 끝날 때까지 대기
-                while pygame.mixer.get_busy():
-                    time.sleep(0.1)
-            
-            # 2. 영어 재생
-            if os.path.isfile(en_path):
-                s_en = pygame.mixer.Sound(en_path)
-                s_en.play()
-                # 재생이 끝날 때까지 대기
-                while pygame.mixer.get_busy():
-                    time.sleep(0.1)
-                    
-        except Exception as e:
-            print(f"[TTS-Pygame] 오디오 재생 중 오류 발생: {e}")
-        finally:
-            # 재생이 끝나면 앰프 끄기
-            GPIO.output(AMP_SD_PIN, GPIO.LOW)
+# 모든 클립은 시작 시 메모리에 디코딩해 두고, 하나의 믹서/재생 스레드로 순서대로 재생
+audio = AudioEngine(TTS_DIR, AMP_SD_PIN, GPIO, sink=hal.audio_sink())
+audio.register_metrics(metrics)
+
+def play_tts(bus: str, event: str, trace=None):
+    """ 한국어 → 영어 순서로 재생하고 끝날 때까지 대기 """
+    on_played = (lambda t0, t1: tracer.span(trace, f"tts_{event}", t0, t1)) if trace else None
+    audio.play_and_wait([f"{bus}_{event}_ko", f"{bus}_{event}_en"], PRIORITY_ALERT, on_played=on_played)
 
 # ───────────────── 유틸 (CV/OCR) ─────────────────
-def adjust_gamma(img_rgb):
-    inv = 1.0 / GAMMA
-    table = np.array([((i/255.0)**inv)*255 for i in range(256)], dtype=np.uint8)
-    return cv2.LUT(img_rgb, table)
-
-def adjust_saturation(img_rgb):
-    hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV).astype(np.float32)
-    h, s, v = cv2.split(hsv)
-    s = np.clip(s * SATURATION, 0, 255)
-    hsv = cv2.merge([h, s, v]).astype(np.uint8)
-    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
-
-def preprocess_for_ocr(roi_rgb):
-    gray = cv2.cvtColor(roi_rgb, cv2.COLOR_RGB2GRAY)
-    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-    _, thr = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    inv = cv2.bitwise_not(thr)
-    return inv
+# 전처리/YOLO/디코드/OCR 은 bus_vision.BusVision 에 있음 (오프라인 벤치마크와 공용)
+def load_vision():
+    """ onnxruntime / cv2 / OCR import + 세션 생성 (수 초 걸리므로 기동 스레드에서) """
+    global vision
+    if vision is None and VISION_BACKEND == "sim":
+        vision = hal.SimVision(seed=SIM_SEED)
+    if vision is None:
+        from bus_vision import BusVision
+        vision = BusVision(MODEL_PATH, MODEL_VARIANT, ORT_PROFILE, YOLO_INPUT_SIZE,
+                           GAMMA, SATURATION, CONF_THRESHOLD, NMS_IOU_THRESHOLD,
+                           OCR_BACKEND, OCR_CONFIG, OCR_MODEL_PATH, OCR_ORT_PROFILE)
+    return vision
+
+def make_yolo_input(frame_bgr):
+    return vision.make_input(frame_bgr)
+
+def detect_buses(frame_bgr):
+    return vision.detect(frame_bgr)
+
+def read_bus_number(frame_bgr, box):
+    return vision.read(frame_bgr, box)
 
 def run_yolo_and_ocr(frame_bgr):
-    rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    rgb = adjust_gamma(rgb)
-    rgb = adjust_saturation(rgb)
-    blob = cv2.dnn.blobFromImage(rgb, 1/255.0, (640, 640), swapRB=True, crop=False)
-    outs  = session.run(None, {input_name: blob})[0].squeeze()
-
-    if outs.size == 0:
-        return ""
-    best = max(outs, key=lambda x: float(x[4]))
-    conf = float(best[4])
-    if conf < CONF_THRESHOLD:
-        return ""
-    cx, cy, w, h = best[:4]
-    x1 = max(0, int(cx - w/2))
-    y1 = max(0, int(cy - h/2))
-    x2 = min(rgb.shape[1]-1, int(cx + w/2))
-    y2 = min(rgb.shape[0]-1, int(cy + h/2))
-    roi = rgb[y1:y2, x1:x2]
-    if roi.size == 0:
-        return ""
-    proc = preprocess_for_ocr(roi)
-    raw  = pytesseract.image_to_string(proc, config=OCR_CONFIG).strip()
-    digits_only = "".join(filter(str.isdigit, raw))
-    return digits_only
-
-
-# ───────────────── Flask 엔드포인트 ─────────────────
+    return vision.run(frame_bgr)
+
+
+# ───────────────── 호출 수신 (이벤트 버스 / Flask 공용) ─────────────────
+def register_call(bus, trace=None):
+    print(f"[CALL] bus {bus} 요청 등록")
+    tracer.event(trace, "call_received", bus=bus)
+    if trace:
+        call_traces[bus] = trace
+    pending_calls.add(bus)
+    add_bus(bus)
+    governor.poke()
+
+def on_bus_event(msg_type, data):
+    if msg_type == "CALL" and data.get("bus"):
+        register_call(data["bus"], data.get("trace"))
+
+recent_ids = RecentIds()    # 이벤트 버스 + HTTP 대체 전송 공용 중복 제거
+
 @app.route("/call", methods=["POST"])
 def handle_call():
     data = request.get_json(force=True)
     bus = data.get("bus", "")
     if not bus:
         return {"ok": False, "error": "no bus"}, 400
-    print(f"[CALL] bus {bus} 요청 등록")
-    pending_calls.add(bus)
-    add_bus(bus)
+    if not recent_ids.first_time(data.get("msg_id")):
+        return {"ok": True, "duplicate": True}, 200
+    register_call(bus, data.get("trace"))
     return {"ok": True}, 200
 
 def run_flask():
     """ Flask 서버를 스레드로 돌리기 위한 함수 """
-    app.run(host=HOST, port=PORT, debug=False, use_reloader=False)
+    serve(app, HOST, PORT, HTTP_SERVER, HTTP_THREADS)
 
 
 # ───────────────── 도착 처리 (순서 보장) ─────────────────
-def handle_arrival_sequence(bus):
+def handle_arrival_sequence(bus, trace=None):
     """
     (백그라운드 스레드에서 실행됨)
     TTS 재생이 끝난 후 LED 제거 및 Pi-Call 알림을 순차적으로 실행
     """
     
-    # 1) 도착 음성 (Pygame으로 즉시 시작, 끝날 때까지 대기)
+    # 1) 도착 음성 (캐시된 클립으로 즉시 시작, 끝날 때까지 대기)
     print(f"[ARRIVAL-THREAD] {bus}번 TTS 재생 시작...")
-    play_tts(bus, "arrival")
+    play_tts(bus, "arrival", trace)
     print(f"[ARRIVAL-THREAD] {bus}번 TTS 재생 완료.")
 
     # 2) 도트 매트릭스에서 제거
     remove_bus(bus)
     
-    # 3) Pi-Call에게 "이 버스 다시 눌러도 돼"라고 알려주기
-    try:
-        requests.post(
-            "http://172.30.1.100:5001/release",   # Pi-Call 주소/포트
-            json={"bus": bus},
-            timeout=1
-        )
-        print(f"[NOTIFY] {bus} 해제 알림을 Pi-Call로 전송 완료")
-    except Exception as e:
-        print(f"[WARN] Pi-Call 해제 전송 실패: {e}")
+    # 3) Pi-Call에게 "이 버스 다시 눌러도 돼"라고 알려주기 (실패 시 dispatcher 가 재시도)
+    t_send = time.time()
+    def on_sent(peer, ok, latency_ms):
+        if ok:
+            print(f"[NOTIFY] {bus} 해제 알림을 {peer} 로 전송 완료 ({latency_ms:.1f}ms)")
+        tracer.span(trace, "release_send", t_send, time.time(), peer=peer, ok=ok)
+    if COORDINATOR_URL:
+        # 코디네이터가 RELEASE(Pi-Call) / ARRIVAL(기사 단말) 로 나눠 보냄
+        dispatcher.send({"type": "ARRIVAL", "stop": STOP_ID, "bus": bus, "trace": trace},
+                        peers=["coord"], on_done=on_sent)
+        return
+    dispatcher.send({"bus": bus, "trace": trace}, peers=["call"], on_done=on_sent, msg_type="RELEASE")
+    # 4) 기사 화면에서도 해당 버스 알림 정리
+    dispatcher.send({"stop": STOP_ID, "bus": bus, "trace": trace}, peers=["driver"], msg_type="ARRIVAL")
 
 
-# ───────────────── 카메라 루프 ─────────────────
-def camera_loop():
-    # 0번 웹캠 열기
-    cap = cv2.VideoCapture(0)
-    # 해상도 설정 (YOLO 입력에 맞게 640x480 등 설정)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+# ───────────────── 카메라 루프 (캡처 → 검출 → OCR 파이프라인) ─────────────────
+# 각 단계는 별도 스레드에서 돌고, 크기 1짜리 최신 프레임 버퍼로 연결된다.
+# 뒤 단계가 느리면 앞 단계의 오래된 프레임은 버려지므로 항상 최신 프레임으로 판정한다.
+frame_buf   = LatestFrameBuffer(maxlen=1)   # capture → detect
+det_buf     = LatestFrameBuffer(maxlen=1)   # detect  → ocr
+stage_meters = {name: StageMeter(name) for name in ("capture", "detect", "ocr")}
+
+# 지표: 루프 안에서는 카운터/히스토그램 갱신만, 나머지는 /metrics 요청 때 읽음
+m_frames   = {name: metrics.counter("stop_frames_total", "단계별 처리한 프레임 수", stage=name)
+              for name in stage_meters}
+m_fps      = {name: metrics.gauge("stop_fps", "단계별 처리량 (STATS_INTERVAL 마다 갱신)", stage=name)
+              for name in stage_meters}
+m_yolo     = metrics.histogram("stop_yolo_seconds", "YOLO 검출 (전처리 + 추론 + 디코드) 시간")
+m_ocr      = metrics.histogram("stop_ocr_seconds", "번호판 OCR 한 번 시간")
+
+tracker      = BusTracker(min_votes=OCR_MIN_VOTES, max_missed=TRACK_MAX_MISSED,
+                          max_age=TRACK_MAX_AGE)
+arrival_lock = threading.Lock()
+# 호출된 버스가 없으면 검출 중지, 도로 ROI 에 움직임이 없으면 프레임 건너뜀
+gate = InferenceGate(lambda: bool(pending_calls), roi=MOTION_ROI,
+                     pixel_threshold=MOTION_PIXEL_THRESHOLD, min_changed=MOTION_MIN_CHANGED)
 
+for _name, _buf in (("frame", frame_buf), ("det", det_buf)):
+    metrics.counter_fn("stop_frames_dropped_total", "뒤 단계가 못 따라와 버린 프레임 수",
+                       lambda b=_buf: b.dropped, buffer=_name)
+for _reason in ("idle", "still"):
+    metrics.counter_fn("stop_frames_gated_total", "게이트가 검출 전에 걸러낸 프레임 수",
+                       lambda r=_reason: gate.counters[r], reason=_reason)
+metrics.gauge_fn("stop_pending_calls", "도착을 기다리는 호출 버스 수", lambda: len(pending_calls))
+metrics.gauge_fn("stop_tracks", "추적 중인 버스 트랙 수", lambda: tracker.stats()["tracks"])
+
+# 호출된 버스를 기다리는 동안만 최대 속도, 나머지는 저속. 온도가 오르면 단계적으로 낮춤
+governor = Governor(lambda: bool(pending_calls) or tracker.has_unconfirmed(),
+                    on_threads=lambda n: vision.set_threads(n), policy=GOVERNOR_POLICY,
+                    temp_hot=GOVERNOR_TEMP_HOT, temp_critical=GOVERNOR_TEMP_CRITICAL,
+                    duty_max=GOVERNOR_DUTY_MAX, enabled=GOVERNOR_ENABLED)
+governor.register_metrics(metrics)
+
+# 헤드리스 미리보기: 캡처 루프는 프레임 참조만 넘기고, 인코딩은 접속이 있을 때만 별도 스레드에서
+preview = None
+if CAMERA_PREVIEW == "mjpeg":
+    preview = PreviewStream(PREVIEW_FPS, PREVIEW_WIDTH, PREVIEW_QUALITY)
+    preview.add_routes(app)
+    preview.register_metrics(metrics)
+
+@app.route("/governor", methods=["GET"])
+def governor_status():
+    return governor.status(), 200
+
+def check_arrival(track, frame_ts=None):
+    """ 투표로 확정된 트랙 번호가 호출 목록에 있으면 도착 처리 (트랙당 한 번) """
+    with arrival_lock:
+        if track.announced or track.number not in pending_calls:
+            return
+        track.announced = True
+        pending_calls.discard(track.number)
+        trace = call_traces.pop(track.number, None)
+    governor.poke()
+    print(f"[ARRIVAL] {track.number}번 도착 (track {track.id}, 판독 {track.ocr_calls}회)")
+    # 확정에 쓰인 프레임 캡처 시각 → 도착 판정까지 (검출 + OCR + 투표 대기)
+    tracer.span(trace, "arrival_confirmed", frame_ts or time.time(), time.time(),
+                bus=track.number, ocr_calls=track.ocr_calls)
+    threading.Thread(target=handle_arrival_sequence, args=(track.number, trace), daemon=True).start()
+
+def track_label(track):
+    """ 미리보기 박스 글자: 확정 번호, 아니면 현재 최다 판독 + '?' """
+    if track.number:
+        return track.number
+    top = track.votes.most_common(1)
+    return f"{top[0][0]}?" if top else f"#{track.id}"
+
+def detect_loop():
+    meter = stage_meters["detect"]
+    t_last = 0.0
+    while True:
+        # 조절기가 정한 최소 간격 (온도가 높거나 추론이 느려지면 늘어남)
+        wait = t_last + governor.detect_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        item = frame_buf.get()
+        if item is None:
+            if frame_buf.closed: break
+            continue
+        frame_id, ts, frame_bgr = item
+        run, reason = gate.check(frame_bgr, keep_alive=tracker.has_unconfirmed())
+        if not run:
+            tracker.skip(reason)    # 건너뛴 프레임에서도 트랙이 멈춰 있지 않게
+            continue
+        t0 = t_last = time.monotonic()
+        boxes = detect_buses(frame_bgr)
+        elapsed = time.monotonic() - t0
+        m_yolo.observe(elapsed)
+        governor.observe("detect", elapsed)
+        tracked = tracker.update(boxes)
+        meter.add(time.monotonic() - t0)
+        m_frames["detect"].inc()
+
+        # 이미 번호가 확정된 트랙은 OCR 없이 결과 재사용
+        for track, _ in tracked:
+            if not track.needs_ocr:
+                check_arrival(track, ts)
+        to_read = [(track.id, box) for track, box in tracked if track.needs_ocr]
+        if preview is not None and preview.active:
+            preview.annotate([(box, track_label(track)) for track, box in tracked])
+        if to_read:
+            det_buf.put((frame_id, ts, frame_bgr, to_read))
+    det_buf.close()
+
+def ocr_loop():
+    meter = stage_meters["ocr"]
+    while True:
+        item = det_buf.get()
+        if item is None:
+            if det_buf.closed: break
+            continue
+        frame_id, ts, frame_bgr, to_read = item
+        for track_id, box in to_read:
+            t0 = time.monotonic()
+            detected_num = read_bus_number(frame_bgr, box)
+            elapsed = time.monotonic() - t0
+            meter.add(elapsed)
+            m_ocr.observe(elapsed)
+            governor.observe("ocr", elapsed)
+            m_frames["ocr"].inc()
+            track = tracker.add_reading(track_id, detected_num)
+            if track is not None:
+                print(f"[TRACK] track {track.id} → {track.number}번 확정 {dict(track.votes)}")
+                check_arrival(track, ts)
+
+def stats_loop():
+    while not frame_buf.closed:
+        time.sleep(STATS_INTERVAL)
+        snaps = [m.snapshot() for m in stage_meters.values()]
+        for snap in snaps:
+            m_fps[snap["stage"]].set(snap["fps"])
+        trk = tracker.stats()
+        print("[STATS] " + format_stats(snaps, {"frame": frame_buf, "det": det_buf})
+              + f" | tracks {trk['tracks']} ocr {trk['ocr_requested']} reuse {trk['ocr_skipped']}"
+              + " | " + gate.format_counters())
+
+cap = None
+
+def open_camera():
+    """ 기동 단계 "camera": 모델 로드와 동시에 장치를 열어 둠 """
+    global cap
+    cap = hal.open_camera(CAMERA_SOURCE, width=640, height=480,
+                          buses=SIM_BUSES, arrivals_per_min=SIM_ARRIVAL_RATE, seed=SIM_SEED)
     if not cap.isOpened():
-        print("[ERROR] 웹캠을 열 수 없습니다.")
-        return
+        raise RuntimeError("웹캠을 열 수 없습니다.")
+
+def start_pipeline():
+    """ 기동 단계 "pipeline": 워밍업과 카메라가 모두 끝난 뒤 검출/OCR/캡처 스레드 시작 """
+    threading.Thread(target=detect_loop, daemon=True).start()
+    threading.Thread(target=ocr_loop, daemon=True).start()
+    if STATS_INTERVAL > 0:
+        threading.Thread(target=stats_loop, daemon=True).start()
+    threading.Thread(target=camera_loop, daemon=True).start()
+    governor.start(threads=getattr(vision, "threads", None))   # ORT_PROFILE 의 intra 가 기준
 
+def camera_loop():
+    window = CAMERA_PREVIEW == "window"
+    if window:
+        import cv2
+    meter = stage_meters["capture"]
+    frame_id = 0
+    t_next = time.monotonic()
     try:
         while True:
+            # 조절기 캡처 간격에 맞춰 읽음 (idle 이면 초당 몇 장만)
+            t_next = max(t_next + governor.capture_interval, time.monotonic())
+            t0 = time.monotonic()
             ret, frame_bgr = cap.read()
             if not ret: break
+            frame_id += 1
+            frame_buf.put((frame_id, time.time(), frame_bgr))
+            meter.add(time.monotonic() - t0)
+            m_frames["capture"].inc()
 
-            cv2.imshow("Stop Cam", frame_bgr)
-            detected_num = run_yolo_and_ocr(frame_bgr)
-
-            if detected_num and (detected_num in pending_calls):
-                print(f"[ARRIVAL] {detected_num}번 도착")
-                pending_calls.discard(detected_num) 
-                threading.Thread(target=handle_arrival_sequence, args=(detected_num,), daemon=True).start()
-
-            if cv2.waitKey(1) & 0xFF == 27: break
+            if preview is not None:
+                preview.publish(frame_bgr)
+            elif window:
+                cv2.imshow("Stop Cam", frame_bgr)
+                if cv2.waitKey(1) & 0xFF == 27: break
+            wait = t_next - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
     finally:
+        frame_buf.close()
         cap.release()
-        cv2.destroyAllWindows()
+        if window:
+            cv2.destroyAllWindows()
         
+# ───────────────── 기동 단계 ─────────────────
+def init_gpio():
+    GPIO.setwarnings(False) # 다른 스크립트와 충돌 방지
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(AMP_SD_PIN, GPIO.OUT, initial=GPIO.LOW) # 앰프를 끈 상태(LOW)로 시작
+    print(f"[GPIO] 앰프 셧다운 핀(GPIO {AMP_SD_PIN}) 초기화 완료 (LOW)")
+
+def warm_up_model():
+    # 첫 프레임 지연 제거
+    times = vision.warm_up(WARMUP_RUNS)
+    print(f"[ORT] 워밍업 {len(times)}회: " + ", ".join(f"{t:.0f}ms" for t in times))
+
+def add_boot_steps(boot):
+    """ 하위 시스템과 선행 관계. 선행 관계가 없는 단계끼리는 동시에 진행 """
+    boot.add("gpio", init_gpio)
+    boot.add("audio", audio.start, after=("gpio",))          # 믹서 초기화 + TTS 클립 캐시
+    boot.add("model", load_vision)                          # cv2 / onnxruntime / OCR import + 세션
+    boot.add("warmup", warm_up_model, after=("model",))
+    boot.add("camera", open_camera)
+    boot.add("led", lambda: start_led_display("dummy" if hal.HAL_BACKEND == "sim" else None),
+             required=False)                                # SPI 실패 시 dummy 로 계속
+    boot.add("pipeline", start_pipeline, after=("warmup", "camera"))
+
+
 # ───────────────── 메인 ─────────────────
 if __name__ == "__main__":
     print("[READY] Pi-Stop 시작 (정류장 본체: Flask + Camera + LED)")
 
-    try:
-        # 1. GPIO 초기화
-        GPIO.setwarnings(False) # 다른 스크립트와 충돌 방지
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(AMP_SD_PIN, GPIO.OUT, initial=GPIO.LOW) # 앰프를 끈 상태(LOW)로 시작
-        print(f"[GPIO] 앰프 셧다운 핀(GPIO {AMP_SD_PIN}) 초기화 완료 (LOW)")
-
-        # 2. Pygame 믹서 초기화 (시스템 기본 장치 사용)
-        pygame.mixer.init() 
-        print(f"[Pygame] 오디오 장치 초기화 성공 (시스템 기본 장치 사용)")
-        
-    except Exception as e:
-        print(f"[ERROR] 하드웨어 초기화 실패: {e}")
-        GPIO.cleanup() # 실패 시 GPIO 정리
-        exit() # 종료
-
-    # 스레드 기동
-    threading.Thread(target=start_led_display, daemon=True).start()
+    # 1. 호출 수신 경로부터 (카메라가 준비되기 전 호출은 pending_calls 에 쌓였다가 바로 판정 대상)
     threading.Thread(target=run_flask, daemon=True).start()
-    threading.Thread(target=camera_loop, daemon=True).start()
-    
-    print("[MAIN] 모든 스레드 시작. 메인 스레드 대기 중...")
+    if TRANSPORT == "bus":
+        EventBusServer(HOST, BUS_PORT, on_bus_event, seen=recent_ids).start()
+        boot.mark("event_bus")
+    if COORDINATOR_URL:
+        start_registration(dispatcher, "coord", {
+            "role": "stop", "node_id": NODE_ID, "stop": STOP_ID,
+            "http": f"http://{NODE_ADDR}:{PORT}", "bus_port": BUS_PORT if TRANSPORT == "bus" else None})
+
+    # 2. 나머지는 백그라운드에서 동시에 (실패한 단계는 /ready 에 error 로 남고 노드는 계속 호출을 받음)
+    add_boot_steps(boot)
+    boot.start()
+
+    print("[MAIN] 호출 수신 시작. 하위 시스템 기동 중 (GET /ready)...")
     
     # 메인 스레드 대기 + 종료 시 GPIO 정리
     try:
@@ -0,0 +1,22 @@
+# test_button_events.py  (python3 -m pytest -q test_button_events.py)
+# 채터링이 잠금을 계속 늘려 진짜 눌림이 막히던 회귀 확인
+
+from button_events import PinDebouncer
+
+
+def test_chatter_does_not_extend_lock():
+    deb = PinDebouncer(window=0.3)
+    assert deb.feed(0.0)
+    # 창 안에서 계속 튀는 엣지 (0.1s 간격) 는 모두 버리지만 잠금은 0.3 에서 끝나야 함
+    assert not any(deb.feed(t / 10) for t in range(1, 3))
+    assert deb.lock_until == 0.3
+    assert deb.feed(0.35)
+
+
+def test_returns_to_idle_after_window():
+    deb = PinDebouncer(window=0.3)
+    assert deb.feed(0.0)
+    assert deb.feed(5.0)
+    assert not deb.feed(5.1)
+    deb.feed(9.0)
+    assert deb.state == deb.LOCKED and deb.lock_until == 9.3
@@ -0,0 +1,98 @@
+# test_coordinator.py  (python3 -m pytest -q test_coordinator.py)
+# 코디네이터: 만료/주소가 바뀐 노드의 peer (전송 스레드, 버스 연결) 정리,
+# 라우팅 규칙 (CALL → 정류장 + 노선 기사, ARRIVAL → 호출한 call + 기사), 대기 호출 매칭/만료
+
+from argparse import Namespace
+
+from coordinator import Coordinator, PendingTable, Registry, Router, simulate
+from event_bus import EventBusServer
+
+
+def driver_info(bus_port, node_id="drv-47"):
+    return {"role": "driver", "node_id": node_id, "bus": "47", "http": "http://127.0.0.1:1",
+            "bus_port": bus_port, "host": "127.0.0.1"}
+
+
+def test_expired_node_peers_are_removed():
+    port = EventBusServer("127.0.0.1", 0, lambda t, d: None).start().port
+    coord = Coordinator("bus")
+    node, _ = coord.registry.register(driver_info(port))
+    coord.handle("CALL", {"stop": "A", "bus": "47"})
+    coord.handle("ARRIVAL", {"stop": "A", "bus": "47"})
+    assert set(coord.dispatcher.peers) == {"drv-47/CALL", "drv-47/ARRIVAL"}
+    client = coord.dispatcher.bus_clients["drv-47/CALL"]
+    assert coord.dispatcher.bus_clients["drv-47/ARRIVAL"] is client    # 같은 주소는 연결 공유
+
+    node.last_seen -= coord.registry.ttl
+    for n in coord.registry.expire():
+        coord._drop_peers(n)
+    assert not coord.dispatcher.peers
+    assert not coord.dispatcher.bus_clients and not coord.dispatcher._bus_by_addr
+    assert client._closed
+
+
+def test_reregister_with_new_bus_port_replaces_client():
+    ports = [EventBusServer("127.0.0.1", 0, lambda t, d: None).start().port for _ in range(2)]
+    coord = Coordinator("bus")
+    coord.registry.register(driver_info(ports[0]))
+    coord.handle("CALL", {"stop": "A", "bus": "47"})
+    old = coord.dispatcher.bus_clients["drv-47/CALL"]
+
+    coord.registry.register(driver_info(ports[1]))       # 같은 HTTP 주소, 다른 버스 포트
+    coord.pending.pop("A", "47")
+    coord.handle("CALL", {"stop": "A", "bus": "47"})
+    new = coord.dispatcher.bus_clients["drv-47/CALL"]
+    assert new is not old and new.port == ports[1]
+    assert old._closed
+    assert list(coord.dispatcher._bus_by_addr) == [("127.0.0.1", ports[1])]
+
+
+# ───────────── 라우팅 규칙 ─────────────
+
+def make_router():
+    registry = Registry(ttl=60)
+    for info in ({"role": "stop", "node_id": "stop-A", "stop": "A"},
+                 {"role": "call", "node_id": "call-A", "stop": "A"},
+                 {"role": "call", "node_id": "call-B", "stop": "B"},
+                 {"role": "driver", "node_id": "drv-47", "bus": "47"},
+                 {"role": "driver", "node_id": "drv-12", "bus": "12"}):
+        registry.register(dict(info, http="http://127.0.0.1:1"))
+    return Router(registry, PendingTable(shards=4))
+
+
+def routed(out):
+    return sorted((node.node_id, kind) for node, kind, _ in out)
+
+
+def test_call_goes_to_stop_and_route_driver():
+    router = make_router()
+    out = router.route("CALL", {"stop": "A", "bus": "47", "caller": "call-A"})
+    assert routed(out) == [("drv-47", "CALL"), ("stop-A", "CALL")]
+    assert router.route("CALL", {"stop": "A", "bus": "47", "caller": "call-A"}) == []
+    assert router.stats()["duplicates"] == 1
+
+
+def test_arrival_releases_caller_and_clears_driver():
+    router = make_router()
+    router.route("CALL", {"stop": "A", "bus": "47", "caller": "call-A"})
+    out = router.route("ARRIVAL", {"stop": "A", "bus": "47"})
+    assert routed(out) == [("call-A", "RELEASE"), ("drv-47", "ARRIVAL")]
+    assert all(p["stop"] == "A" for _, _, p in out)
+    assert len(router.pending) == 0
+    assert router.route("ARRIVAL", {"stop": "A", "bus": "47"}) == []
+    assert router.stats()["unmatched"] == 1
+
+
+def test_pending_expire_removes_entries():
+    table = PendingTable(shards=4)
+    old, _ = table.add("A", "47")
+    table.add("B", "12")
+    old.created -= 100
+    assert [(c.stop, c.bus) for c in table.expire(50)] == [("A", "47")]
+    assert table.get("A", "47") is None and len(table) == 1
+
+
+def test_simulate_matches_every_call():
+    args = Namespace(stops=5, buses=10, drivers_per_bus=2, events=4000, workers=4,
+                     shards=4, node_ttl=60.0, sink="null", rate=0)
+    assert simulate(args)
@@ -0,0 +1,70 @@
+# test_event_bus.py  (python3 -m pytest -q test_event_bus.py)
+# 이벤트 버스: ACK 수신, 같은 id 재전송은 한 번만 처리, 버스가 죽으면 HTTP 로 대체 전송 (msg_id 포함)
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from dispatcher import Dispatcher
+from event_bus import EventBusClient, EventBusServer
+
+
+def start_server():
+    got = []
+    server = EventBusServer("127.0.0.1", 0, lambda t, d: got.append((t, d))).start()
+    return server, got
+
+
+def test_ack_arrives():
+    server, got = start_server()
+    client = EventBusClient("127.0.0.1", server.port, name="t").start()
+    assert client.send_and_wait("CALL", {"bus": "77"}, timeout=2)
+    assert got == [("CALL", {"bus": "77"})]
+    assert client.acked == 1
+
+
+def test_resent_id_delivered_once():
+    server, got = start_server()
+    client = EventBusClient("127.0.0.1", server.port, name="t").start()
+    msg_id = client.new_id()
+    for _ in range(2):
+        _, done = client.send("CALL", {"bus": "77"}, msg_id=msg_id)
+        assert done.wait(2) and done.ok
+    assert len(got) == 1
+    assert server.duplicates == 1
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_dead_bus_falls_back_to_http():
+    bodies = []
+    arrived = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            bodies.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            arrived.set()
+
+        def log_message(self, *args):
+            pass
+
+    http = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    try:
+        disp = Dispatcher("bus", timeout=1)
+        disp.add_peer("stop", f"http://127.0.0.1:{http.server_port}/call",
+                      bus_addr=("127.0.0.1", free_port()))     # 아무도 듣지 않는 포트
+        disp.send({"type": "CALL", "bus": "77"})
+        assert arrived.wait(5)
+        assert bodies[0]["bus"] == "77" and bodies[0]["msg_id"]
+        assert disp.bus_fallbacks == 1
+    finally:
+        http.shutdown()
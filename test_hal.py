@@ -0,0 +1,16 @@
+# test_hal.py  (python3 -m pytest -q test_hal.py)
+# board 백엔드에서 OPi.GPIO 가 깨져도 SimGPIO 로 조용히 "준비됨" 이 되던 회귀 확인
+
+import sys
+
+import pytest
+
+import hal
+
+
+def test_board_without_gpio_fails(monkeypatch):
+    monkeypatch.setitem(sys.modules, "OPi", None)    # import OPi.GPIO → ImportError
+    with pytest.raises(ImportError):
+        hal.load_gpio("board", fallback=False)
+    assert isinstance(hal.load_gpio("board", fallback=True), hal.SimGPIO)
+    assert isinstance(hal.load_gpio("sim"), hal.SimGPIO)
@@ -0,0 +1,70 @@
+# test_notification_store.py  (python3 -m pytest -q test_notification_store.py)
+# 한 정류장의 도착(ARRIVAL)이 같은 버스를 부른 다른 정류장 알림까지 지우던 회귀 확인,
+# 변경 로그가 잘린 뒤의 전체 다시 읽기, TTL 만료와 최대 개수 (DriverRenderer.update 가 의존)
+
+import importlib
+import json
+
+import hal
+from notification_store import NotificationStore
+
+LINES = ("ko", "en")
+
+
+def test_remove_keeps_other_stop_for_same_bus():
+    store = NotificationStore()
+    store.add("A", "47", LINES, now=0)
+    store.add("B", "47", LINES, now=0)
+    assert store.remove("A", "47")
+    assert [n.key for n in store.snapshot()[1]] == [("B", "47")]
+
+
+def test_driver_arrival_clears_only_its_stop(monkeypatch):
+    monkeypatch.setattr(hal, "HAL_BACKEND", "sim")     # hal 이 먼저 import 됐어도 sim 으로
+    monkeypatch.setenv("NODE_CONFIG", json.dumps({"TRACE_DIR": None}))
+    driver = importlib.import_module("driver_display")
+    driver.notifications.clear()
+
+    driver.on_bus_event("CALL", {"stop": "A", "bus": "47"})
+    driver.on_bus_event("CALL", {"stop": "B", "bus": "47"})
+    driver.on_bus_event("ARRIVAL", {"stop": "A", "bus": "47"})
+    assert [n.key for n in driver.notifications.snapshot()[1]] == [("B", "47")]
+
+    # stop 없는 예전 HTTP 도착은 해당 버스 알림을 모두 지움
+    driver.on_bus_event("ARRIVAL", {"bus": "47"})
+    assert len(driver.notifications) == 0
+
+
+def test_changes_since_resyncs_after_log_trim():
+    store = NotificationStore(max_size=100, ttl=600, log_size=4)
+    store.add("A", "1", LINES, now=0)
+    drawn = store.version
+    for i in range(20):                      # 로그가 여러 번 잘림
+        store.add("A", str(i + 2), LINES, now=0)
+    version, changes = store.changes_since(drawn)
+    assert changes is None and version == store.version    # [] 가 아니라 전체 다시 읽기
+    # 잘린 뒤에도 최근 version 은 증분으로 받음
+    version, changes = store.changes_since(store.version - 2)
+    assert [v for v, _, _ in changes] == [version - 1, version]
+    assert store.changes_since(store.version) == (store.version, [])
+
+
+def test_ttl_expiry_bumps_version():
+    store = NotificationStore(ttl=10)
+    store.add("A", "47", LINES, now=0)
+    drawn = store.version
+    assert store.expire(now=5) == 0 and store.version == drawn
+    assert store.expire(now=10) == 1
+    version, changes = store.changes_since(drawn)
+    assert version == drawn + 1 and changes == [(version, "remove", ("A", "47"))]
+    assert len(store) == 0
+
+
+def test_max_size_drops_oldest():
+    store = NotificationStore(max_size=3)
+    for i in range(5):
+        store.add("A", str(i), LINES, now=i)
+    assert [n.bus for n in store.snapshot()[1]] == ["2", "3", "4"]
+    store.add("A", "2", LINES, now=9)        # 갱신은 맨 뒤로 → 다음에 버려지지 않음
+    store.add("A", "5", LINES, now=9)
+    assert [n.bus for n in store.snapshot()[1]] == ["4", "2", "5"]
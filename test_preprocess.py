@@ -0,0 +1,39 @@
+# test_preprocess.py  (python3 -m pytest -q test_preprocess.py)
+# YoloPreprocessor 가 예전 cv2 경로 (감마 → 채도 → letterbox → blobFromImage) 와 같은 blob 을 만드는지 확인
+
+import numpy as np
+
+from bench_preprocess import GAMMA, SATURATION, SIZE, adjust_gamma, adjust_saturation, legacy_input
+from preprocess import YoloPreprocessor
+from yolo_decoder import letterbox
+
+
+def test_blob_matches_legacy_path():
+    rng = np.random.default_rng(0)
+    pre = YoloPreprocessor(GAMMA, SATURATION, SIZE)
+    for _ in range(2):                                     # 두 번째는 재사용 버퍼 경로
+        frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        blob, scale, pad = pre(frame)
+        ref = legacy_input(frame)
+        assert blob.shape == ref.shape == (1, 3, SIZE, SIZE)
+        assert np.abs(blob - ref).max() == 0
+        assert scale == 1.0 and pad == (0, 80)
+
+
+def test_correct_matches_legacy_roi():
+    rng = np.random.default_rng(1)
+    roi = rng.integers(0, 256, (40, 90, 3), dtype=np.uint8)
+    pre = YoloPreprocessor(GAMMA, SATURATION, SIZE)
+    ref = adjust_saturation(adjust_gamma(roi[..., ::-1].copy()))
+    assert np.array_equal(pre.correct(roi), ref)
+
+
+def test_resized_frame_uses_letterbox_geometry():
+    # 큰 프레임은 먼저 줄인 뒤 보정하므로 값은 근사, 배율/패딩/패딩 색은 letterbox() 와 같아야 함
+    frame = np.random.default_rng(2).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    blob, scale, pad = YoloPreprocessor(GAMMA, SATURATION, SIZE)(frame)
+    _, ref_scale, ref_pad = letterbox(frame, SIZE)
+    assert (scale, pad) == (ref_scale, ref_pad) == (0.5, (0, 140))
+    assert np.allclose(blob[0, :, :140], 114 / 255.0)
+    assert np.allclose(blob[0, :, 500:], 114 / 255.0)
+    assert np.abs(blob - legacy_input(frame)).mean() < 0.02
@@ -0,0 +1,60 @@
+# test_tracker.py  (python3 -m pytest -q test_tracker.py)
+# 게이트가 검출을 건너뛰는 동안 확정 트랙이 멈춰 있다가 다른 버스에 붙는 회귀 확인
+
+import time
+import numpy as np
+
+from frame_pipeline import InferenceGate
+from tracker import BusTracker
+
+BOX = (100, 100, 300, 200, 0.9)
+
+
+def confirm(tracker, number, box=BOX):
+    (track, _), = tracker.update([box])
+    for _ in range(tracker.min_votes):
+        tracker.add_reading(track.id, number)
+    assert track.number == number
+    return track
+
+
+def detect_step(tracker, gate, frame, boxes):
+    """ stop_node.detect_loop 한 번: 게이트 → (건너뜀: tracker.skip) / 검출 결과 반영 """
+    run, reason = gate.check(frame)
+    if not run:
+        tracker.skip(reason)
+        return None
+    return tracker.update(boxes)
+
+
+def test_idle_gate_drops_confirmed_tracks():
+    pending = {"03"}
+    gate = InferenceGate(lambda: bool(pending))
+    tracker = BusTracker(min_votes=3)
+    frame = np.zeros((480, 640, 3), np.uint8)
+
+    old = confirm(tracker, "03")
+    pending.clear()                                   # 03 도착 처리 → 호출 없음
+    assert detect_step(tracker, gate, frame, [BOX]) is None
+    pending.add("03")                                 # 다시 호출
+    (track, _), = detect_step(tracker, gate, frame, [BOX])   # 같은 자리에 다른 버스
+    assert track is not old
+    assert track.needs_ocr and track.number is None
+
+
+def test_tracks_age_by_wall_clock():
+    tracker = BusTracker(min_votes=3, max_age=0.05)
+    old = confirm(tracker, "03")
+    time.sleep(0.1)
+    tracker.skip("still")
+    assert not tracker.tracks
+    (track, _), = tracker.update([BOX])
+    assert track is not old and track.needs_ocr
+
+
+def test_recent_track_is_reused():
+    tracker = BusTracker(min_votes=3)
+    old = confirm(tracker, "03")
+    tracker.skip("still")
+    (track, _), = tracker.update([BOX])
+    assert track is old and not track.needs_ocr
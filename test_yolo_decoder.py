@@ -0,0 +1,38 @@
+# test_yolo_decoder.py  (python3 -m pytest -q test_yolo_decoder.py)
+# 벡터화 NMS / 디코더가 손으로 계산한 겹치는 박스 결과와 같은지 확인
+
+import numpy as np
+
+from yolo_decoder import decode_yolo_output, nms
+
+# A 기준 IoU: B = 81/119 ≈ 0.68, C = 50/150 ≈ 0.33, D = 0 (B, C 끼리는 B 가 먼저 지워짐)
+BOXES = np.array([[0, 0, 10, 10],        # A 0.9
+                  [1, 1, 11, 11],        # B 0.8
+                  [5, 0, 15, 10],        # C 0.7
+                  [100, 100, 110, 110]],  # D 0.6
+                 dtype=np.float32)
+SCORES = np.array([0.9, 0.8, 0.7, 0.6], dtype=np.float32)
+
+
+def test_nms_matches_hand_computed():
+    assert nms(BOXES, SCORES, 0.45).tolist() == [0, 2, 3]
+    assert nms(BOXES, SCORES, 0.30).tolist() == [0, 3]
+    assert nms(BOXES, SCORES, 0.70).tolist() == [0, 1, 2, 3]
+    assert nms(BOXES, SCORES, 0.45, max_det=2).tolist() == [0, 2]
+    # 점수 순서가 입력 순서와 달라도 점수 내림차순으로
+    order = [3, 1, 0, 2]
+    assert nms(BOXES[order], SCORES[order], 0.45).tolist() == [2, 3, 0]
+
+
+def test_decode_maps_letterbox_to_frame():
+    # 640x480 → 640x640 레터박스 (scale 1, 위 패딩 80). 행 = (cx, cy, w, h, conf)
+    pad_y = 80
+    rows = [[(b[0] + b[2]) / 2, (b[1] + b[3]) / 2 + pad_y, b[2] - b[0], b[3] - b[1], s]
+            for b, s in zip(BOXES, SCORES)]
+    rows += [[300, 300 + i, 20, 20, 0.1] for i in range(4)]    # 임계값 미만 (N=8, 전치 판별 가능)
+    outs = np.array(rows, dtype=np.float32)[None]          # (1, N, 5)
+    dets = decode_yolo_output(outs, 0.3, 0.45, 1.0, (0, pad_y), (640, 480))
+    assert [d[:4] for d in dets] == [(0, 0, 10, 10), (5, 0, 15, 10), (100, 100, 110, 110)]
+    assert np.allclose([d[4] for d in dets], [0.9, 0.7, 0.6])
+    # YOLOv8 식 (1, 5, N) 전치 출력도 같은 결과
+    assert decode_yolo_output(outs.transpose(0, 2, 1), 0.3, 0.45, 1.0, (0, pad_y), (640, 480)) == dets
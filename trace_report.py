@@ -0,0 +1,140 @@
+# trace_report.py  (노드별 추적 파일을 합쳐 호출 단계별 지연 출력)
+#
+# 각 노드의 TRACE_DIR/{call,stop,driver}.jsonl 을 한 곳에 모아서 실행한다.
+#
+#   python3 trace_report.py trace/*.jsonl                 # 단계별 지연 백분위
+#   python3 trace_report.py trace/*.jsonl --trace 5f0c    # 호출 한 건의 타임라인
+#   python3 trace_report.py trace/*.jsonl --json report.json
+#
+# 노드 간 구간은 각 노드 벽시계 차이이므로 NTP 오차가 그대로 더해진다.
+
+import argparse
+import glob
+import json
+from collections import defaultdict
+import numpy as np
+
+# 시점 이름 → (노드, span, "t0" | "t1")
+MILESTONES = {
+    "press":            ("call", "gpio_edge", "t0"),
+    "handled":          ("call", "gpio_edge", "t1"),
+    "stop_received":    ("stop", "call_received", "t0"),
+    "driver_received":  ("driver", "call_received", "t0"),
+    "driver_rendered":  ("driver", "rendered", "t1"),
+    "driver_alert":     ("driver", "tts_alert", "t0"),
+    "driver_alert_end": ("driver", "tts_alert", "t1"),
+    "frame_captured":   ("stop", "arrival_confirmed", "t0"),
+    "arrival":          ("stop", "arrival_confirmed", "t1"),
+    "arrival_tts":      ("stop", "tts_arrival", "t0"),
+    "arrival_tts_end":  ("stop", "tts_arrival", "t1"),
+    "driver_cleared":   ("driver", "arrival_received", "t0"),
+    "released":         ("call", "release_received", "t1"),
+}
+
+# (이름, 시작 시점, 끝 시점)
+STAGES = [
+    ("버튼 엣지 → 처리 시작 (디바운스/큐)",  "press", "handled"),
+    ("처리 시작 → stop 수신",              "handled", "stop_received"),
+    ("처리 시작 → driver 수신",            "handled", "driver_received"),
+    ("driver 수신 → 화면 표시",            "driver_received", "driver_rendered"),
+    ("driver 수신 → 알림음 시작",          "driver_received", "driver_alert"),
+    ("driver 알림음 재생",                 "driver_alert", "driver_alert_end"),
+    ("버튼 → driver 알림음 시작 (전체)",   "press", "driver_alert"),
+    ("호출 → 버스 도착 판정 (대기)",        "stop_received", "arrival"),
+    ("프레임 캡처 → 도착 판정 (검출/OCR)",  "frame_captured", "arrival"),
+    ("도착 판정 → 도착 안내 시작",          "arrival", "arrival_tts"),
+    ("도착 안내 재생",                     "arrival_tts", "arrival_tts_end"),
+    ("도착 안내 끝 → call 해제 수신",       "arrival_tts_end", "released"),
+    ("도착 안내 끝 → driver 알림 정리",     "arrival_tts_end", "driver_cleared"),
+    ("버튼 → 해제 (전체)",                 "press", "released"),
+]
+
+
+def load_spans(paths):
+    traces = defaultdict(list)
+    for pattern in paths:
+        for path in glob.glob(pattern) or [pattern]:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue    # 기록 중 끊긴 마지막 줄
+                    if rec.get("trace"):
+                        traces[rec["trace"]].append(rec)
+    return traces
+
+def milestones(spans):
+    """ 한 trace 의 시점들. 같은 span 이 여러 번이면 (peer 별 전송 등) 가장 이른 것 """
+    by_key = {}
+    for s in spans:
+        k = (s["node"], s["span"])
+        if k not in by_key or s["t0"] < by_key[k]["t0"]:
+            by_key[k] = s
+    out = {}
+    for name, (node, span, field) in MILESTONES.items():
+        s = by_key.get((node, span))
+        if s is not None:
+            out[name] = s[field]
+    return out
+
+def stage_stats(traces):
+    values = defaultdict(list)
+    for spans in traces.values():
+        m = milestones(spans)
+        for label, a, b in STAGES:
+            if a in m and b in m:
+                values[label].append((m[b] - m[a]) * 1000.0)
+    out = []
+    for label, _, _ in STAGES:
+        v = np.array(values.get(label, []))
+        if v.size:
+            out.append({"stage": label, "n": int(v.size), "p50": float(np.percentile(v, 50)),
+                        "p90": float(np.percentile(v, 90)), "p99": float(np.percentile(v, 99)),
+                        "max": float(v.max())})
+    return out
+
+def print_timeline(trace_id, spans):
+    spans = sorted(spans, key=lambda s: s["t0"])
+    base = spans[0]["t0"]
+    print(f"[TRACE] {trace_id}  ({len(spans)} spans)")
+    print(f"{'+ms':>10}{'dur ms':>10}  {'node':<7}{'span':<20} attrs")
+    for s in spans:
+        attrs = {k: v for k, v in s.items() if k not in ("trace", "node", "span", "t0", "t1")}
+        print(f"{(s['t0'] - base) * 1000:10.1f}{(s['t1'] - s['t0']) * 1000:10.1f}  "
+              f"{s['node']:<7}{s['span']:<20} {attrs if attrs else ''}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("files", nargs="+", help="노드별 추적 JSONL (glob 가능)")
+    ap.add_argument("--trace", help="이 id (앞부분) 로 시작하는 호출의 타임라인 출력")
+    ap.add_argument("--json", help="단계별 통계를 JSON 으로 저장")
+    args = ap.parse_args()
+
+    traces = load_spans(args.files)
+    if args.trace:
+        matched = [t for t in traces if t.startswith(args.trace)]
+        if not matched:
+            print(f"[WARN] trace '{args.trace}' 없음")
+        for t in matched:
+            print_timeline(t, traces[t])
+        return
+
+    stats = stage_stats(traces)
+    print(f"[TRACE] 호출 {len(traces)}건")
+    print(f"{'stage':<36}{'n':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for r in stats:
+        # 한글은 두 칸을 차지하므로 표시 폭 기준으로 맞춤
+        pad = 36 - sum(2 if ord(c) > 0x1100 else 1 for c in r["stage"])
+        print(r["stage"] + " " * max(pad, 1) + f"{r['n']:6d}"
+              + "".join(f"{r[k]:10.1f}" for k in ("p50", "p90", "p99", "max")))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# tracing.py  (호출 한 건의 노드 간 지연 추적)
+#
+# call_node 가 버튼을 누른 순간 trace id 를 만들고 CALL / ARRIVAL / RELEASE payload 의 "trace" 로 실어 보낸다.
+# 각 노드는 구간(span)마다 한 줄씩 JSONL 파일에 남긴다.
+#
+#   {"trace": "5f0c...", "node": "driver", "span": "tts_alert", "t0": 1718.123, "t1": 1719.456, ...}
+#
+# t0/t1 은 time.time() (벽시계). 노드 간 비교는 NTP 로 시계가 맞춰져 있다고 가정한다.
+# 기록은 큐에 넣기만 하고 파일 쓰기는 백그라운드 스레드가 하므로 호출 스레드 비용은 수 us.
+# 여러 노드의 파일을 모아 trace_report.py 로 단계별 지연을 본다.
+#
+#   tracer = Tracer("call", TRACE_DIR)
+#   tid = new_trace_id()
+#   tracer.span(tid, "gpio_edge", ev.t_wall, time.time(), pin=ev.pin)
+#   with tracer.timed(tid, "dispatch", peer="stop"): ...
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+
+class Tracer:
+    def __init__(self, node, trace_dir=None, enabled=True, flush_interval=1.0):
+        self.node = node
+        self.enabled = enabled and bool(trace_dir)
+        self.path = None
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._flush_interval = flush_interval
+        self._write_lock = threading.Lock()
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            self.path = os.path.join(trace_dir, f"{node}.jsonl")
+            self._file = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"[WARN] 추적 파일을 열 수 없음 ({e}) → 추적 끔")
+            self.enabled = False
+            return
+        threading.Thread(target=self._writer, name="trace-writer", daemon=True).start()
+        atexit.register(self.close)     # 종료 직전 큐에 남은 기록까지 파일로
+
+    def span(self, trace_id, name, t0, t1=None, **attrs):
+        """ 구간 기록. t1 을 생략하면 시점(event) 하나 """
+        if not self.enabled or not trace_id:
+            return
+        rec = {"trace": trace_id, "node": self.node, "span": name, "t0": t0,
+               "t1": t0 if t1 is None else t1}
+        if attrs:
+            rec.update(attrs)
+        self._queue.put(rec)
+
+    def event(self, trace_id, name, **attrs):
+        self.span(trace_id, name, time.time(), **attrs)
+
+    @contextmanager
+    def timed(self, trace_id, name, **attrs):
+        t0 = time.time()
+        try:
+            yield
+        finally:
+            self.span(trace_id, name, t0, time.time(), **attrs)
+
+    def _writer(self):
+        while self.enabled:
+            time.sleep(self._flush_interval)
+            self._flush()
+
+    def _flush(self):
+        """ 큐에 쌓인 기록을 한 번에 씀. 꺼내기와 쓰기를 한 잠금 안에서 해서 close() 와 겹쳐도 유실 없음 """
+        with self._write_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch or self._file.closed:
+                return
+            try:
+                self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch))
+                self._file.flush()
+            except OSError as e:
+                self.dropped += len(batch)
+                print(f"[WARN] 추적 기록 실패: {e}")
+
+    def close(self):
+        """ 큐에 남은 기록을 바로 쓰고 파일을 닫음 (프로세스 종료 시 atexit 에서도 호출) """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._flush()
+        with self._write_lock:
+            self._file.close()
@@ -0,0 +1,178 @@
+# tracker.py  (stop_node 번호판 추적기)
+# 검출 박스를 IoU(겹침) / 중심점 거리로 프레임 간에 이어 붙이고,
+# 트랙마다 OCR 결과를 여러 프레임 투표로 확정한다.
+# 확정된 트랙은 화면에서 사라질 때까지 OCR 없이 결과를 재사용한다.
+
+import threading
+import time
+from collections import Counter
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """ a: (N,4), b: (M,4) x1y1x2y2 → (N,M) IoU """
+    a = np.asarray(a, dtype=np.float32)[:, None, :4]
+    b = np.asarray(b, dtype=np.float32)[None, :, :4]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-9)
+
+
+class Track:
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box[:4])
+        self.hits = 1
+        self.missed = 0
+        self.votes = Counter()
+        self.ocr_calls = 0
+        self.number = None        # 투표로 확정된 번호
+        self.announced = False    # 도착 처리 완료 여부
+        self.first_seen = self.last_seen = time.monotonic()
+
+    @property
+    def needs_ocr(self):
+        return self.number is None
+
+    def __repr__(self):
+        return f"Track#{self.id}({self.number or dict(self.votes)})"
+
+
+class BusTracker:
+    """
+    iou_threshold  : 이 이상 겹치면 같은 버스로 본다
+    max_dist       : IoU 가 모자라도 중심점이 (박스 대각선 x max_dist) 안이면 같은 버스
+    max_missed     : 이 프레임 수만큼 안 보이면 트랙 삭제 (화면을 떠난 것으로 판단)
+    max_age        : 검출이 건너뛰어져도 마지막으로 본 뒤 이 초가 지나면 트랙 삭제
+    min_votes      : 같은 번호가 이만큼 읽혀야 확정
+    min_ratio      : 그 번호가 전체 읽기 중 이 비율 이상이어야 확정
+    """
+
+    def __init__(self, iou_threshold=0.3, max_dist=0.5, max_missed=10,
+                 min_votes=3, min_ratio=0.6, max_age=5.0):
+        self.iou_threshold = iou_threshold
+        self.max_dist = max_dist
+        self.max_missed = max_missed
+        self.max_age = max_age
+        self.min_votes = min_votes
+        self.min_ratio = min_ratio
+        self.tracks = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.ocr_requested = 0
+        self.ocr_skipped = 0
+
+    # ───────────── 검출 결과 반영 ─────────────
+    def update(self, boxes):
+        """ 이번 프레임 박스로 트랙 갱신. [(track, box), ...] 반환 """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            tracks = list(self.tracks.values())
+            matched = self._match(tracks, boxes)
+            result, used = [], set()
+            for ti, bi in matched:
+                t = tracks[ti]
+                t.box, t.hits, t.missed, t.last_seen = tuple(boxes[bi][:4]), t.hits + 1, 0, now
+                used.add(ti)
+                result.append((t, boxes[bi]))
+            for ti, t in enumerate(tracks):
+                if ti not in used:
+                    t.missed += 1
+                    if t.missed > self.max_missed:
+                        del self.tracks[t.id]
+            matched_boxes = {bi for _, bi in matched}
+            for bi, box in enumerate(boxes):
+                if bi not in matched_boxes:
+                    t = Track(self._next_id, box)
+                    self._next_id += 1
+                    self.tracks[t.id] = t
+                    result.append((t, box))
+            for t, _ in result:
+                if t.needs_ocr:
+                    self.ocr_requested += 1
+                else:
+                    self.ocr_skipped += 1
+            return result
+
+    def _expire(self, now):
+        for tid in [t.id for t in self.tracks.values() if now - t.last_seen > self.max_age]:
+            del self.tracks[tid]
+
+    def expire(self):
+        """ max_age 초 넘게 안 보인 트랙 삭제 """
+        with self._lock:
+            self._expire(time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self.tracks.clear()
+
+    def skip(self, reason):
+        """
+        검출 앞 게이트가 프레임을 건너뛸 때 호출 (InferenceGate.check 의 사유).
+        idle  : 보지 않는 동안 화면의 버스가 바뀌었을 수 있으므로 트랙 전부 삭제
+        still : 트랙은 두되 벽시계 기준으로 늙힘
+        멈춘 확정 트랙에 같은 자리의 다른 버스가 IoU 로 붙어 OCR 없이 도착 처리되는 것을 막는다.
+        """
+        if reason == "idle":
+            self.clear()
+        else:
+            self.expire()
+
+    def _match(self, tracks, boxes):
+        if not tracks or not len(boxes):
+            return []
+        ious = iou_matrix([t.box for t in tracks], boxes)
+        tb = np.asarray([t.box for t in tracks], dtype=np.float32)
+        bb = np.asarray([b[:4] for b in boxes], dtype=np.float32)
+        tc = (tb[:, :2] + tb[:, 2:]) / 2
+        bc = (bb[:, :2] + bb[:, 2:]) / 2
+        dist = np.linalg.norm(tc[:, None] - bc[None], axis=-1)
+        diag = np.linalg.norm(tb[:, 2:] - tb[:, :2], axis=-1)[:, None]
+        near = dist <= diag * self.max_dist
+        # IoU 매칭(1~2점) 우선, 겹침이 모자라면 중심점 근접도로 점수화 (0~1점)
+        score = np.where(ious >= self.iou_threshold, 1.0 + ious,
+                         np.where(near, 1.0 - dist / (diag + 1e-9), 0.0))
+        pairs = []
+        while True:
+            ti, bi = np.unravel_index(np.argmax(score), score.shape)
+            if score[ti, bi] <= 0:
+                break
+            pairs.append((int(ti), int(bi)))
+            score[ti, :] = 0
+            score[:, bi] = 0
+        return pairs
+
+    # ───────────── OCR 결과 반영 ─────────────
+    def add_reading(self, track_id, number):
+        """ OCR 결과 한 번을 투표에 반영. 이번에 확정되면 트랙을, 아니면 None 반환 """
+        with self._lock:
+            t = self.tracks.get(track_id)
+            if t is None or not t.needs_ocr:
+                return None
+            t.ocr_calls += 1
+            if not number:
+                return None
+            t.votes[number] += 1
+            best, count = t.votes.most_common(1)[0]
+            if count >= self.min_votes and count / sum(t.votes.values()) >= self.min_ratio:
+                t.number = best
+                return t
+            return None
+
+    def has_unconfirmed(self):
+        with self._lock:
+            return any(t.needs_ocr for t in self.tracks.values())
+
+    def confirmed(self):
+        with self._lock:
+            return [t for t in self.tracks.values() if t.number is not None]
+
+    def stats(self):
+        with self._lock:
+            return {"tracks": len(self.tracks), "ocr_requested": self.ocr_requested,
+                    "ocr_skipped": self.ocr_skipped}
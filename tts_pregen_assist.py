@@ -33,16 +33,35 @@ tts_pregen_assist.py
     driver_03_alert_ko.mp3
     driver_03_alert_en.mp3
 등등 버스별 전부 생성.
+
+다시 실행하면 OUT_DIR/manifest.json 의 (문장, 언어, 엔진, 목소리) 해시와 비교해서
+바뀌었거나 없는 클립만 TTS_WORKERS 개 작업자로 동시에 생성하고, ROUTE_INFO 에서 빠진 클립은 지운다.
+엔진은 gTTS (mp3, 네트워크 필요) 또는 espeak-ng (wav, 오프라인). 기본 auto 는 gTTS 를 쓸 수 없으면 espeak-ng.
+다른 엔진이 만든 클립은 문장이 그대로면 유지한다 (오프라인에서 돌려도 gTTS 클립이 espeak-ng 로 바뀌지 않음,
+auto 로 다시 gTTS 를 쓸 수 있게 되면 espeak-ng 클립만 gTTS 로 교체). 엔진을 통째로 바꾸려면 --force.
+
+    python3 tts_pregen_assist.py                      # 바뀐 클립만
+    python3 tts_pregen_assist.py --engine espeak-ng --jobs 2
+    python3 tts_pregen_assist.py --force              # 전부 다시
 """
 
+import argparse
+import hashlib
+import json
 import os
-from gtts import gTTS
+import shutil
+import socket
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # -----------------------------------------
-# 출력 경로
+# 출력 경로 / 생성 설정
 # -----------------------------------------
 OUT_DIR = "/home/pi/bus_detection/tts"
-os.makedirs(OUT_DIR, exist_ok=True)
+MANIFEST = "manifest.json"   # 클립별 (문장, 언어, 엔진, 목소리) 해시 → 바뀐 것만 다시 생성
+TTS_ENGINE = "auto"          # "auto" (gTTS, 네트워크 없으면 espeak-ng) | "gtts" | "espeak-ng"
+TTS_WORKERS = 4              # 동시에 합성할 클립 수 (gTTS 는 요청이 몰리면 429 를 주므로 적게)
 
 # -----------------------------------------
 # 정류장 이름 (현장에 맞게 커스터마이즈)
@@ -95,50 +114,228 @@ def make_driver_en(route_en: str) -> str:
     return f"A passenger requiring assistance will board {route_en} at {STOP_NAME_EN}."
 
 # -----------------------------------------
-# gTTS 저장 함수
+# 생성할 클립 목록: (파일 이름, 문장, 언어)
 # -----------------------------------------
-def save_tts(text: str, lang: str, path: str):
-    print(f"[TTS] {path}")
-    tts = gTTS(text=text, lang=lang, slow=False)
-    tts.save(path)
+MESSAGES = (
+    ("{bus}_select",        make_select_ko,  make_select_en),
+    ("{bus}_already",       make_already_ko, make_already_en),
+    ("{bus}_arrival",       make_arrival_ko, make_arrival_en),
+    ("driver_{bus}_alert",  make_driver_ko,  make_driver_en),
+)
+
+def clip_jobs():
+    jobs = []
+    for bus_id, (route_ko, route_en) in ROUTE_INFO.items():
+        for pattern, make_ko, make_en in MESSAGES:
+            base = pattern.format(bus=bus_id)
+            jobs.append((f"{base}_ko", make_ko(route_ko), "ko"))
+            jobs.append((f"{base}_en", make_en(route_en), "en"))
+    return jobs
+
+# -----------------------------------------
+# 음성 엔진 (synth(text, lang, path) 로 파일 하나 생성)
+# audio_engine 은 TTS_DIR 의 mp3 / wav 를 모두 읽는다
+# -----------------------------------------
+class GTTSEngine:
+    name, ext = "gtts", "mp3"
+
+    def __init__(self, slow=False):
+        from gtts import gTTS
+        self._gTTS = gTTS
+        self.slow = slow
+
+    def available(self):
+        """ gTTS 는 translate.google.com 에 접속해야 함 """
+        try:
+            socket.create_connection(("translate.google.com", 443), timeout=3).close()
+            return True
+        except OSError:
+            return False
+
+    def voice(self, lang):
+        return f"{lang}/{'slow' if self.slow else 'normal'}"
+
+    def synth(self, text, lang, path):
+        self._gTTS(text=text, lang=lang, slow=self.slow).save(path)
+
+
+class EspeakEngine:
+    """ 네트워크 없이 보드에서 바로 합성 (apt install espeak-ng). 음질은 gTTS 보다 떨어짐 """
+    name, ext = "espeak-ng", "wav"
+    VOICES = {"ko": "ko", "en": "en-us"}
+
+    def __init__(self, speed=150):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        self.speed = speed
+
+    def available(self):
+        return self.binary is not None
+
+    def voice(self, lang):
+        return f"{self.VOICES.get(lang, lang)}@{self.speed}"
+
+    def synth(self, text, lang, path):
+        subprocess.run([self.binary, "-v", self.VOICES.get(lang, lang), "-s", str(self.speed),
+                        "-w", path, text], check=True, capture_output=True)
+
+
+ENGINES = {"gtts": GTTSEngine, "espeak-ng": EspeakEngine}
+AUTO_ORDER = ("gtts", "espeak-ng")   # auto 선호 순서 (앞쪽이 음질이 좋음)
+
+def make_engine(name=TTS_ENGINE):
+    """ 이름으로 엔진 생성. auto 면 gTTS → espeak-ng 순으로 쓸 수 있는 것 """
+    if name != "auto":
+        return ENGINES[name]()
+    for candidate in AUTO_ORDER:
+        try:
+            engine = ENGINES[candidate]()
+        except ImportError as e:
+            print(f"[WARN] {candidate} 없음 ({e}) → 다음 엔진")
+            continue
+        if engine.available():
+            return engine
+        print(f"[WARN] {candidate} 사용 불가 (네트워크/실행 파일) → 다음 엔진")
+    raise RuntimeError("사용할 수 있는 TTS 엔진 없음 (gTTS + 네트워크, 또는 espeak-ng)")
+
+# -----------------------------------------
+# 매니페스트
+# -----------------------------------------
+def clip_hash(text, lang, engine, voice):
+    key = json.dumps([text, lang, engine, voice], ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] 매니페스트 읽기 실패 ({e}) → 전체 다시 생성")
+        return {}
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def _remove(out_dir, file):
+    try:
+        os.remove(os.path.join(out_dir, file))
+    except FileNotFoundError:
+        pass
+
+# -----------------------------------------
+# 생성 (바뀐 클립만, 작업자 풀에서 동시에)
+# -----------------------------------------
+def synth_clip(engine, out_dir, name, text, lang):
+    """ 임시 파일에 합성 후 교체 → 실패해도 빈 파일/반쪽 파일이 남지 않음 """
+    path = os.path.join(out_dir, f"{name}.{engine.ext}")
+    tmp = path + ".part"
+    t0 = time.perf_counter()
+    try:
+        engine.synth(text, lang, tmp)
+        if os.path.getsize(tmp) == 0:
+            raise RuntimeError("빈 파일")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return time.perf_counter() - t0
+
+def _rank(engine_name):
+    return AUTO_ORDER.index(engine_name) if engine_name in AUTO_ORDER else len(AUTO_ORDER)
+
+def reusable(prev, entry, out_dir, upgrade):
+    """
+    예전 클립을 그대로 둘지. 해시가 같으면 유지, 같은 엔진인데 해시가 다르면 (문장/목소리 변경) 다시 생성.
+    다른 엔진이 만든 클립은 문장/언어가 같으면 유지한다 → 네트워크 없는 날 auto 가 espeak-ng 로
+    떨어져도 gTTS 클립을 덮어쓰지 않음. upgrade 면 (auto) 더 좋은 엔진으로만 바꿔 씀.
+    """
+    if not prev or not os.path.exists(os.path.join(out_dir, prev["file"])):
+        return False
+    if prev["hash"] == entry["hash"]:
+        return True
+    if prev.get("engine") == entry["engine"]:
+        return False
+    if (prev.get("text"), prev.get("lang")) != (entry["text"], entry["lang"]):
+        return False
+    return not (upgrade and _rank(entry["engine"]) < _rank(prev.get("engine")))
+
+def pregenerate(out_dir=OUT_DIR, engine=None, workers=TTS_WORKERS, force=False, prune=True, upgrade=None):
+    """
+    결과 요약 dict 반환: generated / kept / foreign (다른 엔진 클립 유지) / removed / failed / seconds
+    force 면 모두 다시 생성 (다른 엔진 클립도 이 엔진으로 교체). upgrade 기본값은 engine 을 안 준 경우 (auto)
+    """
+    t0 = time.perf_counter()
+    if upgrade is None:
+        upgrade = engine is None
+    engine = engine or make_engine()
+    os.makedirs(out_dir, exist_ok=True)
+    old = load_manifest(out_dir)
+    new, todo, kept, foreign = {}, [], 0, 0
+    for name, text, lang in clip_jobs():
+        entry = {"hash": clip_hash(text, lang, engine.name, engine.voice(lang)),
+                 "file": f"{name}.{engine.ext}", "text": text, "lang": lang, "engine": engine.name}
+        prev = old.get(name)
+        if not force and reusable(prev, entry, out_dir, upgrade):
+            new[name] = prev
+            kept += 1
+            foreign += prev.get("engine") != engine.name
+        else:
+            todo.append((name, entry))
+
+    failed = []
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        futures = {pool.submit(synth_clip, engine, out_dir, name, entry["text"], entry["lang"]): (name, entry)
+                   for name, entry in todo}
+        for fut in as_completed(futures):
+            name, entry = futures[fut]
+            prev = old.get(name)
+            try:
+                secs = fut.result()
+            except Exception as e:
+                print(f"[WARN] {entry['file']} 생성 실패: {e}")
+                failed.append(name)
+                if prev:
+                    new[name] = prev        # 예전 클립이라도 남겨 둠 (다음 실행에서 다시 시도)
+                continue
+            print(f"[TTS] {entry['file']} ({secs:.2f}s)")
+            new[name] = entry
+            if prev and prev["file"] != entry["file"]:
+                _remove(out_dir, prev["file"])   # 엔진이 바뀌어 확장자가 달라진 경우
+
+    removed = []
+    for name, prev in old.items():
+        if name not in new:
+            if prune:
+                _remove(out_dir, prev["file"])   # 노선 삭제 등으로 목록에서 빠진 클립
+                removed.append(name)
+            else:
+                new[name] = prev
+    save_manifest(out_dir, new)
+    return {"engine": engine.name, "workers": workers, "clips": len(new),
+            "generated": len(todo) - len(failed), "kept": kept, "foreign": foreign,
+            "removed": len(removed), "failed": len(failed), "seconds": time.perf_counter() - t0}
 
 # -----------------------------------------
 # 메인 로직
 # -----------------------------------------
 if __name__ == "__main__":
-    for bus_id, (route_ko, route_en) in ROUTE_INFO.items():
-        # 1) 선택 안내(select)
-        sel_ko = make_select_ko(route_ko)
-        sel_en = make_select_en(route_en)
-        save_tts(sel_ko, "ko",
-                 os.path.join(OUT_DIR, f"{bus_id}_select_ko.mp3"))
-        save_tts(sel_en, "en",
-                 os.path.join(OUT_DIR, f"{bus_id}_select_en.mp3"))
-
-        # 2) 이미 선택 안내(already)
-        already_ko = make_already_ko(route_ko)
-        already_en = make_already_en(route_en)
-        save_tts(already_ko, "ko",
-                 os.path.join(OUT_DIR, f"{bus_id}_already_ko.mp3"))
-        save_tts(already_en, "en",
-                 os.path.join(OUT_DIR, f"{bus_id}_already_en.mp3"))
-
-        # 3) 정류장 진입 안내(arrival)
-        arr_ko = make_arrival_ko(route_ko)
-        arr_en = make_arrival_en(route_en)
-        save_tts(arr_ko, "ko",
-                 os.path.join(OUT_DIR, f"{bus_id}_arrival_ko.mp3"))
-        save_tts(arr_en, "en",
-                 os.path.join(OUT_DIR, f"{bus_id}_arrival_en.mp3"))
-
-        # 4) 기사 안내(driver alert)
-        drv_ko = make_driver_ko(route_ko)
-        drv_en = make_driver_en(route_en)
-        save_tts(drv_ko, "ko",
-                 os.path.join(OUT_DIR, f"driver_{bus_id}_alert_ko.mp3"))
-        save_tts(drv_en, "en",
-                 os.path.join(OUT_DIR, f"driver_{bus_id}_alert_en.mp3"))
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--engine", default=TTS_ENGINE, choices=("auto",) + tuple(ENGINES))
+    ap.add_argument("--jobs", type=int, default=TTS_WORKERS, help="동시에 합성할 클립 수")
+    ap.add_argument("--force", action="store_true", help="매니페스트를 무시하고 모두 다시 생성")
+    ap.add_argument("--no-prune", action="store_true", help="목록에서 빠진 클립 파일을 지우지 않음")
+    args = ap.parse_args()
 
+    r = pregenerate(args.out, make_engine(args.engine), args.jobs, args.force, not args.no_prune,
+                    upgrade=args.engine == "auto")
     print()
-    print("모든 mp3 생성 완료")
-    print(f"   경로: {OUT_DIR}")
+    print(f"[TTS] 엔진 {r['engine']}, 작업자 {r['workers']}: 생성 {r['generated']}, 유지 {r['kept']}, "
+          f"삭제 {r['removed']}, 실패 {r['failed']} → {r['seconds']:.1f}s")
+    if r["foreign"]:
+        print(f"[TTS] 다른 엔진으로 만든 클립 {r['foreign']}개는 그대로 둠 (이 엔진으로 바꾸려면 --force)")
+    print(f"   경로: {args.out}")
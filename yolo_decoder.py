@@ -0,0 +1,93 @@
+# yolo_decoder.py  (YOLO 입력 레터박스 + 출력 디코더)
+# NumPy 벡터 연산으로 임계값 → NMS → 원본 프레임 좌표 복원까지 한 번에 처리
+
+import cv2
+import numpy as np
+
+LETTERBOX_COLOR = (114, 114, 114)   # YOLO 학습 시 기본 패딩 색
+
+
+# ───────────────── 레터박스 ─────────────────
+def letterbox_params(frame_w, frame_h, size=640):
+    """ 비율 유지 축소 배율과 (pad_x, pad_y), 리사이즈 후 크기 """
+    scale = min(size / frame_w, size / frame_h)
+    new_w, new_h = int(round(frame_w * scale)), int(round(frame_h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    return scale, (pad_x, pad_y), (new_w, new_h)
+
+def letterbox(img, size=640, color=LETTERBOX_COLOR):
+    """ 비율을 유지한 채 size x size 로 맞추고 남는 부분을 패딩 (640x480 → 위아래 80px) """
+    h, w = img.shape[:2]
+    scale, (pad_x, pad_y), (new_w, new_h) = letterbox_params(w, h, size)
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    boxed = cv2.copyMakeBorder(img, pad_y, size - new_h - pad_y, pad_x, size - new_w - pad_x,
+                               cv2.BORDER_CONSTANT, value=color)
+    return boxed, scale, (pad_x, pad_y)
+
+
+# ───────────────── NMS ─────────────────
+def nms(boxes, scores, iou_threshold=0.45, max_det=20):
+    """ boxes: (N,4) x1y1x2y2, scores: (N,) → 남길 인덱스 배열 (점수 내림차순) """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    order = np.argsort(scores)[::-1]
+    keep = []
+    while order.size and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.maximum(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0)
+        ih = np.maximum(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0)
+        inter = iw * ih
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.intp)
+
+
+# ───────────────── 출력 디코더 ─────────────────
+def decode_yolo_output(outs, conf_threshold=0.30, iou_threshold=0.45,
+                       scale=1.0, pad=(0, 0), frame_size=(640, 480), max_det=20):
+    """
+    session.run() 의 첫 번째 출력을 받아 원본 프레임 좌표의 박스 목록을 반환.
+    반환: [(x1, y1, x2, y2, conf), ...]  (conf 내림차순)
+
+    - (N, 5+) 행 = 앵커 (cx, cy, w, h, conf, ...) 형식을 기본으로 하고,
+      YOLOv8 처럼 (5+, N) 으로 전치된 출력도 받아준다.
+    - scale / pad 는 letterbox() 가 돌려준 값.
+    """
+    outs = np.asarray(outs)
+    while outs.ndim > 2 and outs.shape[0] == 1:
+        outs = outs[0]
+    if outs.size == 0:
+        return []
+    if outs.ndim == 1:
+        outs = outs.reshape(1, -1)
+    if outs.shape[0] < outs.shape[1] and outs.shape[0] <= 85:
+        outs = outs.T
+
+    conf = outs[:, 4]
+    mask = conf >= conf_threshold
+    if not mask.any():
+        return []
+    cand = outs[mask, :4].astype(np.float32)
+    conf = conf[mask].astype(np.float32)
+
+    half_w, half_h = cand[:, 2] / 2, cand[:, 3] / 2
+    boxes = np.stack([cand[:, 0] - half_w, cand[:, 1] - half_h,
+                      cand[:, 0] + half_w, cand[:, 1] + half_h], axis=1)
+    idx = nms(boxes, conf, iou_threshold, max_det)
+    boxes, conf = boxes[idx], conf[idx]
+
+    # 640x640 레터박스 좌표 → 원본 프레임 좌표
+    pad_x, pad_y = pad
+    boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+    boxes /= scale
+    frame_w, frame_h = frame_size
+    np.clip(boxes[:, 0::2], 0, frame_w - 1, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, frame_h - 1, out=boxes[:, 1::2])
+    boxes = boxes.astype(np.int32)
+
+    valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    return [(int(b[0]), int(b[1]), int(b[2]), int(b[3]), float(c))
+            for b, c in zip(boxes[valid], conf[valid])]